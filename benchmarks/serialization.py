@@ -0,0 +1,67 @@
+"""Compares serializing and hashing the aggregate views the way the registry
+used to (`json.dumps(..., indent=2)`) with `prefect_collection_registry.serialization`.
+
+Run from the repository root with `python benchmarks/serialization.py`.
+"""
+
+import hashlib
+import json
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from prefect_collection_registry import serialization
+
+REPEAT = 5
+NUMBER = 10
+
+
+def best_ms(function: Callable[[], Any]) -> float:
+    """Returns the best time of one call out of `REPEAT` runs, in milliseconds."""
+    return min(timeit.repeat(function, repeat=REPEAT, number=NUMBER)) / NUMBER * 1000
+
+
+def stdlib_only(function: Callable[[], Any]) -> Callable[[], Any]:
+    """Calls a `serialization` function with its `orjson` fast path disabled."""
+
+    def call() -> Any:
+        orjson, serialization.orjson = serialization.orjson, None
+        try:
+            return function()
+        finally:
+            serialization.orjson = orjson
+
+    return call
+
+
+def main(view_dir: Path = Path("views")) -> None:
+    """Prints the timings for each view as a markdown table."""
+    print(
+        "| view | size | json.dumps | dumps | dumps (stdlib) "
+        "| old hash | content_hash |"
+    )
+    print("|---|---:|---:|---:|---:|---:|---:|")
+    for path in sorted(view_dir.glob("*.json")):
+        content = json.loads(path.read_text())
+        timings = [
+            best_ms(lambda: json.dumps(content, indent=2)),
+            best_ms(lambda: serialization.dumps(content)),
+            best_ms(stdlib_only(lambda: serialization.dumps(content))),
+            best_ms(
+                lambda: hashlib.sha256(
+                    json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+                ).hexdigest()
+            ),
+            best_ms(lambda: serialization.content_hash(content)),
+        ]
+        print(
+            f"| {path.name} | {path.stat().st_size // 1024} KB | "
+            + " | ".join(f"{ms:.2f}ms" for ms in timings)
+            + " |"
+        )
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else Path("views"))
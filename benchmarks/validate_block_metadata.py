@@ -0,0 +1,76 @@
+"""Compares the per-item cost of validating block metadata when compiling the
+schema for every item (the previous behavior) against the cached validators.
+
+Run from the repository root:
+
+    uv run benchmarks/validate_block_metadata.py
+"""
+
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import fastjsonschema
+from pydantic_core import from_json
+
+from prefect_collection_registry import validators
+from prefect_collection_registry.metadata_schemas import block_schema
+
+VIEW_PATH = Path("views/aggregate-block-metadata.json")
+
+
+def per_item_microseconds(
+    items: list[dict[str, Any]], validate_item: Callable[[dict[str, Any]], Any]
+) -> float:
+    start = time.perf_counter()
+    for item in items:
+        validate_item(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def timed_milliseconds(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def main() -> None:
+    view = from_json(VIEW_PATH.read_bytes())
+    items: list[dict[str, Any]] = [
+        block_type
+        for collection in view.values()
+        for block_type in collection["block_types"].values()
+    ]
+    print(f"validating {len(items)} block types from {VIEW_PATH}\n")
+
+    before = per_item_microseconds(
+        items, lambda item: fastjsonschema.compile(block_schema)(item)
+    )
+    validators._validators.clear()
+    after = per_item_microseconds(
+        items, lambda item: validators.get_validator("block")(item)
+    )
+    print(f"compile per item:     {before:10.1f} us/item")
+    print(f"cached validator:     {after:10.1f} us/item")
+    print(f"speedup:              {before / after:10.1f}x\n")
+
+    with tempfile.TemporaryDirectory() as validator_dir:
+        validators._validators.clear()
+        generate = timed_milliseconds(
+            lambda: validators.get_validator("block", Path(validator_dir))
+        )
+        validators._validators.clear()
+        load = timed_milliseconds(
+            lambda: validators.get_validator("block", Path(validator_dir))
+        )
+    validators._validators.clear()
+    compile_once = timed_milliseconds(lambda: validators.get_validator("block"))
+    print(f"first use, compile:           {compile_once:8.2f} ms")
+    print(f"first use, generate source:   {generate:8.2f} ms")
+    print(f"first use, import precompiled:{load:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import asyncio
 import os
 import sys
+from contextlib import nullcontext
+from pathlib import Path
 from typing import NoReturn
 from uuid import UUID
 
@@ -10,6 +12,16 @@ from prefect.context import FlowRunContext
 from prefect.results import ResultStore
 from prefect.task_runners import ThreadPoolTaskRunner
 
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.import_profiler import ImportProfiler
+from prefect_collection_registry.paths import (
+    GENERATED_METADATA_FILE_ENV_VAR,
+    IMPORT_REPORT_FILE_ENV_VAR,
+    STAGING_DIR_ENV_VAR,
+    TIMINGS_FILE_ENV_VAR,
+)
+from prefect_collection_registry.session import RegistrySession
+from prefect_collection_registry.timings import StageTimings
 from prefect_collection_registry.update_collection_metadata import (
     update_all_collections,
     update_collection_metadata,
@@ -17,8 +29,44 @@ from prefect_collection_registry.update_collection_metadata import (
 
 
 async def run_single_collection(collection_name: str, branch_name: str) -> None:
-    """Run metadata update for a single collection."""
-    await update_collection_metadata(collection_name, branch_name)
+    """Run metadata update for a single collection.
+
+    When a staging directory is set in the environment, the generated files are
+    written there for the parent flow to commit; otherwise they are written to
+    the branch directly. Stage timings, what importing each module cost and the
+    generated metadata are written to the files set in the environment, if any;
+    imports are only profiled if a file for their report is set.
+    """
+    timings = StageTimings()
+    metadata_file = os.environ.get(GENERATED_METADATA_FILE_ENV_VAR)
+    # imports are only profiled if the parent flow asks for a report
+    import_report_file = os.environ.get(IMPORT_REPORT_FILE_ENV_VAR)
+    with (
+        ImportProfiler(Path(import_report_file)).activate()
+        if import_report_file
+        else nullcontext()
+    ):
+        async with RegistrySession():
+            if staging_dir := os.environ.get(STAGING_DIR_ENV_VAR):
+                commit_builder = CommitBuilder(branch_name)
+                await update_collection_metadata(
+                    collection_name,
+                    branch_name,
+                    commit_builder,
+                    timings,
+                    Path(metadata_file) if metadata_file else None,
+                )
+                commit_builder.dump(Path(staging_dir))
+            else:
+                await update_collection_metadata(
+                    collection_name,
+                    branch_name,
+                    timings=timings,
+                    metadata_file=Path(metadata_file) if metadata_file else None,
+                )
+
+    if timings_file := os.environ.get(TIMINGS_FILE_ENV_VAR):
+        timings.write(Path(timings_file))
 
 
 async def run_all_collections(branch_name: str = "update-metadata") -> None:
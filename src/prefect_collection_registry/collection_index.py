@@ -0,0 +1,410 @@
+import argparse
+import hashlib
+import sqlite3
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic_core import from_json
+
+from prefect_collection_registry.paths import get_cache_dir
+from prefect_collection_registry.versions import ALIAS_KEY, version_sort_key
+
+if TYPE_CHECKING:
+    # importing `utils` at runtime would import Prefect, slowing down the CLI
+    from prefect_collection_registry.utils import CollectionViewVariety
+
+# bumped whenever `SCHEMA` changes, so that stale indexes are rebuilt
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    package_id INTEGER NOT NULL REFERENCES packages (id) ON DELETE CASCADE,
+    version TEXT NOT NULL,
+    -- the PEP 440 rank of the version among all versions of its package
+    position INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (package_id, version)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    version_id INTEGER NOT NULL REFERENCES versions (id) ON DELETE CASCADE,
+    variety TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    -- the release whose metadata an alias file points to
+    alias_of TEXT,
+    -- whether the release an alias points to is missing
+    dangling INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS block_types (
+    file_path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    slug TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS block_schemas (
+    file_path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    block_type_slug TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    schema_version TEXT
+);
+CREATE TABLE IF NOT EXISTS worker_types (
+    file_path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    display_name TEXT
+);
+CREATE TABLE IF NOT EXISTS flows (
+    file_path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    slug TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS block_types_slug ON block_types (slug);
+CREATE INDEX IF NOT EXISTS block_schemas_checksum ON block_schemas (checksum);
+CREATE INDEX IF NOT EXISTS worker_types_type ON worker_types (type);
+CREATE INDEX IF NOT EXISTS files_version ON files (version_id);
+"""
+
+# the tables holding the metadata indexed for each file
+METADATA_TABLES = ("block_types", "block_schemas", "worker_types", "flows")
+
+VARIETY_DIRECTORIES: dict[str, "CollectionViewVariety"] = {
+    "blocks": "block",
+    "flows": "flow",
+    "workers": "worker",
+}
+
+
+def default_index_path() -> Path:
+    """Returns the default location of the index, in the cache directory."""
+    return get_cache_dir() / "collection-index.sqlite"
+
+
+class CollectionIndex:
+    """A SQLite index over the versioned metadata files in `collections/`.
+
+    `update` only parses files whose size or modification time changed since
+    they were last indexed, and whose content hash differs from the indexed one.
+    Aliases are indexed with the metadata of the release they point to, and
+    again whenever that release changes; aliases of missing releases are
+    indexed without metadata and listed by `dangling_aliases`.
+    """
+
+    def __init__(self, path: Path | None = None, root: Path = Path("collections")):
+        self.path = path or default_index_path()
+        self.root = root
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        (user_version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if user_version != SCHEMA_VERSION:
+            self._drop_tables()
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _drop_tables(self) -> None:
+        tables = self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()
+        self.connection.execute("PRAGMA foreign_keys = OFF")
+        for (table,) in tables:
+            self.connection.execute(f"DROP TABLE {table}")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+
+    def __enter__(self) -> "CollectionIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _metadata_files(self) -> Iterator[tuple[str, str, "CollectionViewVariety"]]:
+        """Yields the package name, version and variety of each metadata file."""
+        for path in sorted(self.root.glob("*/*/*.json")):
+            package_dir, variety_dir = path.parent.parent, path.parent
+            if variety := VARIETY_DIRECTORIES.get(variety_dir.name):
+                yield package_dir.name, path.stem, variety
+
+    def update(self) -> int:
+        """Indexes new and changed files and drops deleted ones, returning the
+        number of files that were (re-)parsed.
+        """
+        indexed = {
+            path: (mtime_ns, size, sha256)
+            for path, mtime_ns, size, sha256 in self.connection.execute(
+                "SELECT path, mtime_ns, size, sha256 FROM files"
+            )
+        }
+        parsed = 0
+        changed_packages: set[str] = set()
+        changed_targets: set[str] = set()
+
+        with self.connection:
+            for package, version, variety in self._metadata_files():
+                file_path = self.root / package / f"{variety}s" / f"{version}.json"
+                key = file_path.relative_to(self.root).as_posix()
+                stat = file_path.stat()
+                previous = indexed.pop(key, None)
+                if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                    continue
+
+                content = file_path.read_bytes()
+                sha256 = hashlib.sha256(content).hexdigest()
+                if previous and previous[2] == sha256:
+                    self.connection.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (stat.st_mtime_ns, stat.st_size, key),
+                    )
+                    continue
+
+                data = from_json(content)
+                if alias_of := data.get(ALIAS_KEY):
+                    # index the metadata of the release the alias points to
+                    data = self._read_alias_target(file_path, alias_of)
+                else:
+                    changed_targets.add(key)
+
+                self.connection.execute("DELETE FROM files WHERE path = ?", (key,))
+                version_id = self._version_id(package, version)
+                self.connection.execute(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        version_id,
+                        variety,
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        sha256,
+                        alias_of,
+                        data is None,
+                    ),
+                )
+                self._ingest(key, variety, (data or {}).get(package) or {})
+                changed_packages.add(package)
+                parsed += 1
+
+            for key in indexed:
+                self.connection.execute("DELETE FROM files WHERE path = ?", (key,))
+                changed_packages.add(key.split("/", 1)[0])
+            self._reingest_aliases(changed_targets | set(indexed))
+            self.connection.execute(
+                "DELETE FROM versions WHERE id NOT IN (SELECT version_id FROM files)"
+            )
+            for package in changed_packages:
+                self._rank_versions(package)
+
+        return parsed
+
+    def _read_alias_target(
+        self, file_path: Path, alias_of: str
+    ) -> dict[str, Any] | None:
+        """Returns the metadata of the release an alias file points to, or `None`
+        if that release is missing.
+        """
+        try:
+            return from_json(file_path.with_stem(alias_of).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def _reingest_aliases(self, targets: set[str]) -> None:
+        """Indexes the aliases of releases that changed or were removed again,
+        with the metadata those releases have now.
+        """
+        aliases = self.connection.execute(
+            "SELECT path, variety, alias_of FROM files WHERE alias_of IS NOT NULL"
+        ).fetchall()
+        for key, variety, alias_of in aliases:
+            if f"{key.rsplit('/', 1)[0]}/{alias_of}.json" not in targets:
+                continue
+            for table in METADATA_TABLES:
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE file_path = ?", (key,)
+                )
+            data = self._read_alias_target(self.root / key, alias_of)
+            self.connection.execute(
+                "UPDATE files SET dangling = ? WHERE path = ?", (data is None, key)
+            )
+            package = key.split("/", 1)[0]
+            self._ingest(key, variety, (data or {}).get(package) or {})
+
+    def _version_id(self, package: str, version: str) -> int:
+        self.connection.execute(
+            "INSERT OR IGNORE INTO packages (name) VALUES (?)", (package,)
+        )
+        (package_id,) = self.connection.execute(
+            "SELECT id FROM packages WHERE name = ?", (package,)
+        ).fetchone()
+        self.connection.execute(
+            "INSERT OR IGNORE INTO versions (package_id, version) VALUES (?, ?)",
+            (package_id, version),
+        )
+        (version_id,) = self.connection.execute(
+            "SELECT id FROM versions WHERE package_id = ? AND version = ?",
+            (package_id, version),
+        ).fetchone()
+        return version_id
+
+    def _ingest(
+        self, key: str, variety: "CollectionViewVariety", metadata: dict[str, Any]
+    ) -> None:
+        if variety == "block":
+            for slug, block_type in metadata.get("block_types", {}).items():
+                self.connection.execute(
+                    "INSERT INTO block_types VALUES (?, ?, ?)",
+                    (key, slug, block_type.get("name", slug)),
+                )
+                if block_schema := block_type.get("block_schema"):
+                    self.connection.execute(
+                        "INSERT INTO block_schemas VALUES (?, ?, ?, ?)",
+                        (
+                            key,
+                            slug,
+                            block_schema["checksum"],
+                            block_schema.get("version"),
+                        ),
+                    )
+        elif variety == "worker":
+            for worker_type, worker in metadata.items():
+                self.connection.execute(
+                    "INSERT INTO worker_types VALUES (?, ?, ?)",
+                    (key, worker_type, worker.get("display_name")),
+                )
+        else:
+            for flow_name, flow in metadata.items():
+                self.connection.execute(
+                    "INSERT INTO flows VALUES (?, ?, ?)",
+                    (key, flow.get("name", flow_name), flow.get("slug", flow_name)),
+                )
+
+    def _rank_versions(self, package: str) -> None:
+        rows = self.connection.execute(
+            "SELECT versions.id, versions.version FROM versions "
+            "JOIN packages ON packages.id = versions.package_id "
+            "WHERE packages.name = ?",
+            (package,),
+        ).fetchall()
+        ranked = sorted(rows, key=lambda row: version_sort_key(row[1]))
+        self.connection.executemany(
+            "UPDATE versions SET position = ? WHERE id = ?",
+            [(position, version_id) for position, (version_id, _) in enumerate(ranked)],
+        )
+
+    def versions(
+        self, package: str, variety: "CollectionViewVariety | None" = None
+    ) -> list[str]:
+        """Returns the recorded versions of a package, oldest first."""
+        rows = self.connection.execute(
+            "SELECT DISTINCT versions.version, versions.position FROM versions "
+            "JOIN packages ON packages.id = versions.package_id "
+            "JOIN files ON files.version_id = versions.id "
+            "WHERE packages.name = ? AND (?2 IS NULL OR files.variety = ?2) "
+            "ORDER BY versions.position",
+            (package, variety),
+        )
+        return [version for version, _ in rows]
+
+    def latest_versions(
+        self, variety: "CollectionViewVariety | None" = None
+    ) -> dict[str, str]:
+        """Returns the latest recorded version of each package."""
+        rows = self.connection.execute(
+            "SELECT packages.name, versions.version FROM versions "
+            "JOIN packages ON packages.id = versions.package_id "
+            "JOIN files ON files.version_id = versions.id "
+            "WHERE ?1 IS NULL OR files.variety = ?1 "
+            "GROUP BY packages.id HAVING versions.position = MAX(versions.position) "
+            "ORDER BY packages.name",
+            (variety,),
+        )
+        return dict(rows.fetchall())
+
+    def dangling_aliases(self) -> list[str]:
+        """Returns the paths of the alias files whose release is missing."""
+        rows = self.connection.execute(
+            "SELECT path FROM files WHERE dangling ORDER BY path"
+        )
+        return [path for (path,) in rows]
+
+    def _versions_of_files(self, table: str, column: str, value: str) -> list[Any]:
+        return self.connection.execute(
+            "SELECT DISTINCT packages.name, versions.version FROM versions "
+            "JOIN packages ON packages.id = versions.package_id "
+            "JOIN files ON files.version_id = versions.id "
+            f"JOIN {table} ON {table}.file_path = files.path "
+            f"WHERE {table}.{column} = ? "
+            "ORDER BY packages.name, versions.position",
+            (value,),
+        ).fetchall()
+
+    def versions_with_block_type(self, slug: str) -> list[tuple[str, str]]:
+        """Returns the (package, version) pairs that shipped a block type."""
+        return self._versions_of_files("block_types", "slug", slug)
+
+    def versions_with_block_schema(self, checksum: str) -> list[tuple[str, str]]:
+        """Returns the (package, version) pairs that shipped a block schema."""
+        return self._versions_of_files("block_schemas", "checksum", checksum)
+
+    def versions_with_worker_type(self, worker_type: str) -> list[tuple[str, str]]:
+        """Returns the (package, version) pairs that shipped a worker type."""
+        return self._versions_of_files("worker_types", "type", worker_type)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Query the collection index, updating it first."""
+    parser = argparse.ArgumentParser(
+        prog="python -m prefect_collection_registry.collection_index",
+        description=main.__doc__,
+    )
+    parser.add_argument("--db", type=Path, default=None, help="index database path")
+    parser.add_argument(
+        "--root", type=Path, default=Path("collections"), help="collections directory"
+    )
+    variety_choices = sorted(VARIETY_DIRECTORIES.values())
+    commands = parser.add_subparsers(dest="command", required=True)
+    versions = commands.add_parser("versions", help="versions of a package")
+    versions.add_argument("package")
+    versions.add_argument("--variety", choices=variety_choices)
+    latest = commands.add_parser("latest", help="latest version of each package")
+    latest.add_argument("--variety", choices=variety_choices)
+    commands.add_parser("block", help="versions shipping a block type").add_argument(
+        "slug"
+    )
+    commands.add_parser(
+        "checksum", help="versions shipping a block schema"
+    ).add_argument("checksum")
+    commands.add_parser("worker", help="versions shipping a worker type").add_argument(
+        "type"
+    )
+    args = parser.parse_args(argv)
+
+    with CollectionIndex(args.db, args.root) as index:
+        start = time.perf_counter()
+        parsed = index.update()
+        print(f"Indexed {parsed} changed file(s) in {time.perf_counter() - start:.2f}s")
+        for path in index.dangling_aliases():
+            print(f"Skipped {path}, an alias of a missing release")
+
+        if args.command == "versions":
+            print("\n".join(index.versions(args.package, args.variety)))
+        elif args.command == "latest":
+            for package, version in index.latest_versions(args.variety).items():
+                print(f"{package} {version}")
+        else:
+            query = {
+                "block": lambda: index.versions_with_block_type(args.slug),
+                "checksum": lambda: index.versions_with_block_schema(args.checksum),
+                "worker": lambda: index.versions_with_worker_type(args.type),
+            }[args.command]
+            for package, version in query():
+                print(f"{package} {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from pydantic_core import from_json
+
+from prefect_collection_registry import serialization
+from prefect_collection_registry.utils import (
+    CollectionViewVariety,
+    create_blob,
+    create_commit,
+    create_tree,
+    get_commit_sha,
+    get_commit_tree_sha,
+    get_large_file_contents,
+    get_tree_blob_shas,
+    git_blob_sha,
+    merge_aggregate_view,
+    record_skipped_write,
+    update_repo_ref,
+)
+from prefect_collection_registry.versions import ALIAS_KEY
+
+VIEW_VARIETIES: tuple[CollectionViewVariety, ...] = ("block", "flow", "worker")
+
+
+class CommitBuilder:
+    """Collects file writes and submits them to a branch as a single commit
+    using the Git Data API (blobs, trees, commits and refs).
+    """
+
+    def __init__(
+        self,
+        branch_name: str,
+        repo_owner: str = "PrefectHQ",
+        repo_name: str = "prefect-collection-registry",
+    ):
+        self.branch_name = branch_name
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.files: dict[str, str] = {}
+        self.removed_files: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self.removed_files)
+
+    def add_file(self, path: str, content: str) -> None:
+        """Stages a file to be written at `path` in the next commit."""
+        path = str(PurePosixPath(path))
+        self.removed_files.discard(path)
+        self.files[path] = content
+
+    def remove_file(self, path: str) -> None:
+        """Stages the removal of the file at `path`, if it exists on the branch."""
+        path = str(PurePosixPath(path))
+        self.files.pop(path, None)
+        self.removed_files.add(path)
+
+    def dump(self, directory: Path) -> None:
+        """Writes all staged files below `directory`, mirroring their repo paths."""
+        for path, content in self.files.items():
+            file_path = directory / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content)
+
+    def load(self, directory: Path) -> None:
+        """Stages every file found below `directory`, e.g. one written by `dump`."""
+        for file_path in sorted(directory.rglob("*")):
+            if file_path.is_file():
+                self.add_file(
+                    file_path.relative_to(directory).as_posix(), file_path.read_text()
+                )
+
+    def staged_collection_metadata(
+        self, variety: CollectionViewVariety, files: dict[str, str] | None = None
+    ) -> dict[str, Any]:
+        """Returns the metadata of every staged versioned file of a variety (or
+        of those in `files`), keyed by collection name. Aliases to earlier
+        releases are left out, as their metadata is already in the aggregate view.
+        """
+        staged: dict[str, Any] = {}
+        for path, content in sorted((self.files if files is None else files).items()):
+            parts = PurePosixPath(path).parts
+            if len(parts) == 4 and parts[::2] == ("collections", f"{variety}s"):
+                metadata = from_json(content)
+                if ALIAS_KEY not in metadata:
+                    staged.update(metadata)
+        return staged
+
+    async def add_aggregate_views(self, files: dict[str, str] | None = None) -> None:
+        """Merges the staged versioned files (or those in `files`, e.g. ones
+        committed earlier) into the aggregate views on the branch and stages the
+        updated views, reading each view only once.
+        """
+        for variety in VIEW_VARIETIES:
+            staged = self.staged_collection_metadata(variety, files)
+            if not any(staged.values()):
+                continue
+
+            metadata_file = f"views/aggregate-{variety}-metadata.json"
+            existing_metadata_dict: dict[str, Any] = {}
+            if existing := await get_large_file_contents(
+                self.repo_owner, self.repo_name, metadata_file, self.branch_name
+            ):
+                existing_metadata_dict = from_json(existing[0])
+
+            self.add_file(
+                metadata_file,
+                serialization.dumps_text(
+                    merge_aggregate_view(existing_metadata_dict, staged, variety)
+                ),
+            )
+
+    async def commit(self, message: str) -> str | None:
+        """Writes all staged files to the branch as one commit.
+
+        Files whose content is already on the branch, and removals of files
+        that aren't on it, are left out. Returns the SHA of the new commit, or
+        `None` if nothing staged differs from the branch.
+        """
+        if self.branch_name == "main":
+            raise ValueError("Cannot submit updates directly to main!")
+        if not self:
+            print("No staged files to commit.")
+            return None
+
+        parent_sha = await get_commit_sha(
+            self.repo_owner, self.repo_name, self.branch_name
+        )
+        base_tree = await get_commit_tree_sha(
+            self.repo_owner, self.repo_name, parent_sha
+        )
+
+        existing = await get_tree_blob_shas(self.repo_owner, self.repo_name, base_tree)
+        changed_files: dict[str, str] = {}
+        for path, content in sorted(self.files.items()):
+            if existing.get(path) == git_blob_sha(content):
+                record_skipped_write(path)
+            else:
+                changed_files[path] = content
+        removed_files = sorted(self.removed_files.intersection(existing))
+        if not changed_files and not removed_files:
+            print(f"All staged files are already on {self.branch_name!r}.")
+            return None
+
+        tree_entries: list[dict[str, Any]] = [
+            {
+                "path": path,
+                "mode": "100644",
+                "type": "blob",
+                "sha": await create_blob(self.repo_owner, self.repo_name, content),
+            }
+            for path, content in changed_files.items()
+        ]
+        # a null SHA removes the file from the tree
+        tree_entries.extend(
+            {"path": path, "mode": "100644", "type": "blob", "sha": None}
+            for path in removed_files
+        )
+        tree_sha = await create_tree(
+            self.repo_owner, self.repo_name, tree_entries, base_tree=base_tree
+        )
+        commit_sha = await create_commit(
+            self.repo_owner, self.repo_name, message, tree_sha, [parent_sha]
+        )
+        await update_repo_ref(
+            self.repo_owner, self.repo_name, f"heads/{self.branch_name}", commit_sha
+        )
+        print(
+            f"Committed {len(changed_files) + len(removed_files)} file(s) to "
+            f"{self.branch_name!r} as {commit_sha[:7]}!"
+        )
+        return commit_sha
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from prefect_collection_registry.paths import get_cache_dir
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# written once an environment is fully installed, so that a half-built
+# environment (e.g. from a killed run) is never reused
+COMPLETE_MARKER = ".complete"
+
+# how often to retry taking the lock on an environment being built elsewhere
+LOCK_POLL_SECONDS = 0.1
+
+
+def _try_lock(file: IO[bytes]) -> bool:
+    """Takes an exclusive lock on an open file without blocking, returning
+    whether it was taken. The lock is released when the file is closed.
+    """
+    try:
+        if sys.platform == "win32":
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+@asynccontextmanager
+async def lock_environment(path: Path) -> AsyncIterator[None]:
+    """Holds an exclusive lock on an environment while it is checked or built.
+
+    The lock is a file next to the environment, so that updates in other
+    processes, or with other `EnvironmentManager`s, are serialized too. It
+    isn't kept inside the environment, which is removed when it's rebuilt.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.parent / f"{path.name}.lock", "wb") as lock_file:
+        while not _try_lock(lock_file):
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+        yield
+
+
+@dataclass
+class CollectionEnvironment:
+    """A virtual environment with a collection and its resolved dependencies."""
+
+    collection_name: str
+    path: Path
+    lock: str
+    reused: bool
+
+    @property
+    def python(self) -> Path:
+        if sys.platform == "win32":
+            return self.path / "Scripts" / "python.exe"
+        return self.path / "bin" / "python"
+
+
+class EnvironmentManager:
+    """Creates and reuses one virtual environment per collection and set of
+    resolved dependencies.
+
+    Requirements are resolved with `uv pip compile` on every call, refreshing
+    the collection's index metadata, so that the newest release is always
+    picked up. The resulting pins are hashed, and an environment is only reused
+    if it was built from exactly the same pins. Wheels are shared between
+    environments through uv's content-addressed cache.
+
+    With `offline=True`, packages are only resolved from the `wheelhouse`
+    directory and the network is never used.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        project_requirement: str | None = None,
+        python: str = sys.executable,
+        wheelhouse: Path | None = None,
+        offline: bool = False,
+        uv: str = "uv",
+    ):
+        if offline and wheelhouse is None:
+            raise ValueError("A wheelhouse is required to resolve offline.")
+
+        self.root = root or get_cache_dir() / "environments"
+        self.project_requirement = project_requirement
+        self.python = python
+        self.wheelhouse = wheelhouse
+        self.offline = offline
+        self.uv = uv
+
+    @property
+    def uv_cache_dir(self) -> Path:
+        return self.root / "uv-cache"
+
+    def _index_args(self) -> list[str]:
+        args: list[str] = []
+        if self.wheelhouse is not None:
+            args += ["--find-links", str(self.wheelhouse)]
+        if self.offline:
+            args += ["--offline", "--no-index"]
+        return args
+
+    async def _uv(self, *args: str, stdin: str | None = None) -> str:
+        process = await asyncio.create_subprocess_exec(
+            self.uv,
+            *args,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env={**os.environ, "UV_CACHE_DIR": str(self.uv_cache_dir)},
+        )
+        stdout, stderr = await process.communicate(
+            stdin.encode() if stdin is not None else None
+        )
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"`uv {' '.join(args)}` failed with exit code "
+                f"{process.returncode}:\n{stderr.decode()}"
+            )
+        return stdout.decode()
+
+    async def resolve(self, collection_name: str) -> str:
+        """Resolves the newest versions of the collection and its dependencies
+        to a set of pinned requirements.
+        """
+        requirements = [collection_name]
+        if self.project_requirement:
+            requirements.insert(0, self.project_requirement)
+
+        return await self._uv(
+            "pip",
+            "compile",
+            "-",
+            "--python",
+            self.python,
+            "--no-header",
+            "--no-annotate",
+            "--quiet",
+            *([] if self.offline else ["--refresh-package", collection_name]),
+            *self._index_args(),
+            stdin="\n".join(requirements),
+        )
+
+    async def ensure(
+        self, collection_name: str, lock: str | None = None
+    ) -> CollectionEnvironment:
+        """Returns an environment with the newest release of a collection
+        installed, reusing an existing one if its pins are unchanged.
+
+        Pins already resolved by `resolve` can be passed as `lock`.
+        """
+        if lock is None:
+            lock = await self.resolve(collection_name)
+        lock_hash = hashlib.sha256(lock.encode()).hexdigest()[:16]
+        path = self.root / f"{collection_name}-{lock_hash}"
+
+        environment = CollectionEnvironment(collection_name, path, lock, reused=False)
+
+        async with lock_environment(path):
+            if (path / COMPLETE_MARKER).exists():
+                # record the last use for `prune`
+                (path / COMPLETE_MARKER).touch()
+                environment.reused = True
+                return environment
+
+            shutil.rmtree(path, ignore_errors=True)
+            await self._uv("venv", str(path), "--python", self.python, "--quiet")
+            (path / "requirements.lock").write_text(lock)
+            await self._uv(
+                "pip",
+                "sync",
+                str(path / "requirements.lock"),
+                "--python",
+                str(environment.python),
+                "--quiet",
+                *self._index_args(),
+            )
+            (path / COMPLETE_MARKER).touch()
+
+        return environment
+
+    def prune(self, keep: int = 1) -> list[Path]:
+        """Removes all but the `keep` most recently used environments of each
+        collection, returning the removed paths.
+        """
+        environments: dict[str, list[Path]] = {}
+        for marker in self.root.glob(f"*/{COMPLETE_MARKER}"):
+            collection_name = marker.parent.name.rsplit("-", 1)[0]
+            environments.setdefault(collection_name, []).append(marker.parent)
+
+        removed: list[Path] = []
+        for paths in environments.values():
+            paths.sort(key=lambda path: (path / COMPLETE_MARKER).stat().st_mtime)
+            for path in paths[: max(0, len(paths) - keep)]:
+                shutil.rmtree(path, ignore_errors=True)
+                (path.parent / f"{path.name}.lock").unlink(missing_ok=True)
+                removed.append(path)
+        return removed
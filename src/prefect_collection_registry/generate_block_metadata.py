@@ -1,6 +1,5 @@
 import importlib
 import inspect
-import json
 import logging
 from abc import ABC
 from importlib.metadata import entry_points
@@ -9,13 +8,11 @@ from types import ModuleType
 from typing import Any
 from uuid import uuid4
 
-import fastjsonschema
-from prefect import task
 from prefect.blocks.core import Block
 from prefect.plugins import safe_load_entrypoints
 
-from prefect_collection_registry import utils
-from prefect_collection_registry.metadata_schemas import block_schema
+from prefect_collection_registry import serialization
+from prefect_collection_registry.validators import get_validator
 
 # Some collection blocks share names with core blocks. We exclude them
 # from the registry for now to avoid confusion.
@@ -50,8 +47,8 @@ def generate_block_metadata(block_subcls: type[Block]) -> dict[str, Any]:
     block_type_dict["block_schema"]["capabilities"] = sorted(
         block_type_dict["block_schema"]["capabilities"]
     )
-    validate = fastjsonschema.compile(block_schema)  # type: ignore
-    validate(block_type_dict)  # type: ignore
+    validate = get_validator("block")
+    validate(block_type_dict)
 
     return block_type_dict
 
@@ -149,17 +146,4 @@ def write_block_metadata(collection_metadata: dict[str, Any], collection_name: s
         Path("collections") / collection_name / "blocks" / f"{collection_version}.json"
     )
     collection_metadata_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(collection_metadata_path, "w") as f:
-        json.dump(collection_metadata, f, indent=2)
-
-
-@task(name="update-block-metadata-for-collection")
-async def update_block_metadata_for_collection(collection_name: str, branch_name: str):
-    """Generates and submits block metadata for a given collection."""
-    block_metadata = generate_block_metadata_for_collection(collection_name)
-    await utils.submit_updates(
-        collection_metadata=block_metadata,
-        collection_name=collection_name,
-        branch_name=branch_name,
-        variety="block",
-    )
+    serialization.write(collection_metadata_path, collection_metadata)
@@ -2,18 +2,15 @@ from collections import defaultdict
 from collections.abc import Callable
 from typing import Any
 
-import fastjsonschema
 from griffe import Docstring, DocstringSectionKind, Parser, parse
 from prefect import Flow, task
-from prefect.states import Completed
-from prefect.utilities.importtools import load_module
 
-from prefect_collection_registry.metadata_schemas import flow_schema
+from prefect_collection_registry.import_profiler import load_module
 from prefect_collection_registry.utils import (
     find_flows_in_module,
     get_logo_url_for_collection,
-    submit_updates,
 )
+from prefect_collection_registry.validators import get_validator
 
 SKIP_DOCSTRING_SECTIONS = {"parameters", "raises"}
 
@@ -92,8 +89,8 @@ def summarize_flow(flow: Flow[..., Any], collection_name: str) -> dict[str, Any]
             }.items()
         )
     )
-    validate = fastjsonschema.compile(flow_schema)  # type: ignore
-    validate(flow_summary)  # type: ignore
+    validate = get_validator("flow")
+    validate(flow_summary)
     return flow_summary
 
 
@@ -109,18 +106,3 @@ def generate_flow_metadata(collection_name: str) -> dict[str, Any]:
         flow.fn.__name__: summarize_flow(flow, collection_name)
         for flow in find_flows_in_module(collection_slug)
     }
-
-
-@task(name="update-flow-metadata-for-collection")
-async def update_flow_metadata_for_collection(collection_name: str, branch_name: str):
-    """Generates and submits flow metadata for a given collection."""
-    if collection_name == "prefect":
-        return Completed(message="No flow metadata to update for Prefect core.")
-
-    collection_flow_metadata = generate_flow_metadata(collection_name)
-    await submit_updates(
-        collection_metadata=collection_flow_metadata,
-        collection_name=collection_name,
-        branch_name=branch_name,
-        variety="flow",
-    )
@@ -1,6 +1,5 @@
 import importlib
 import inspect
-import json
 import logging
 from importlib.metadata import entry_points
 from pathlib import Path
@@ -8,15 +7,14 @@ from sys import argv
 from types import ModuleType
 from typing import Any
 
-import fastjsonschema
 from prefect import task
 from prefect.plugins import safe_load_entrypoints
 from prefect.utilities.dispatch import get_registry_for_type
 from prefect.utilities.importtools import to_qualified_name
 from prefect.workers.base import BaseWorker
 
-from prefect_collection_registry.metadata_schemas import worker_schema
-from prefect_collection_registry.utils import submit_updates
+from prefect_collection_registry import serialization
+from prefect_collection_registry.validators import get_validator
 
 # `block` work pool types should only be created via
 # `Infrastructure.publish_as_work_pool`
@@ -47,8 +45,8 @@ def generate_worker_metadata(
             }.items()
         )
     )
-    validate = fastjsonschema.compile(worker_schema)  # type: ignore
-    validate(worker_metadata)  # type: ignore
+    validate = get_validator("worker")
+    validate(worker_metadata)
 
     return worker_metadata
 
@@ -140,8 +138,7 @@ def write_worker_metadata(worker_metadata: dict[str, Any], package_name: str):
         Path("collections") / package_name / "workers" / f"v{package_version}.json"
     )
     collection_metadata_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(collection_metadata_path, "w") as f:
-        json.dump(worker_metadata, f, indent=2)
+    serialization.write(collection_metadata_path, worker_metadata)
 
 
 @task
@@ -153,18 +150,6 @@ def generate_worker_metadata_for_package(package_name: str) -> dict[str, Any]:
         return get_worker_metadata_from_collection(package_name)
 
 
-@task
-async def update_worker_metadata_for_package(package_name: str, branch_name: str):
-    """Generates and submits worker metadata for a given package."""
-    worker_metadata = generate_worker_metadata_for_package(package_name=package_name)
-    await submit_updates(
-        collection_metadata=worker_metadata,
-        collection_name=package_name,
-        branch_name=branch_name,
-        variety="worker",
-    )
-
-
 if __name__ == "__main__":
     package_name = argv[1]
     worker_metadata = generate_worker_metadata_for_package(package_name=argv[1])
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import re
+import time
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from pydantic_core import from_json
+
+from prefect_collection_registry import serialization
+from prefect_collection_registry.paths import atomic_write, get_cache_dir
+
+# a `name==version` pin, as written by `uv pip compile`
+PIN_PATTERN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==(\S+)", re.MULTILINE)
+
+
+def canonical_name(name: str) -> str:
+    """Normalizes a package name as PyPI does, e.g. `Prefect_AWS` to `prefect-aws`."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def pinned_versions(lock: str) -> dict[str, str]:
+    """Returns the version of each package pinned in a set of requirements."""
+    return {
+        canonical_name(name): version for name, version in PIN_PATTERN.findall(lock)
+    }
+
+
+@cache
+def generator_source_hash() -> str:
+    """Returns a hash of the source of this package, which generated metadata
+    depends on besides the versions of the installed packages.
+    """
+    root = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode() + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class GenerationKey:
+    """What the metadata generated for a collection release depends on."""
+
+    package: str
+    version: str
+    prefect_version: str
+    # every other pin (e.g. pydantic) can change the generated schemas too
+    pins_hash: str
+    generator_hash: str
+
+    @classmethod
+    def from_lock(cls, package: str, lock: str) -> "GenerationKey | None":
+        """Returns the key of a collection installed from a set of pinned
+        requirements, or `None` if the collection or Prefect isn't pinned.
+        """
+        versions = pinned_versions(lock)
+        version = versions.get(canonical_name(package))
+        prefect_version = versions.get("prefect")
+        if version is None or prefect_version is None:
+            return None
+        return cls(
+            package,
+            version,
+            prefect_version,
+            serialization.content_hash(versions),
+            generator_source_hash(),
+        )
+
+    @property
+    def digest(self) -> str:
+        return serialization.content_hash(asdict(self))
+
+
+@dataclass
+class CacheEntry:
+    """A cached result, as listed by `GenerationCache.entries`."""
+
+    path: Path
+    key: GenerationKey
+    size: int
+    last_used: float
+
+
+class GenerationCache:
+    """A content-addressed local cache of the metadata generated for collection
+    releases.
+
+    Entries are keyed by a hash of their `GenerationKey`, so that a change to
+    the collection, any of its resolved dependencies or this registry's code
+    misses the cache. Reading
+    an entry records its use for `prune`.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or get_cache_dir() / "generation"
+
+    def _path(self, key: GenerationKey) -> Path:
+        return self.root / f"{key.digest}.json"
+
+    def get(self, key: GenerationKey) -> dict[str, Any] | None:
+        """Returns the metadata generated for a key, or `None` on a miss."""
+        path = self._path(key)
+        try:
+            entry = from_json(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        path.touch()
+        return entry["metadata"]
+
+    def put(self, key: GenerationKey, metadata: dict[str, Any]) -> None:
+        atomic_write(
+            self._path(key),
+            serialization.dumps({"key": asdict(key), "metadata": metadata}),
+        )
+
+    def entries(self) -> list[CacheEntry]:
+        """Returns every readable entry, most recently used first."""
+        entries: list[CacheEntry] = []
+        for path in self.root.glob("*.json"):
+            try:
+                key = GenerationKey(**from_json(path.read_bytes())["key"])
+                stat = path.stat()
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            entries.append(CacheEntry(path, key, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry.last_used, reverse=True)
+
+    def prune(
+        self, max_age_days: float | None = None, stale: bool = False
+    ) -> list[CacheEntry]:
+        """Removes the entries last used more than `max_age_days` ago and, with
+        `stale`, those generated by other versions of this registry's code.
+        With neither, removes every entry. Returns the removed entries.
+        """
+        removed: list[CacheEntry] = []
+        for entry in self.entries():
+            too_old = (
+                max_age_days is not None
+                and time.time() - entry.last_used > max_age_days * 86400
+            )
+            is_stale = stale and entry.key.generator_hash != generator_source_hash()
+            if too_old or is_stale or (max_age_days is None and not stale):
+                entry.path.unlink(missing_ok=True)
+                removed.append(entry)
+        return removed
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Inspect or prune the cache of generated collection metadata."""
+    parser = argparse.ArgumentParser(
+        prog="python -m prefect_collection_registry.generation_cache",
+        description=main.__doc__,
+    )
+    parser.add_argument("--dir", type=Path, default=None, help="cache directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the cached entries")
+    prune = commands.add_parser("prune", help="remove cached entries (all by default)")
+    prune.add_argument(
+        "--older-than", type=float, metavar="DAYS", help="only those unused for DAYS"
+    )
+    prune.add_argument(
+        "--stale",
+        action="store_true",
+        help="only those generated by other versions of the registry's code",
+    )
+    args = parser.parse_args(argv)
+
+    generation_cache = GenerationCache(args.dir)
+    if args.command == "list":
+        current_hash = generator_source_hash()
+        for entry in generation_cache.entries():
+            print(
+                f"{entry.key.package} {entry.key.version} "
+                f"(prefect {entry.key.prefect_version}, "
+                f"{'current' if entry.key.generator_hash == current_hash else 'stale'}"
+                f" generator) {entry.size / 1024:.0f} KB, last used "
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.last_used))}"
+            )
+    else:
+        removed = generation_cache.prune(args.older_than, args.stale)
+        print(
+            f"Removed {len(removed)} cached entr{'y' if len(removed) == 1 else 'ies'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from prefect_collection_registry.paths import atomic_write
+
+# Only these headers are stored; content encoding and length no longer apply to
+# the decoded body that is cached.
+CACHED_HEADERS = (
+    "content-type",
+    "etag",
+    "last-modified",
+    "link",
+    "x-pypi-last-serial",
+)
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    """The decoded body and selected headers of a cached response."""
+
+    url: str
+    headers: dict[str, str]
+    content: bytes
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("last-modified")
+
+
+class ResponseCache:
+    """An on-disk cache of `GET` responses that carry an `ETag` or
+    `Last-Modified` validator, evicting the least recently used entries once the
+    cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        # GitHub serves different representations of a URL depending on `Accept`
+        accept = request.headers.get("Accept", "")
+        return hashlib.sha256(f"{request.url}\n{accept}".encode()).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def get(self, key: str) -> CachedResponse | None:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            content = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        # the modification time of the metadata file records the last use
+        os.utime(meta_path)
+        return CachedResponse(meta["url"], meta["headers"], content)
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        meta_path, body_path = self._paths(key)
+        atomic_write(body_path, response.content)
+        atomic_write(
+            meta_path,
+            json.dumps({"url": response.url, "headers": response.headers}).encode(),
+        )
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[float, int, str]] = []
+            total = 0
+            for meta_path in self.directory.glob("*.json"):
+                key = meta_path.stem
+                try:
+                    size = meta_path.stat().st_size + self._paths(key)[1].stat().st_size
+                    entries.append((meta_path.stat().st_mtime, size, key))
+                except OSError:
+                    continue
+                total += size
+
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in self._paths(key):
+                    path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+
+    def summary(self) -> str:
+        """Describes how many requests were answered from the cache."""
+        return (
+            f"HTTP cache: {self.hits} hits (304 Not Modified), {self.misses} misses, "
+            f"{self.evictions} evicted"
+        )
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Makes `GET` requests conditional on a previously cached response and
+    answers `304 Not Modified` responses from the cache.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache: ResponseCache):
+        self.transport = transport
+        self.cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+
+        key = self.cache.key(request)
+        if cached := self.cache.get(key):
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self.transport.handle_async_request(request)
+
+        if cached and response.status_code == 304:
+            await response.aclose()
+            self.cache.hits += 1
+            return httpx.Response(
+                200, headers=cached.headers, content=cached.content, request=request
+            )
+
+        self.cache.misses += 1
+        if response.status_code != 200 or not (
+            "etag" in response.headers or "last-modified" in response.headers
+        ):
+            return response
+
+        content = await response.aread()
+        cached_headers = {
+            name: response.headers[name]
+            for name in CACHED_HEADERS
+            if name in response.headers
+        }
+        self.cache.set(key, CachedResponse(str(request.url), cached_headers, content))
+        return httpx.Response(
+            200,
+            headers=[
+                (name, value)
+                for name, value in response.headers.multi_items()
+                if name
+                not in ("content-encoding", "content-length", "transfer-encoding")
+            ],
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from prefect.utilities.importtools import load_module as _load_module
+
+from prefect_collection_registry.paths import atomic_write
+
+DEFAULT_WALL_THRESHOLD_SECONDS = 10.0
+DEFAULT_MEMORY_THRESHOLD_MB = 256.0
+
+_current_profiler: ContextVar["ImportProfiler | None"] = ContextVar(
+    "import_profiler", default=None
+)
+
+
+def get_current_profiler() -> "ImportProfiler | None":
+    """Returns the profiler activated in the current context, if any."""
+    return _current_profiler.get()
+
+
+@dataclass
+class ModuleImport:
+    """What importing a module (or loading an entry point) cost."""
+
+    name: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: int
+    error: str | None = None
+
+    @property
+    def peak_memory_mb(self) -> float:
+        return self.peak_memory_bytes / (1024 * 1024)
+
+
+@dataclass
+class ImportReport:
+    """The imports recorded by an `ImportProfiler`, and the module being
+    imported when the report was last written, if any.
+    """
+
+    imports: list[ModuleImport] = field(default_factory=list)
+    in_progress: str | None = None
+
+    def write(self, path: Path) -> None:
+        # a process killed mid-write still leaves the previous report behind
+        atomic_write(
+            path,
+            json.dumps(
+                {
+                    "imports": [
+                        asdict(module_import) for module_import in self.imports
+                    ],
+                    "in_progress": self.in_progress,
+                }
+            ),
+        )
+
+    @classmethod
+    def read(cls, path: Path) -> "ImportReport":
+        """Reads a report written by `write`, or returns an empty report if the
+        file is missing or unreadable.
+        """
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls()
+        return cls(
+            [ModuleImport(**module_import) for module_import in data["imports"]],
+            data.get("in_progress"),
+        )
+
+    def flagged(
+        self,
+        wall_threshold_seconds: float = DEFAULT_WALL_THRESHOLD_SECONDS,
+        memory_threshold_mb: float = DEFAULT_MEMORY_THRESHOLD_MB,
+    ) -> list[ModuleImport]:
+        """Returns the imports that took longer or used more memory than the
+        thresholds.
+        """
+        return [
+            module_import
+            for module_import in self.imports
+            if module_import.wall_seconds > wall_threshold_seconds
+            or module_import.peak_memory_mb > memory_threshold_mb
+        ]
+
+    def markdown(
+        self,
+        wall_threshold_seconds: float = DEFAULT_WALL_THRESHOLD_SECONDS,
+        memory_threshold_mb: float = DEFAULT_MEMORY_THRESHOLD_MB,
+    ) -> str:
+        """Formats the imports as a markdown table, slowest first, marking those
+        above the thresholds.
+        """
+        flagged = {
+            id(module_import)
+            for module_import in self.flagged(
+                wall_threshold_seconds, memory_threshold_mb
+            )
+        }
+        lines: list[str] = []
+        if self.in_progress:
+            lines += [f"**Killed while importing `{self.in_progress}`**", ""]
+        lines += [
+            "| module | wall | cpu | peak memory | |",
+            "|---|---:|---:|---:|---|",
+        ]
+        for module_import in sorted(
+            self.imports, key=lambda module_import: -module_import.wall_seconds
+        ):
+            notes = []
+            if id(module_import) in flagged:
+                notes.append("**above threshold**")
+            if module_import.error:
+                notes.append(f"failed: {module_import.error}")
+            lines.append(
+                f"| `{module_import.name}` | {module_import.wall_seconds:.2f}s "
+                f"| {module_import.cpu_seconds:.2f}s "
+                f"| {module_import.peak_memory_mb:.1f} MB | {'; '.join(notes)} |"
+            )
+        return "\n".join(lines)
+
+
+class ImportProfiler:
+    """Records the wall time, CPU time and peak traced memory of each module
+    imported through `load_module` or `load_entrypoints` while it is active.
+
+    With a `report_path`, the report is rewritten before and after every
+    import, so that it names the culprit even if the process is killed during
+    an import (e.g. by the OOM killer). Since `tracemalloc` is process-wide,
+    imports made from several threads are profiled one at a time.
+    """
+
+    def __init__(self, report_path: Path | None = None):
+        self.report = ImportReport()
+        self.report_path = report_path
+        self._lock = threading.RLock()
+
+    def _write(self) -> None:
+        if self.report_path is not None:
+            self.report.write(self.report_path)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Records the cost of the import made within the block."""
+        with self._lock, self._profile(name):
+            yield
+
+    @contextmanager
+    def _profile(self, name: str) -> Iterator[None]:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+
+        self.report.in_progress = name
+        self._write()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        error: str | None = None
+        try:
+            yield
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self.report.imports.append(
+                ModuleImport(
+                    name,
+                    time.perf_counter() - wall_start,
+                    time.process_time() - cpu_start,
+                    max(0, peak - memory_before),
+                    error,
+                )
+            )
+            self.report.in_progress = None
+            self._write()
+
+    @contextmanager
+    def activate(self) -> Iterator["ImportProfiler"]:
+        """Makes this the profiler used by `load_module` and `load_entrypoints`
+        in the current context.
+        """
+        token = _current_profiler.set(self)
+        try:
+            yield self
+        finally:
+            _current_profiler.reset(token)
+
+
+def load_module(module_name: str) -> ModuleType:
+    """Imports a module, recording its cost on the current profiler, if any."""
+    if (profiler := get_current_profiler()) is None:
+        return _load_module(module_name)
+    with profiler.profile(module_name):
+        return _load_module(module_name)
+
+
+def load_entrypoints(entrypoints: Iterable[EntryPoint]) -> dict[str, Any]:
+    """Loads entry points like `prefect.plugins.safe_load_entrypoints`, capturing
+    any exceptions, and records the cost of each on the current profiler.
+    """
+    profiler = get_current_profiler()
+    results: dict[str, Any] = {}
+    for entrypoint in entrypoints:
+        try:
+            if profiler is None:
+                result = entrypoint.load()
+            else:
+                with profiler.profile(f"{entrypoint.value} (entry point)"):
+                    result = entrypoint.load()
+        except Exception as exc:
+            result = exc
+        results[entrypoint.name or entrypoint.value] = result
+    return results
@@ -0,0 +1,37 @@
+import os
+import tempfile
+from pathlib import Path
+
+CACHE_DIR_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_CACHE_DIR"
+
+# Set by the parent flow for each collection update subprocess, which writes
+# what it produces to these paths instead of returning it: the files it would
+# commit (below the staging directory), the time spent in each stage, the
+# metadata it generated (for the generation cache) and, when profiling, what
+# importing each module cost.
+STAGING_DIR_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_STAGING_DIR"
+TIMINGS_FILE_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_TIMINGS_FILE"
+GENERATED_METADATA_FILE_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_GENERATED_METADATA_FILE"
+IMPORT_REPORT_FILE_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_IMPORT_REPORT_FILE"
+
+
+def get_cache_dir() -> Path:
+    """Returns the root directory for the registry's local caches.
+
+    Defaults to `~/.cache/prefect-collection-registry` and can be moved, e.g. to a
+    persistent volume, with `PREFECT_COLLECTION_REGISTRY_CACHE_DIR`.
+    """
+    return Path(
+        os.environ.get(CACHE_DIR_ENV_VAR, "~/.cache/prefect-collection-registry")
+    ).expanduser()
+
+
+def atomic_write(path: Path, data: bytes | str) -> None:
+    """Replaces a file with new content atomically, so that readers (including
+    other processes) never see half of it, and a process killed mid-write
+    leaves the previous file behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        f.write(data.encode() if isinstance(data, str) else data)
+    os.replace(f.name, path)
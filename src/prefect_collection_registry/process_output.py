@@ -0,0 +1,82 @@
+import asyncio
+from collections import deque
+from collections.abc import Callable
+
+DEFAULT_TAIL_BYTES = 64 * 1024
+
+# the buffer limit to create subprocess streams with; longer lines are dropped
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class TailBuffer:
+    """Keeps the most recent lines written to it, up to `max_bytes` of UTF-8
+    in total.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped_lines = 0
+        # each line with its size in bytes
+        self._lines: deque[tuple[str, int]] = deque()
+
+    def append(self, line: str) -> None:
+        size = len(line.encode(errors="replace"))
+        self._lines.append((line, size))
+        self.size += size
+        while self.size > self.max_bytes and len(self._lines) > 1:
+            self.size -= self._lines.popleft()[1]
+            self.dropped_lines += 1
+
+    def lines(self) -> list[str]:
+        lines = [line for line, _ in self._lines]
+        if self.dropped_lines:
+            lines.insert(0, f"... ({self.dropped_lines} earlier lines omitted)")
+        return lines
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+
+async def _read_lines(
+    stream: asyncio.StreamReader, on_line: Callable[[str], None]
+) -> None:
+    while True:
+        try:
+            raw_line = await stream.readline()
+        except ValueError:
+            on_line("[overlong line dropped]")
+            continue
+        if not raw_line:
+            return
+        if line := raw_line.decode(errors="replace").rstrip():
+            on_line(line)
+
+
+async def stream_process_output(
+    process: asyncio.subprocess.Process,
+    on_stdout: Callable[[str], None],
+    on_stderr: Callable[[str], None],
+    timeout: float | None = None,
+) -> int:
+    """Passes each line the process writes to `on_stdout` or `on_stderr` as it
+    arrives and returns the process' exit code.
+
+    Raises `TimeoutError` after killing the process if it doesn't exit within
+    `timeout` seconds.
+    """
+    assert process.stdout is not None and process.stderr is not None
+
+    async def read_and_wait() -> int:
+        await asyncio.gather(
+            _read_lines(process.stdout, on_stdout),  # type: ignore
+            _read_lines(process.stderr, on_stderr),  # type: ignore
+        )
+        return await process.wait()
+
+    try:
+        return await asyncio.wait_for(read_and_wait(), timeout)
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
@@ -0,0 +1,88 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from prefect_collection_registry.paths import atomic_write, get_cache_dir
+
+# Points release lookups at another index, e.g. a local stand-in in tests.
+PYPI_URL_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_PYPI_URL"
+
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
+
+
+def get_pypi_url() -> str:
+    """Returns the base URL of the package index, without a trailing slash."""
+    return os.environ.get(PYPI_URL_ENV_VAR, "https://pypi.org").rstrip("/")
+
+
+def normalize_name(package_name: str) -> str:
+    """Normalizes a project name as the simple index expects (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", package_name).lower()
+
+
+def _last_serial(response: httpx.Response) -> int | None:
+    try:
+        return int(response.headers["X-PyPI-Last-Serial"])
+    except (KeyError, ValueError):
+        return None
+
+
+class PyPIReleaseWatcher:
+    """Remembers the last serial PyPI reported for each package, along with the
+    latest version at that serial.
+
+    A package's serial changes with every upload, so a `HEAD` request to its
+    simple index page is enough to tell whether the recorded version is still
+    the latest; the full JSON document is only fetched when it isn't.
+    """
+
+    def __init__(self, state_path: Path | None = None, index_url: str | None = None):
+        self.state_path = state_path or get_cache_dir() / "pypi-serials.json"
+        self.index_url = index_url
+        self.unchanged = 0
+        self.fetched = 0
+        try:
+            self.state: dict[str, dict[str, Any]] = json.loads(
+                self.state_path.read_text()
+            )
+        except (OSError, ValueError):
+            self.state = {}
+
+    async def latest_version(self, package_name: str, client: httpx.AsyncClient) -> str:
+        """Returns the latest version of a package on the index."""
+        index_url = self.index_url or get_pypi_url()
+        response = await client.head(
+            f"{index_url}/simple/{normalize_name(package_name)}/",
+            headers={"Accept": SIMPLE_JSON_CONTENT_TYPE},
+        )
+        response.raise_for_status()
+        serial = _last_serial(response)
+
+        known = self.state.get(package_name)
+        if serial is not None and known and known["serial"] == serial:
+            self.unchanged += 1
+            return known["version"]
+
+        response = await client.get(f"{index_url}/pypi/{package_name}/json")
+        response.raise_for_status()
+        version = response.json()["info"]["version"]
+        self.fetched += 1
+
+        if (serial := _last_serial(response) or serial) is not None:
+            self.state[package_name] = {"serial": serial, "version": version}
+        return version
+
+    def save(self) -> None:
+        """Writes the recorded serials to `state_path`."""
+        atomic_write(self.state_path, json.dumps(self.state, indent=2, sort_keys=True))
+
+    def summary(self) -> str:
+        """Describes how many packages had new uploads."""
+        return (
+            f"PyPI releases: {self.fetched} fetched, "
+            f"{self.unchanged} unchanged since the last run"
+        )
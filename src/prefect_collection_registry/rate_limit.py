@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+
+def _int_header(response: httpx.Response, name: str) -> int | None:
+    try:
+        return int(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parses a `Retry-After` header given either in seconds or as an HTTP date."""
+    if (value := response.headers.get("Retry-After")) is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    """Whether a response was rejected by a primary or secondary rate limit,
+    as opposed to e.g. a permissions error.
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+class GitHubRequestScheduler:
+    """Bounds the number of in-flight GitHub requests and adapts that bound to
+    the rate-limit headers GitHub returns.
+
+    Concurrency is halved whenever a request hits a (secondary) rate limit and
+    grows back by one per successful request; it is also capped as the primary
+    budget in `X-RateLimit-Remaining` runs low. Once the budget is exhausted,
+    new requests wait until `X-RateLimit-Reset`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self._condition: asyncio.Condition | None = None
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.first_remaining: int | None = None
+        self.reset_at: float | None = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Waits for a free request slot (and for the rate limit to reset, if the
+        budget is exhausted) and holds it for the duration of the request.
+        """
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            if self.remaining == 0 and self.reset_at is not None:
+                if (wait := self.reset_at - time.time()) > 0:
+                    print(f"GitHub rate limit exhausted, waiting {wait:.0f}s...")
+                    await asyncio.sleep(wait)
+            yield
+        finally:
+            async with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def _effective_max_concurrency(self) -> int:
+        if not self.limit or self.remaining is None:
+            return self.max_concurrency
+        budget = self.remaining / self.limit
+        if budget < 0.1:
+            return self.min_concurrency
+        if budget < 0.25:
+            return max(self.min_concurrency, self.max_concurrency // 2)
+        return self.max_concurrency
+
+    def record(self, response: httpx.Response, attempt: int) -> float | None:
+        """Updates the budget from a response and returns how long to wait
+        before retrying it, or `None` if it should not be retried.
+        """
+        self.requests += 1
+        if (remaining := _int_header(response, "X-RateLimit-Remaining")) is not None:
+            self.remaining = remaining
+            if self.first_remaining is None:
+                self.first_remaining = remaining
+        if (limit := _int_header(response, "X-RateLimit-Limit")) is not None:
+            self.limit = limit
+        if (reset := _int_header(response, "X-RateLimit-Reset")) is not None:
+            self.reset_at = float(reset)
+
+        if not is_rate_limited(response):
+            self.concurrency = min(
+                self.concurrency + 1, self._effective_max_concurrency()
+            )
+            return None
+
+        self.rate_limited += 1
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+        if attempt >= self.max_retries:
+            return None
+
+        self.retries += 1
+        if (delay := retry_after_seconds(response)) is None:
+            if self.remaining == 0 and self.reset_at is not None:
+                delay = max(0.0, self.reset_at - time.time())
+            else:
+                # exponential backoff with full jitter
+                delay = random.uniform(
+                    0, min(self.max_backoff, self.base_backoff * 2**attempt)
+                )
+        return delay
+
+    def summary(self) -> str:
+        """Describes the requests made and the rate-limit budget they used."""
+        lines = [
+            f"GitHub requests: {self.requests} "
+            f"({self.retries} retried, {self.rate_limited} rate limited)"
+        ]
+        if self.first_remaining is not None and self.remaining is not None:
+            lines.append(
+                f"GitHub rate limit budget: {self.remaining}/{self.limit} remaining "
+                f"(~{max(0, self.first_remaining - self.remaining)} used this run)"
+            )
+        return "\n".join(lines)
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Sends requests through a `GitHubRequestScheduler`, retrying those that
+    hit a rate limit after the delay it suggests.
+    """
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, scheduler: GitHubRequestScheduler
+    ):
+        self.transport = transport
+        self.scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            async with self.scheduler.slot():
+                response = await self.transport.handle_async_request(request)
+            delay = self.scheduler.record(response, attempt)
+            if delay is None:
+                return response
+
+            await response.aclose()
+            print(
+                f"Rate limited by GitHub ({response.status_code}), retrying "
+                f"{request.url.path} in {delay:.1f}s..."
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,95 @@
+import asyncio
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+
+from prefect_collection_registry.session import RegistrySession
+from prefect_collection_registry.utils import get_latest_pypi_release, get_tree_paths
+from prefect_collection_registry.versions import version_sort_key
+
+
+def latest_recorded_releases(paths: Iterable[str]) -> dict[str, str]:
+    """Returns the latest release of each collection among the paths of
+    versioned block files (`collections/<name>/blocks/<release>.json`), ordered
+    by PEP 440 rather than by file name.
+    """
+    latest: dict[str, str] = {}
+    for path in paths:
+        parts = PurePosixPath(path).parts
+        if len(parts) != 4 or parts[::2] != ("collections", "blocks"):
+            continue
+        collection_name, release = parts[1], PurePosixPath(path).stem
+        if collection_name not in latest or version_sort_key(
+            release
+        ) > version_sort_key(latest[collection_name]):
+            latest[collection_name] = release
+    return latest
+
+
+async def get_recorded_releases(
+    ref: str = "main",
+    local_root: Path | None = None,
+    session: RegistrySession | None = None,
+) -> dict[str, str]:
+    """Returns the latest recorded release of each collection.
+
+    The releases are read from a local checkout of the registry at `local_root`
+    if given, and otherwise from `ref` with a single Git Trees request.
+    """
+    if local_root is not None:
+        paths = [
+            path.relative_to(local_root).as_posix()
+            for path in local_root.glob("collections/*/blocks/*.json")
+        ]
+    else:
+        paths = await get_tree_paths(
+            "PrefectHQ", "prefect-collection-registry", ref, session=session
+        )
+    return latest_recorded_releases(paths)
+
+
+async def _get_latest_release(
+    collection_name: str, session: RegistrySession | None
+) -> str | None:
+    try:
+        return await get_latest_pypi_release(collection_name, session=session)
+    except Exception as e:
+        if "Not Found" in str(e):
+            return None
+        raise
+
+
+def needs_update(latest_release: str | None, recorded_release: str | None) -> bool:
+    """Whether a PyPI release is newer than the latest recorded release."""
+    if latest_release is None or recorded_release is None:
+        return True
+    return version_sort_key(latest_release) > version_sort_key(recorded_release)
+
+
+async def find_collections_to_update(
+    collection_names: Iterable[str],
+    ref: str = "main",
+    local_root: Path | None = None,
+    session: RegistrySession | None = None,
+) -> set[str]:
+    """Returns the collections with a release on PyPI that the registry hasn't
+    recorded yet, looking up all PyPI releases concurrently.
+    """
+    collection_names = sorted(collection_names)
+    recorded_releases = await get_recorded_releases(ref, local_root, session)
+    latest_releases = await asyncio.gather(
+        *[
+            _get_latest_release(collection_name, session)
+            for collection_name in collection_names
+        ]
+    )
+
+    collections_to_update: set[str] = set()
+    for collection_name, latest_release in zip(collection_names, latest_releases):
+        if needs_update(latest_release, recorded_releases.get(collection_name)):
+            collections_to_update.add(collection_name)
+        else:
+            print(
+                f"Package {collection_name!r} is up to date! - "
+                f"(latest release: {latest_release})"
+            )
+    return collections_to_update
@@ -0,0 +1,143 @@
+import asyncio
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+import httpx
+from pydantic_core import from_json
+
+from prefect_collection_registry import serialization
+from prefect_collection_registry.session import RegistrySession
+from prefect_collection_registry.utils import (
+    get_blob,
+    get_file_contents,
+    get_metadata_branch_times,
+    git_blob_sha,
+)
+
+# Kept on the branch of an update run until the run has finished, so that a run
+# that dies partway through can be resumed by the next one.
+RUN_MANIFEST_PATH = "run-manifest.json"
+
+CollectionStatus = Literal["committed", "failed"]
+
+
+@dataclass
+class CollectionCheckpoint:
+    """How updating one collection went in a run.
+
+    `content_hash` is a hash of the files the update generated, and `blob_shas`
+    maps the path of each of them to the SHA of its blob on the branch.
+    """
+
+    status: CollectionStatus
+    content_hash: str | None = None
+    blob_shas: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class RunManifest:
+    """Records which collections an update run has committed to its branch, and
+    which it failed to update, so that a later run can carry on from there.
+    """
+
+    branch_name: str
+    collections: dict[str, CollectionCheckpoint] = field(default_factory=dict)
+
+    def completed(self) -> set[str]:
+        """Returns the collections whose update has been committed."""
+        return {
+            collection_name
+            for collection_name, checkpoint in self.collections.items()
+            if checkpoint.status == "committed"
+        }
+
+    def failed(self) -> set[str]:
+        """Returns the collections whose last update failed."""
+        return set(self.collections) - self.completed()
+
+    def record_committed(self, collection_name: str, files: dict[str, str]) -> None:
+        """Records that the files generated for a collection were committed."""
+        self.collections[collection_name] = CollectionCheckpoint(
+            status="committed",
+            content_hash=serialization.content_hash(files),
+            blob_shas={path: git_blob_sha(content) for path, content in files.items()},
+        )
+
+    def record_failed(self, collection_name: str, error: BaseException) -> None:
+        """Records that updating a collection failed."""
+        self.collections[collection_name] = CollectionCheckpoint(
+            status="failed", error=str(error) or type(error).__name__
+        )
+
+    def dumps(self) -> str:
+        return serialization.dumps_text(asdict(self))
+
+    @classmethod
+    def loads(cls, content: str) -> "RunManifest":
+        data: dict[str, Any] = from_json(content)
+        return cls(
+            branch_name=data["branch_name"],
+            collections={
+                collection_name: CollectionCheckpoint(**checkpoint)
+                for collection_name, checkpoint in data["collections"].items()
+            },
+        )
+
+    @classmethod
+    async def load(
+        cls,
+        branch_name: str,
+        repo_owner: str = "PrefectHQ",
+        repo_name: str = "prefect-collection-registry",
+        session: RegistrySession | None = None,
+    ) -> "RunManifest | None":
+        """Reads the manifest of the run on a branch, or returns `None` if the
+        branch has none (e.g. because its run finished).
+        """
+        try:
+            content, _ = await get_file_contents(
+                repo_owner, repo_name, RUN_MANIFEST_PATH, branch_name, session
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        return cls.loads(content)
+
+    async def committed_files(
+        self,
+        repo_owner: str = "PrefectHQ",
+        repo_name: str = "prefect-collection-registry",
+        session: RegistrySession | None = None,
+    ) -> dict[str, str]:
+        """Downloads every file committed for the completed collections, by the
+        SHA of its blob.
+        """
+        blob_shas = {
+            path: sha
+            for collection_name in sorted(self.completed())
+            for path, sha in self.collections[collection_name].blob_shas.items()
+        }
+        contents = await asyncio.gather(
+            *[
+                get_blob(repo_owner, repo_name, sha, session)
+                for sha in blob_shas.values()
+            ]
+        )
+        return dict(zip(blob_shas, contents))
+
+
+async def find_unfinished_run(
+    repo_owner: str = "PrefectHQ",
+    repo_name: str = "prefect-collection-registry",
+    session: RegistrySession | None = None,
+) -> RunManifest | None:
+    """Returns the manifest of the latest metadata branch, if its run didn't
+    finish.
+    """
+    branch_times = await get_metadata_branch_times(repo_owner, repo_name, session)
+    if not branch_times:
+        return None
+    latest_branch = max(branch_times, key=branch_times.__getitem__)
+    return await RunManifest.load(latest_branch, repo_owner, repo_name, session)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is installed along with prefect
+    orjson = None
+
+
+def _float_repr(value: float) -> str:
+    """Formats a float as `orjson` does: like `repr`, but with exponents
+    written as `1e16` and `1.5e-7` rather than `1e+16` and `1.5e-07`, numbers
+    with an exponent of -5 written out in full and non-finite numbers as `null`.
+    """
+    if not math.isfinite(value):
+        return "null"
+    mantissa, e, exponent = repr(value).partition("e")
+    if not e:
+        return mantissa
+    if int(exponent) == -5:
+        sign = "-" if value < 0 else ""
+        return f"{sign}0.0000{mantissa.lstrip('-').replace('.', '')}"
+    return f"{mantissa}e{int(exponent)}"
+
+
+# a JSON string, which is skipped, or a number as the stdlib writes a float
+# that orjson writes differently
+_FLOAT_TO_REFORMAT = re.compile(
+    r'"(?:[^"\\]|\\.)*"|NaN|-?Infinity|-?\d+(?:\.\d+)?[eE][-+]?\d+'
+)
+
+
+def _reformat_float(match: re.Match[str]) -> str:
+    token = match.group()
+    if token.startswith('"'):
+        return token
+    return _float_repr(float(token))
+
+
+def _stdlib_dumps(content: Any, sort_keys: bool, indent: int | None) -> bytes:
+    # the stdlib has no hook for formatting floats, so rewrite the ones it
+    # formats differently once they're encoded
+    encoded = json.dumps(
+        content,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=indent,
+        separators=(",", ": ") if indent is not None else (",", ":"),
+    )
+    return _FLOAT_TO_REFORMAT.sub(_reformat_float, encoded).encode()
+
+
+def _dumps(content: Any, sort_keys: bool, indent: bool) -> bytes:
+    if orjson is not None:
+        option = (orjson.OPT_SORT_KEYS if sort_keys else 0) | (
+            orjson.OPT_INDENT_2 if indent else 0
+        )
+        try:
+            return orjson.dumps(content, option=option)
+        except TypeError:
+            # e.g. integers wider than 64 bits, which the stdlib encodes fine
+            pass
+    return _stdlib_dumps(content, sort_keys, 2 if indent else None)
+
+
+def dumps(content: Any) -> bytes:
+    """Serializes content as the registry writes it to its JSON files.
+
+    The output is indented with two spaces, keeps the insertion order of keys
+    (e.g. so that schema properties stay in the order they were declared),
+    leaves non-ASCII characters unescaped and ends with a newline. Non-finite
+    floats are written as `null`. It is the same whether or not `orjson` is
+    available.
+    """
+    return _dumps(content, sort_keys=False, indent=True) + b"\n"
+
+
+def dumps_text(content: Any) -> str:
+    """Like `dumps`, but returns a string, e.g. for the GitHub API helpers."""
+    return dumps(content).decode()
+
+
+def write(path: Path, content: Any) -> None:
+    """Writes content to a file as serialized by `dumps`."""
+    path.write_bytes(dumps(content))
+
+
+def content_hash(content: Any) -> str:
+    """Returns a hash of JSON content that doesn't depend on key order or
+    whitespace.
+    """
+    return hashlib.sha256(_dumps(content, sort_keys=True, indent=False)).hexdigest()
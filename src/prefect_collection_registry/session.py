@@ -0,0 +1,130 @@
+import importlib.util
+from contextvars import ContextVar, Token
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from gh_util.client import GHClient
+
+from prefect_collection_registry.http_cache import CachingTransport, ResponseCache
+from prefect_collection_registry.pypi import PyPIReleaseWatcher
+from prefect_collection_registry.rate_limit import (
+    GitHubRequestScheduler,
+    RateLimitedTransport,
+)
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0
+)
+
+_current_session: ContextVar["RegistrySession | None"] = ContextVar(
+    "registry_session", default=None
+)
+
+
+def get_current_session() -> "RegistrySession | None":
+    """Returns the session entered in the current context, if any."""
+    return _current_session.get()
+
+
+def http2_available() -> bool:
+    """Whether httpx can negotiate HTTP/2, which requires the `h2` package."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class RegistrySession:
+    """Keeps one pooled HTTP client per host for the life of a flow run, so that
+    the registry helpers reuse connections instead of opening a new one (and
+    doing a new TLS handshake) for every request. With a `response_cache`, `GET`
+    requests are made conditional on previously cached responses. With a
+    `release_watcher`, PyPI releases are only fetched for packages that got new
+    uploads since the last session, and its state is saved when the session
+    closes. Writes skipped because the content was already there are counted in
+    `skipped_writes`.
+
+    Entering the session makes it the default for every helper that accepts a
+    `session` argument:
+
+        async with RegistrySession() as session:
+            await get_latest_pypi_release("prefect-aws")  # uses `session`
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool | None = None,
+        scheduler: GitHubRequestScheduler | None = None,
+        response_cache: ResponseCache | None = None,
+        release_watcher: PyPIReleaseWatcher | None = None,
+    ):
+        self.limits = limits
+        self.http2 = http2_available() if http2 is None else http2
+        self.scheduler = scheduler or GitHubRequestScheduler()
+        self.response_cache = response_cache
+        self.release_watcher = release_watcher
+        self.skipped_writes = 0
+        self._github: GHClient | None = None
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._token: Token[RegistrySession | None] | None = None
+
+    def _transport(
+        self, scheduler: GitHubRequestScheduler | None = None
+    ) -> httpx.AsyncBaseTransport:
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            limits=self.limits, http2=self.http2
+        )
+        if scheduler is not None:
+            transport = RateLimitedTransport(transport, scheduler)
+        if self.response_cache is not None:
+            transport = CachingTransport(transport, self.response_cache)
+        return transport
+
+    @property
+    def github(self) -> GHClient:
+        """The authenticated client for the GitHub REST API, whose requests are
+        paced by the session's `scheduler`.
+        """
+        if self._github is None:
+            self._github = GHClient(transport=self._transport(self.scheduler))
+        return self._github
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        """Returns the client for the host of `url`, e.g. `https://pypi.org`."""
+        host = urlsplit(url).netloc
+        if host not in self._clients:
+            self._clients[host] = httpx.AsyncClient(transport=self._transport())
+        return self._clients[host]
+
+    def summary(self) -> str:
+        """Describes the requests made through this session."""
+        lines = [self.scheduler.summary()]
+        if self.response_cache is not None:
+            lines.append(self.response_cache.summary())
+        if self.release_watcher is not None:
+            lines.append(self.release_watcher.summary())
+        if self.skipped_writes:
+            lines.append(
+                f"Writes skipped because the content was unchanged: "
+                f"{self.skipped_writes}"
+            )
+        return "\n".join(lines)
+
+    async def aclose(self) -> None:
+        if self._github is not None:
+            await self._github.aclose()
+            self._github = None
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        if self.release_watcher is not None:
+            self.release_watcher.save()
+
+    async def __aenter__(self) -> "RegistrySession":
+        self._token = _current_session.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._token is not None:
+            _current_session.reset(self._token)
+            self._token = None
+        await self.aclose()
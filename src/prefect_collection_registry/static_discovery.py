@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import griffe
+
+# the paths `@flow` / `@flow(...)` resolve to when imported from Prefect
+FLOW_DECORATOR_PATHS = {"prefect.flow", "prefect.flows.flow"}
+
+
+@dataclass
+class StaticDiscovery:
+    """The modules of a package and the flows defined in each, found by reading
+    their source instead of importing them.
+    """
+
+    package_name: str
+    module_names: list[str] = field(default_factory=list)
+    flows: dict[str, list[str]] = field(default_factory=dict)
+
+    @property
+    def flow_module_names(self) -> list[str]:
+        return sorted(self.flows)
+
+
+def _is_flow(function: Any) -> bool:
+    return any(
+        decorator.callable_path in FLOW_DECORATOR_PATHS
+        for decorator in function.decorators
+    )
+
+
+def _walk(module: Any, discovery: StaticDiscovery) -> None:
+    discovery.module_names.append(module.path)
+    for member in module.members.values():
+        if member.is_alias:
+            continue
+        if member.is_module:
+            _walk(member, discovery)
+        elif member.is_function and _is_flow(member):
+            discovery.flows.setdefault(module.path, []).append(member.name)
+
+
+def discover_flows(package_name: str) -> StaticDiscovery:
+    """Finds the `@flow`-decorated functions defined at the top level of each
+    module of an installed package without importing any of it.
+
+    Raises an error if the package's source can't be found or parsed, e.g.
+    because it is only available as compiled extension modules.
+    """
+    package = griffe.load(package_name, allow_inspection=False, resolve_aliases=False)
+    discovery = StaticDiscovery(package_name)
+    _walk(package, discovery)
+    return discovery
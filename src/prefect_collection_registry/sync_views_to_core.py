@@ -1,79 +1,160 @@
 import asyncio
 import os
-from datetime import datetime
+from posixpath import dirname
 
+import httpx
 from prefect import flow
 from prefect.blocks.system import Secret
+from prefect.utilities.collections import listrepr
 
+from prefect_collection_registry.session import RegistrySession
 from prefect_collection_registry.utils import (
-    create_or_update_file,
+    create_blob,
+    create_commit,
     create_pull_request,
     create_repo_ref,
+    create_tree,
+    get_blob,
     get_commit_sha,
-    get_file_contents,
+    get_commit_tree_sha,
+    get_directory_blob_shas,
+    record_skipped_write,
+    update_repo_ref,
 )
 
+# The views of this repository that Prefect core ships, and where it keeps them
+CORE_VIEW_PATHS = {
+    "views/aggregate-worker-metadata.json": "src/prefect/server/api/collections_data/views/aggregate-worker-metadata.json",
+}
+
+
+async def get_blob_shas(
+    repo_owner: str,
+    repo_name: str,
+    paths: list[str],
+    ref: str = "main",
+    session: RegistrySession | None = None,
+) -> dict[str, str | None]:
+    """Get the blob SHA of each file, or `None` if it doesn't exist, listing each
+    directory that holds one of them once.
+    """
+    directories = sorted({dirname(path) for path in paths})
+    listings = await asyncio.gather(
+        *[
+            get_directory_blob_shas(repo_owner, repo_name, directory, ref, session)
+            for directory in directories
+        ]
+    )
+    shas = {path: sha for listing in listings for path, sha in listing.items()}
+    return {path: shas.get(path) for path in paths}
+
+
+async def point_branch_at(
+    repo_owner: str,
+    repo_name: str,
+    branch_name: str,
+    sha: str,
+    session: RegistrySession | None = None,
+) -> None:
+    """Points a branch at a commit, creating the branch if it doesn't exist."""
+    try:
+        await update_repo_ref(
+            repo_owner, repo_name, f"heads/{branch_name}", sha, True, session
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 422:
+            raise
+        await create_repo_ref(
+            repo_owner, repo_name, f"refs/heads/{branch_name}", sha, session
+        )
+
 
 @flow
-async def sync_worker_metadata_to_core(
+async def sync_views_to_core(
+    view_paths: dict[str, str] | None = None,
     source_repo_owner: str = "PrefectHQ",
     source_repo: str = "prefect-collection-registry",
     target_repo: str = "prefect",
-    view_path: str = "views/aggregate-worker-metadata.json",
-    target_path: str = "src/prefect/server/api/collections_data/views/aggregate-worker-metadata.json",
-) -> None:
-    """Syncs the worker metadata view to the Prefect core repository.
-    Creates a new branch and PR if changes are detected.
+    branch_name: str = "update-collection-views",
+) -> str | None:
+    """Syncs views of this repository to the Prefect core repository.
+
+    `view_paths` maps each view to its path in core (by default
+    `CORE_VIEW_PATHS`). The views that differ from core are written to
+    `branch_name` as a single commit on top of core's `main`, and a PR is opened
+    from it unless one is already open. If every view matches, no branch or PR
+    is created. Returns the SHA of the commit, if one was made.
     """
-    # Generate unique branch name
-    new_branch = f"update-worker-metadata-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    view_paths = view_paths or CORE_VIEW_PATHS
 
-    # Get the content from our repo
-    content, _ = await get_file_contents(
-        source_repo_owner, source_repo, view_path, "main"
-    )
+    async with RegistrySession() as session:
+        source_shas, target_shas = await asyncio.gather(
+            get_blob_shas(source_repo_owner, source_repo, list(view_paths)),
+            get_blob_shas(source_repo_owner, target_repo, list(view_paths.values())),
+        )
 
-    # Create new branch in target repo
-    main_sha = await get_commit_sha(source_repo_owner, target_repo, "main")
-    await create_repo_ref(
-        source_repo_owner,
-        target_repo,
-        f"refs/heads/{new_branch}",
-        main_sha,
-    )
+        # compare blob SHAs first, so that only changed views are downloaded
+        changed: list[tuple[str, str]] = []
+        for view, target_path in view_paths.items():
+            if (source_sha := source_shas[view]) is None:
+                raise ValueError(f"{view} not found in {source_repo}")
+            if source_sha == target_shas[target_path]:
+                record_skipped_write(target_path)
+            else:
+                changed.append((source_sha, target_path))
 
-    # Get the SHA of the existing file in the target repo
-    try:
-        _, target_file_sha = await get_file_contents(
-            source_repo_owner, target_repo, target_path, new_branch
+        if not changed:
+            print(f"All views match {target_repo}, nothing to sync.")
+            print(session.summary())
+            return None
+
+        # the blobs have to exist in the target repository to be committed there
+        contents = await asyncio.gather(
+            *[get_blob(source_repo_owner, source_repo, sha) for sha, _ in changed]
         )
-    except Exception as e:
-        if "Not Found" in str(e):
-            target_file_sha = None
-        else:
-            raise
+        blob_shas = await asyncio.gather(
+            *[
+                create_blob(source_repo_owner, target_repo, content)
+                for content in contents
+            ]
+        )
+        tree_entries = [
+            {"path": target_path, "mode": "100644", "type": "blob", "sha": sha}
+            for (_, target_path), sha in zip(changed, blob_shas)
+        ]
 
-    # Update file in target repo
-    await create_or_update_file(
-        source_repo_owner,
-        target_repo,
-        target_path,
-        "Update aggregate-worker-metadata.json",
-        content,
-        new_branch,
-        sha=target_file_sha,
-    )
+        main_sha = await get_commit_sha(source_repo_owner, target_repo, "main")
+        tree_sha = await create_tree(
+            source_repo_owner,
+            target_repo,
+            tree_entries,
+            base_tree=await get_commit_tree_sha(
+                source_repo_owner, target_repo, main_sha
+            ),
+        )
+        view_names = [target_path.rsplit("/", 1)[-1] for _, target_path in changed]
+        commit_sha = await create_commit(
+            source_repo_owner,
+            target_repo,
+            f"Update {', '.join(view_names)}",
+            tree_sha,
+            [main_sha],
+        )
+        await point_branch_at(source_repo_owner, target_repo, branch_name, commit_sha)
+        print(f"Committed {listrepr(view_names)} to {branch_name!r}!")
 
-    # Create PR
-    await create_pull_request(
-        source_repo_owner,
-        target_repo,
-        "Automated PR for Worker Metadata Update",
-        "This is an automated PR to update the worker metadata.",
-        new_branch,
-    )
+        await create_pull_request(
+            source_repo_owner,
+            target_repo,
+            "Update collection views",
+            "This is an automated PR to update the collection views "
+            f"({', '.join(f'`{name}`' for name in view_names)}).",
+            branch_name,
+        )
+        print(session.summary())
+        return commit_sha
 
 
 if __name__ == "__main__":
     os.environ["GITHUB_TOKEN"] = Secret.load("gh-util-token").get()  # type: ignore
-    asyncio.run(sync_worker_metadata_to_core())
+    asyncio.run(sync_views_to_core())
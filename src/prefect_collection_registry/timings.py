@@ -0,0 +1,59 @@
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# "cache reuse" is looking up metadata generated by an earlier update and
+# staging it, "staging" a subprocess writing its files to disk, "upload" the
+# parent flow committing them to the branch
+STAGES = ("env setup", "cache reuse", "import", "generation", "staging", "upload")
+
+
+class StageTimings:
+    """Accumulates the wall-clock time spent in named stages of an update."""
+
+    def __init__(self, seconds: dict[str, float] | None = None):
+        self.seconds: dict[str, float] = seconds or {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.seconds))
+
+    @classmethod
+    def read(cls, path: Path) -> "StageTimings":
+        """Reads timings written by `write`, or returns empty timings if the file
+        is missing or unreadable (e.g. because the subprocess crashed).
+        """
+        try:
+            return cls(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            return cls()
+
+
+def timings_markdown(timings: dict[str, StageTimings]) -> str:
+    """Formats the timings of each collection as a markdown table."""
+    lines = [
+        f"| collection | {' | '.join(STAGES)} | total |",
+        f"|---|{'---:|' * (len(STAGES) + 1)}",
+    ]
+    for collection_name, collection_timings in sorted(timings.items()):
+        seconds = collection_timings.seconds
+        cells = [
+            f"{seconds[stage]:.1f}s" if stage in seconds else "-" for stage in STAGES
+        ]
+        lines.append(
+            f"| {collection_name} | {' | '.join(cells)} "
+            f"| {sum(seconds.values()):.1f}s |"
+        )
+    return "\n".join(lines)
@@ -1,32 +1,79 @@
 import asyncio
 import os
+import tempfile
+from collections.abc import Callable
+from importlib.metadata import entry_points
+from pathlib import Path
 from typing import Any
 
 import prefect.runtime.flow_run
-from prefect import flow, task, unmapped
+from prefect import flow, get_run_logger, task
 from prefect.artifacts import create_markdown_artifact
 from prefect.blocks.system import Secret
 from prefect.states import Completed, State
 from prefect.types import DateTime
 from prefect.utilities.collections import listrepr
+from pydantic_core import from_json
 
+from prefect_collection_registry import serialization
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.environments import EnvironmentManager
 from prefect_collection_registry.generate_block_metadata import (
-    update_block_metadata_for_collection,
+    generate_block_metadata_for_collection,
 )
+from prefect_collection_registry.generate_flow_metadata import generate_flow_metadata
 from prefect_collection_registry.generate_worker_metadata import (
-    update_worker_metadata_for_package,
+    generate_worker_metadata_for_package,
 )
+from prefect_collection_registry.generation_cache import GenerationCache, GenerationKey
+from prefect_collection_registry.http_cache import ResponseCache
+from prefect_collection_registry.import_profiler import (
+    DEFAULT_MEMORY_THRESHOLD_MB,
+    DEFAULT_WALL_THRESHOLD_SECONDS,
+    ImportReport,
+    load_entrypoints,
+    load_module,
+)
+from prefect_collection_registry.paths import (
+    GENERATED_METADATA_FILE_ENV_VAR,
+    IMPORT_REPORT_FILE_ENV_VAR,
+    STAGING_DIR_ENV_VAR,
+    TIMINGS_FILE_ENV_VAR,
+    get_cache_dir,
+)
+from prefect_collection_registry.process_output import (
+    MAX_LINE_BYTES,
+    TailBuffer,
+    stream_process_output,
+)
+from prefect_collection_registry.pypi import PyPIReleaseWatcher
+from prefect_collection_registry.release_detection import find_collections_to_update
+from prefect_collection_registry.run_manifest import (
+    RUN_MANIFEST_PATH,
+    RunManifest,
+    find_unfinished_run,
+)
+from prefect_collection_registry.session import RegistrySession
+from prefect_collection_registry.timings import StageTimings, timings_markdown
 from prefect_collection_registry.utils import (
+    CollectionViewVariety,
     branch_exists,
     close_old_metadata_prs,
     create_pull_request,
     create_repo_ref,
     get_collection_names,
     get_commit_sha,
-    get_latest_pypi_release,
-    get_repo_contents,
+    get_commit_tree_sha,
+    submit_updates,
+    update_aggregate_views,
 )
 
+METADATA_GENERATORS: dict[CollectionViewVariety, Callable[[str], dict[str, Any]]] = {
+    "block": generate_block_metadata_for_collection,
+    "flow": generate_flow_metadata,
+    "worker": generate_worker_metadata_for_package,
+}
+
 TODO_COLLECTIONS = {
     "prefect-sqlalchemy",
 }
@@ -41,39 +88,6 @@ and will trigger a run of `update_collection_metadata` for each such package.
 """
 
 
-async def collection_needs_update(collection_name: str) -> tuple[str, bool]:
-    """Checks if the collection needs to be updated."""
-    try:
-        registry_contents = await get_repo_contents(
-            "PrefectHQ",
-            "prefect-collection-registry",
-            f"collections/{collection_name}/blocks",
-            ref="main",
-        )
-        if not registry_contents:
-            return collection_name, True
-
-        latest_recorded_release = sorted(
-            [content["name"] for content in registry_contents]
-        )[-1].replace(".json", "")
-
-        latest_release = await get_latest_pypi_release(collection_name)
-
-        if latest_release == latest_recorded_release:
-            print(
-                f"Package {collection_name!r} is up to date! - "
-                f"(latest release: {latest_release})"
-            )
-            return collection_name, False
-
-        return collection_name, True
-
-    except Exception as e:
-        if "Not Found" in str(e):
-            return collection_name, True
-        raise
-
-
 @task(name="Create Branch / PR if possible")
 async def create_ref_if_not_exists(new_branch_name: str) -> str:
     """Creates a branch if it doesn't already exist."""
@@ -97,74 +111,292 @@ async def create_ref_if_not_exists(new_branch_name: str) -> str:
     return new_branch_name
 
 
+async def start_or_resume_run(branch_name: str) -> RunManifest:
+    """Returns the manifest of the unfinished run on a branch, or creates the
+    branch and returns an empty manifest for a new run.
+
+    For the default `update-metadata`, the run on the latest metadata branch is
+    resumed if it didn't finish, and otherwise a new timestamped branch is
+    created.
+    """
+    if branch_name == "update-metadata":  # avoid overwriting existing branches
+        manifest = await find_unfinished_run()
+        branch_name = (
+            manifest.branch_name
+            if manifest
+            else f"update-metadata-{DateTime.now().format('MM-DD-YYYY-HH-MM-SS')}"
+        )
+    else:
+        manifest = await RunManifest.load(branch_name)
+
+    branch_name = await create_ref_if_not_exists(branch_name)
+    if manifest is None:
+        return RunManifest(branch_name)
+
+    print(
+        f"Resuming the unfinished run on {branch_name!r}, which updated "
+        f"{listrepr(sorted(manifest.completed())) or 'no collections'}"
+    )
+    return manifest
+
+
+def import_collection(collection_name: str) -> None:
+    """Imports a collection and loads the `prefect.collections` entrypoints."""
+    load_module(collection_name.replace("-", "_"))
+    load_entrypoints(entry_points(group="prefect.collections"))
+
+
+async def generate_collection_metadata(
+    collection_name: str,
+) -> dict[CollectionViewVariety, dict[str, Any]]:
+    """Generates each variety of metadata for an imported package concurrently,
+    each in its own thread.
+
+    Prefect core defines no flows, so it has no flow metadata.
+    """
+    varieties = [
+        variety
+        for variety in METADATA_GENERATORS
+        if not (variety == "flow" and collection_name == "prefect")
+    ]
+    metadata = await asyncio.gather(
+        *[
+            asyncio.to_thread(METADATA_GENERATORS[variety], collection_name)
+            for variety in varieties
+        ]
+    )
+    return dict(zip(varieties, metadata))
+
+
+async def upload_collection_metadata(
+    collection_name: str,
+    metadata: dict[CollectionViewVariety, dict[str, Any]],
+    branch_name: str,
+    commit_builder: CommitBuilder | None = None,
+) -> None:
+    """Submits each variety of metadata generated for a package, staging the
+    files on `commit_builder` if given instead of writing them to the branch.
+    """
+    if commit_builder is not None:
+        # staging a file is independent of staging any other
+        changed = await asyncio.gather(
+            *[
+                submit_updates(
+                    variety_metadata,
+                    collection_name,
+                    branch_name,
+                    variety,
+                    commit_builder,
+                )
+                for variety, variety_metadata in metadata.items()
+            ]
+        )
+    else:
+        # each write through the Contents API is a commit on the branch, so
+        # they are made one after the other
+        changed = [
+            await submit_updates(
+                variety_metadata, collection_name, branch_name, variety
+            )
+            for variety, variety_metadata in metadata.items()
+        ]
+
+    # staged files are merged into the aggregate views when the builder is
+    # committed; otherwise rebuild them now that the versioned files are
+    # written
+    if commit_builder is None:
+        await update_aggregate_views(
+            {
+                variety: {collection_name: variety_metadata} if is_changed else {}
+                for (variety, variety_metadata), is_changed in zip(
+                    metadata.items(), changed
+                )
+            },
+            branch_name,
+        )
+
+
 async def update_collection_metadata(
     collection_name: str,
     branch_name: str,
+    commit_builder: CommitBuilder | None = None,
+    timings: StageTimings | None = None,
+    metadata_file: Path | None = None,
 ) -> State:
-    """Updates each variety of metadata for a given package."""
-    # Run updates sequentially to avoid conflicts in aggregate files
-    await update_block_metadata_for_collection(collection_name, branch_name)
-    await update_worker_metadata_for_package(collection_name, branch_name)
+    """Updates each variety of metadata for a given package.
+
+    The package is imported once, then all varieties are generated
+    concurrently and uploaded together. If a `commit_builder` is given, the
+    generated files are staged on it instead of being written to the branch.
+    The time spent importing, generating and staging is recorded on
+    `timings`, if given, and the generated metadata is written to
+    `metadata_file`, if given.
+    """
+    timings = timings or StageTimings()
+
+    with timings.stage("import"):
+        import_collection(collection_name)
+
+    with timings.stage("generation"):
+        metadata = await generate_collection_metadata(collection_name)
+    if metadata_file is not None:
+        serialization.write(metadata_file, metadata)
+
+    with timings.stage("staging"):
+        await upload_collection_metadata(
+            collection_name, metadata, branch_name, commit_builder
+        )
 
     return Completed(message=f"Successfully updated {collection_name}")
 
 
+async def reuse_generated_metadata(
+    collection_name: str,
+    metadata: dict[CollectionViewVariety, dict[str, Any]],
+    branch_name: str,
+    staging_dir: Path,
+) -> None:
+    """Stages the files for metadata generated by an earlier update, as the
+    update subprocess would have.
+    """
+    commit_builder = CommitBuilder(branch_name)
+    await upload_collection_metadata(
+        collection_name, metadata, branch_name, commit_builder
+    )
+    commit_builder.dump(staging_dir / collection_name)
+
+
+async def report_imports(
+    import_report: ImportReport,
+    artifact_key: str,
+    import_time_threshold: float,
+    import_memory_threshold_mb: float,
+) -> None:
+    """Prints the flagged imports of a report and creates an artifact of it,
+    unless nothing was profiled.
+    """
+    if not import_report.imports and not import_report.in_progress:
+        return
+    for module_import in import_report.flagged(
+        import_time_threshold, import_memory_threshold_mb
+    ):
+        print(
+            f"Importing {module_import.name} took "
+            f"{module_import.wall_seconds:.1f}s and peaked at "
+            f"{module_import.peak_memory_mb:.0f} MB"
+        )
+    await create_markdown_artifact(  # type: ignore
+        key=artifact_key,
+        markdown=import_report.markdown(
+            import_time_threshold, import_memory_threshold_mb
+        ),
+    )
+
+
 @task(log_prints=True, task_run_name="update-metadata-for-{collection_name}")
-async def run_collection_update(collection_name: str, branch_name: str) -> str:
+async def run_collection_update(
+    collection_name: str,
+    branch_name: str,
+    staging_dir: Path,
+    timeout_seconds: float | None = None,
+    import_time_threshold: float = DEFAULT_WALL_THRESHOLD_SECONDS,
+    import_memory_threshold_mb: float = DEFAULT_MEMORY_THRESHOLD_MB,
+    profile_imports: bool = False,
+) -> StageTimings:
     """Run a single collection update in an isolated environment."""
+    timings = StageTimings()
+    timings_file = staging_dir / f"{collection_name}.timings.json"
+    metadata_file = staging_dir / f"{collection_name}.metadata.json"
+    import_report_file = get_cache_dir() / "import-reports" / f"{collection_name}.json"
+    import_report_file.unlink(missing_ok=True)
+    profiling_env = (
+        {IMPORT_REPORT_FILE_ENV_VAR: str(import_report_file)} if profile_imports else {}
+    )
+    generation_cache = GenerationCache()
+
+    environment_manager = EnvironmentManager(project_requirement=f"-e {Path.cwd()}")
+    with timings.stage("env setup"):
+        lock = await environment_manager.resolve(collection_name)
+
+    cache_key = GenerationKey.from_lock(collection_name, lock)
+    with timings.stage("cache reuse"):
+        if cache_key and (cached := generation_cache.get(cache_key)) is not None:
+            print(
+                f"Reusing the metadata generated for {collection_name} "
+                f"{cache_key.version} with prefect {cache_key.prefect_version}"
+            )
+            await reuse_generated_metadata(
+                collection_name, cached, branch_name, staging_dir
+            )
+            return timings
+
+    with timings.stage("env setup"):
+        environment = await environment_manager.ensure(collection_name, lock)
+    print(
+        f"{'Reusing' if environment.reused else 'Created'} environment "
+        f"{environment.path.name!r} for {collection_name}"
+    )
+
     process = await asyncio.create_subprocess_exec(
-        "uv",
-        "run",
-        "--isolated",
-        "--no-cache",
-        "--upgrade",
-        "--with",
-        f"{collection_name}",
-        "src/prefect_collection_registry/cli.py",
+        str(environment.python),
+        "-m",
+        "prefect_collection_registry.cli",
         collection_name,
         branch_name,
         prefect.runtime.flow_run.id,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        limit=MAX_LINE_BYTES,
+        env={
+            **os.environ,
+            STAGING_DIR_ENV_VAR: str(staging_dir / collection_name),
+            TIMINGS_FILE_ENV_VAR: str(timings_file),
+            **profiling_env,
+            GENERATED_METADATA_FILE_ENV_VAR: str(metadata_file),
+        },
     )
 
-    stdout_buffer: list[str] = []
-    stderr_buffer: list[str] = []
+    # forward output as it arrives, keeping only its tail for the artifact
+    logger = get_run_logger()
+    stdout_tail = TailBuffer()
+    stderr_tail = TailBuffer()
 
-    async def read_stream(stream: Any, buffer: list[str]) -> None:
-        while line := await stream.readline():
-            line = line.decode().strip()
-            if line:
-                buffer.append(line)
+    def on_stdout(line: str) -> None:
+        logger.info(line)
+        stdout_tail.append(line)
 
-    # Read both streams concurrently
-    await asyncio.gather(
-        read_stream(process.stdout, stdout_buffer),
-        read_stream(process.stderr, stderr_buffer),
-    )
+    def on_stderr(line: str) -> None:
+        logger.info(line)
+        stderr_tail.append(line)
 
-    return_code = await process.wait()
+    try:
+        return_code = await stream_process_output(
+            process, on_stdout, on_stderr, timeout=timeout_seconds
+        )
+    except TimeoutError:
+        stderr_tail.append(f"Killed after exceeding {timeout_seconds}s timeout.")
+        return_code = None
 
     # Format the output as markdown with headers
     output: list[str] = []
-    if stdout_buffer:
+    if stdout_tail:
         output.extend(
             [
                 "## Standard Output",
                 "",
                 "```",
-                *stdout_buffer,
+                *stdout_tail.lines(),
                 "```",
                 "",
             ]
         )
-    if stderr_buffer:
+    if stderr_tail:
         output.extend(
             [
                 "## Standard Error",
                 "",
                 "```",
-                *stderr_buffer,
+                *stderr_tail.lines(),
                 "```",
                 "",
             ]
@@ -176,10 +408,89 @@ async def run_collection_update(collection_name: str, branch_name: str) -> str:
             markdown="\n".join(output),
         )
 
+    # report imports even if the update failed, since a slow or memory-hungry
+    # import is a likely reason for it
+    await report_imports(
+        ImportReport.read(import_report_file),
+        f"import-profile-{collection_name}-{branch_name}",
+        import_time_threshold,
+        import_memory_threshold_mb,
+    )
+
+    if return_code is None:
+        raise TimeoutError(
+            f"Updating {collection_name} took longer than {timeout_seconds}s"
+        )
     if return_code != 0:
         raise RuntimeError(f"Failed to update {collection_name}")
 
-    return collection_name
+    if cache_key and metadata_file.exists():
+        generation_cache.put(cache_key, from_json(metadata_file.read_bytes()))
+    timings.seconds.update(StageTimings.read(timings_file).seconds)
+    return timings
+
+
+async def checkpoint_collection_update(
+    manifest: RunManifest,
+    staging_dir: Path,
+    collection_name: str,
+    error: BaseException | None = None,
+) -> None:
+    """Commits the files staged by a collection update to the run's branch,
+    along with the run manifest recording that it is done, or commits the
+    manifest recording that the update failed with `error`.
+    """
+    commit_builder = CommitBuilder(manifest.branch_name)
+    previous_checkpoint = manifest.collections.get(collection_name)
+    if error is None:
+        if (collection_staging_dir := staging_dir / collection_name).exists():
+            commit_builder.load(collection_staging_dir)
+        manifest.record_committed(collection_name, dict(commit_builder.files))
+        message = f"Update metadata for {collection_name}"
+    else:
+        manifest.record_failed(collection_name, error)
+        message = f"Record failed update of {collection_name}"
+    commit_builder.add_file(RUN_MANIFEST_PATH, manifest.dumps())
+
+    try:
+        await commit_builder.commit(message)
+    except Exception:
+        # the branch still holds the previous manifest
+        if previous_checkpoint is None:
+            manifest.collections.pop(collection_name)
+        else:
+            manifest.collections[collection_name] = previous_checkpoint
+        raise
+
+
+@task(name="Commit aggregate views")
+async def commit_aggregate_views(manifest: RunManifest) -> str | None:
+    """Merges the metadata of every collection committed by the run into the
+    aggregate views, and removes the finished run's manifest, in a single commit.
+    """
+    commit_builder = CommitBuilder(manifest.branch_name)
+    await commit_builder.add_aggregate_views(await manifest.committed_files())
+    commit_builder.remove_file(RUN_MANIFEST_PATH)
+    return await commit_builder.commit(
+        f"Update aggregate views for {listrepr(sorted(manifest.completed()))}"
+    )
+
+
+async def branch_matches_main(branch_name: str) -> bool:
+    """Returns whether a branch has the same files as main."""
+
+    async def get_tree_sha(ref: str) -> str:
+        commit_sha = await get_commit_sha(
+            "PrefectHQ", "prefect-collection-registry", ref
+        )
+        return await get_commit_tree_sha(
+            "PrefectHQ", "prefect-collection-registry", commit_sha
+        )
+
+    main_tree_sha, branch_tree_sha = await asyncio.gather(
+        get_tree_sha("main"), get_tree_sha(branch_name)
+    )
+    return main_tree_sha == branch_tree_sha
 
 
 @flow(
@@ -190,72 +501,136 @@ async def run_collection_update(collection_name: str, branch_name: str) -> str:
 async def update_all_collections(
     branch_name: str = "update-metadata",
     include_collections: list[str] | None = None,
+    max_concurrent_updates: int = 4,
+    collection_update_timeout: float = 1800,
+    import_time_threshold: float = DEFAULT_WALL_THRESHOLD_SECONDS,
+    import_memory_threshold_mb: float = DEFAULT_MEMORY_THRESHOLD_MB,
+    profile_imports: bool = False,
 ):
     """Updates all collections for releases and updates the metadata if needed."""
     os.environ["GITHUB_TOKEN"] = (await Secret.aload("gh-util-token")).get()  # type: ignore
 
-    if branch_name == "update-metadata":  # avoid overwriting existing branches
-        branch_name = f"update-metadata-{DateTime.now().format('MM-DD-YYYY-HH-MM-SS')}"
-
-    # First close any old PRs before creating our new one
-    await close_old_metadata_prs()
+    # Share pooled connections across every GitHub and PyPI request in this run
+    async with RegistrySession(
+        response_cache=ResponseCache(get_cache_dir() / "http"),
+        release_watcher=PyPIReleaseWatcher(),
+    ) as session:
+        # First close any old PRs before creating our new one
+        await close_old_metadata_prs()
 
-    # Create branch
-    branch_name = await create_ref_if_not_exists(branch_name)
+        manifest = await start_or_resume_run(branch_name)
+        branch_name = manifest.branch_name
 
-    collections_to_update = set(
-        collection_name
-        for collection_name, needs_update in await asyncio.gather(
-            *[
-                collection_needs_update(collection_name)
-                for collection_name in await get_collection_names()
-            ]
+        collections_to_update = await find_collections_to_update(
+            await get_collection_names()
         )
-        if needs_update
-    )
-
-    if include_collections:
-        collections_to_update = collections_to_update.intersection(include_collections)
 
-    if not collections_to_update:
-        return "No new releases to record."
+        if include_collections:
+            collections_to_update = collections_to_update.intersection(
+                include_collections
+            )
+        # releases are detected against main, so the collections this run
+        # already committed still show up
+        collections_to_update -= manifest.completed()
+
+        if not collections_to_update and not manifest.completed():
+            print(session.summary())
+            return "No new releases to record."
+
+        print(f"Recording new release(s) for: {listrepr(collections_to_update)}...")
+
+        with tempfile.TemporaryDirectory() as staging_dir:
+            semaphore = asyncio.Semaphore(max_concurrent_updates)
+            checkpoint_lock = asyncio.Lock()
+
+            async def bounded_update(collection_name: str) -> StageTimings:
+                async with semaphore:
+                    try:
+                        timings = await run_collection_update(
+                            collection_name,
+                            branch_name,
+                            Path(staging_dir),
+                            collection_update_timeout,
+                            import_time_threshold,
+                            import_memory_threshold_mb,
+                            profile_imports,
+                        )
+                    except Exception as e:
+                        async with checkpoint_lock:
+                            await checkpoint_collection_update(
+                                manifest, Path(staging_dir), collection_name, e
+                            )
+                        raise
+                    # commits to the branch have to be made one after another
+                    async with checkpoint_lock:
+                        with timings.stage("upload"):
+                            await checkpoint_collection_update(
+                                manifest, Path(staging_dir), collection_name
+                            )
+                    return timings
+
+            # Run updates and collect results
+            ordered_collections = sorted(collections_to_update)
+            results = await asyncio.gather(
+                *[bounded_update(collection) for collection in ordered_collections],
+                return_exceptions=True,
+            )
 
-    print(f"Recording new release(s) for: {listrepr(collections_to_update)}...")
+            succeeded_collections: set[str] = set()
+            timings: dict[str, StageTimings] = {}
+            for collection, result in zip(ordered_collections, results):
+                if isinstance(result, BaseException):
+                    print(f"Failed to update collection {collection}: {result}")
+                else:
+                    timings[collection] = result
+                    succeeded_collections.add(collection)
+
+            if timings:
+                print(timings_markdown(timings))
+                await create_markdown_artifact(  # type: ignore
+                    key=f"update-metadata-timings-{branch_name}",
+                    markdown=timings_markdown(timings),
+                )
+
+        for removed in EnvironmentManager().prune():
+            print(f"Removed unused environment {removed.name!r}")
+        for entry in GenerationCache().prune(stale=True):
+            print(
+                f"Removed metadata cached for {entry.key.package} "
+                f"{entry.key.version} by other registry code"
+            )
 
-    # Run updates and collect results
-    states = run_collection_update.map(
-        collections_to_update,
-        unmapped(branch_name),
-        return_state=True,
-    )
+        failed_collections = collections_to_update - succeeded_collections
+        if manifest.completed():
+            # finishes the run, so the next one starts on a new branch
+            await commit_aggregate_views(manifest)
+        if not manifest.completed() or await branch_matches_main(branch_name):
+            if failed_collections:
+                print(f"Updates failed for: {listrepr(failed_collections)}")
+            print("No metadata changed, so no PR was created.")
+            print(session.summary())
+            return "No metadata changed."
+
+        # Create PR regardless of failures - we'll mention failures in the PR description
+        flow_run_url = prefect.runtime.flow_run.ui_url
+        pr_description = f"Collection metadata updates are submitted to this PR by a Prefect [flow run]({flow_run_url})"
+        if failed_collections:
+            pr_description += (
+                f"\n\nNote: Updates failed for: {listrepr(failed_collections)}"
+            )
 
-    succeeded_collections: set[str] = set()
-    for state in states:
-        try:
-            collection = state.result()  # type: ignore
-            succeeded_collections.add(collection)  # type: ignore
-        except Exception as e:
-            print(f"Failed to update collection: {e}")
-
-    # Create PR regardless of failures - we'll mention failures in the PR description
-    flow_run_url = prefect.runtime.flow_run.ui_url
-    pr_description = f"Collection metadata updates are submitted to this PR by a Prefect [flow run]({flow_run_url})"
-    if failed_collections := collections_to_update - succeeded_collections:
-        pr_description += (
-            f"\n\nNote: Updates failed for: {listrepr(failed_collections)}"
+        await create_pull_request(
+            "PrefectHQ",
+            "prefect-collection-registry",
+            "Update metadata for collection releases",
+            pr_description,
+            branch_name,
+            labels=["automated-pr", "collection-metadata"],
         )
+        print(f"Created PR for branch {branch_name}")
+        print(session.summary())
 
-    await create_pull_request(
-        "PrefectHQ",
-        "prefect-collection-registry",
-        "Update metadata for collection releases",
-        pr_description,
-        branch_name,
-        labels=["automated-pr", "collection-metadata"],
-    )
-    print(f"Created PR for branch {branch_name}")
-
-    return "All new releases have been recorded."
+        return "All new releases have been recorded."
 
 
 if __name__ == "__main__":
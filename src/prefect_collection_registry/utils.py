@@ -1,30 +1,42 @@
 import asyncio
 import base64
+import copy
+import hashlib
 import inspect
 import json
-import os
-import tempfile
-from collections.abc import Callable, Generator
-from multiprocessing import Lock
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Generator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
 from pkgutil import iter_modules
 from types import ModuleType
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-import fastjsonschema
 import httpx
 import yaml
 from gh_util.client import GHClient
 from gh_util.types import GitHubRepo
 from prefect import Flow, task
 from prefect.blocks.system import Secret
-from prefect.utilities.importtools import load_module, to_qualified_name
+from prefect.utilities.importtools import to_qualified_name
 from pydantic_core import from_json
 
+from prefect_collection_registry import serialization
+from prefect_collection_registry.import_profiler import load_module
+from prefect_collection_registry.paths import get_cache_dir
+from prefect_collection_registry.pypi import get_pypi_url
+from prefect_collection_registry.session import RegistrySession, get_current_session
+from prefect_collection_registry.versions import ALIAS_KEY, version_sort_key
+
+if TYPE_CHECKING:
+    from prefect_collection_registry.commit_builder import CommitBuilder
+
 CollectionViewVariety = Literal["block", "flow", "worker"]
 
-# Create a lock file in a location accessible to all processes
-LOCK_FILE = os.path.join(tempfile.gettempdir(), "prefect_collection_registry.lock")
-_file_lock = Lock()
+METADATA_BRANCH_PREFIX = "update-metadata-"
 
 
 def skip_parsing(
@@ -44,14 +56,53 @@ def skip_parsing(
 def find_flows_in_module(
     module_name: str,
 ) -> Generator[Flow[..., Any], None, None]:
-    """Finds all flows in a module."""
+    """Finds all flows in a module.
+
+    The module's source is analyzed first, so that only the submodules that
+    define a flow are imported. If the source can't be analyzed, every
+    submodule is imported instead.
+    """
+    from prefect_collection_registry.static_discovery import discover_flows
+
+    try:
+        discovery = discover_flows(module_name)
+    except Exception as e:
+        print(f"Could not analyze {module_name} statically ({e!r}), importing it.")
+        yield from _find_flows_by_importing(module_name)
+        return
+
+    start = time.perf_counter()
+    for submodule_name in discovery.flow_module_names:
+        try:
+            submodule = load_module(submodule_name)
+            print(f"\tLoaded submodule {submodule_name}...")
+        except ModuleNotFoundError:
+            continue
+
+        short_name = submodule_name.rsplit(".", 1)[-1]
+        for name in discovery.flows[submodule_name]:
+            obj = getattr(submodule, name, None)
+            if isinstance(obj, Flow) and not skip_parsing(short_name, obj, module_name):
+                yield obj
+
+    print(
+        f"Imported {len(discovery.flow_module_names)} of "
+        f"{len(discovery.module_names)} modules of {module_name} to find flows "
+        f"({len(discovery.module_names) - len(discovery.flow_module_names)} "
+        f"skipped, {time.perf_counter() - start:.2f}s spent importing)"
+    )
+
+
+def _find_flows_by_importing(
+    module_name: str,
+) -> Generator[Flow[..., Any], None, None]:
     module = load_module(module_name)
 
     for _, name, ispkg in iter_modules(module.__path__):
         if ispkg:
             # catch submodules that are not top-level
             # e.g. prefect-hightouch.syncs.flows
-            yield from find_flows_in_module(f"{module_name}.{name}")
+            yield from _find_flows_by_importing(f"{module_name}.{name}")
         else:
             try:
                 submodule = load_module(f"{module_name}.{name}")
@@ -66,11 +117,43 @@ def find_flows_in_module(
                     yield obj
 
 
+@asynccontextmanager
+async def github_client(
+    session: RegistrySession | None = None,
+) -> AsyncIterator[GHClient]:
+    """Yields the GitHub client of the given or current session, or a one-off
+    client if there is no session.
+    """
+    if session := session or get_current_session():
+        yield session.github
+    else:
+        async with GHClient() as client:
+            yield client
+
+
+@asynccontextmanager
+async def http_client(
+    url: str, session: RegistrySession | None = None
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yields the client for the host of `url` from the given or current
+    session, or a one-off client if there is no session.
+    """
+    if session := session or get_current_session():
+        yield session.client(url)
+    else:
+        async with httpx.AsyncClient() as client:
+            yield client
+
+
 async def get_file_contents(
-    repo_owner: str, repo_name: str, path: str, ref: str
+    repo_owner: str,
+    repo_name: str,
+    path: str,
+    ref: str,
+    session: RegistrySession | None = None,
 ) -> tuple[str, str]:
     """Get a file's contents and its SHA."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         response = await client.get(
             f"/repos/{repo_owner}/{repo_name}/contents/{path}", params={"ref": ref}
         )
@@ -79,6 +162,19 @@ async def get_file_contents(
         return content, data["sha"]
 
 
+def git_blob_sha(content: str | bytes) -> str:
+    """Returns the SHA that git (and so GitHub) gives a file with this content."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def record_skipped_write(path: str, session: RegistrySession | None = None) -> None:
+    """Notes that a write was skipped because the content was unchanged."""
+    print(f"{path} is unchanged, skipping the write.")
+    if (session := session or get_current_session()) is not None:
+        session.skipped_writes += 1
+
+
 async def create_or_update_file(
     repo_owner: str,
     repo_name: str,
@@ -87,9 +183,18 @@ async def create_or_update_file(
     content: str,
     branch: str,
     sha: str | None = None,
+    session: RegistrySession | None = None,
 ) -> dict[str, Any]:
-    """Create or update a file in a repository."""
-    async with GHClient() as client:
+    """Create or update a file in a repository.
+
+    If `sha` (the SHA of the existing file) is given and matches the SHA of
+    `content`, nothing is written.
+    """
+    if sha is not None and git_blob_sha(content) == sha:
+        record_skipped_write(path, session)
+        return {"content": {"path": path, "sha": sha}}
+
+    async with github_client(session) as client:
         data = {
             "message": message,
             "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
@@ -104,11 +209,15 @@ async def create_or_update_file(
         return response.json()
 
 
-async def get_latest_pypi_release(package_name: str) -> str:
+async def get_latest_pypi_release(
+    package_name: str, session: RegistrySession | None = None
+) -> str:
     """Get the latest release version from PyPI for a package."""
     # For prefect, we need to use the GitHub release
     if package_name == "prefect":
-        latest_release = await get_latest_release("PrefectHQ", package_name)
+        latest_release = await get_latest_release(
+            "PrefectHQ", package_name, session=session
+        )
         return (
             "v" + latest_release
             if not latest_release.startswith("v")
@@ -116,13 +225,73 @@ async def get_latest_pypi_release(package_name: str) -> str:
         )
 
     # For other packages, use PyPI
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"https://pypi.org/pypi/{package_name}/json")
+    url = f"{get_pypi_url()}/pypi/{package_name}/json"
+    session = session or get_current_session()
+    async with http_client(url, session) as client:
+        if session is not None and session.release_watcher is not None:
+            return "v" + await session.release_watcher.latest_version(
+                package_name, client
+            )
+
+        response = await client.get(url)
         response.raise_for_status()
         data = response.json()
         return "v" + data["info"]["version"]
 
 
+async def get_previous_release_metadata(
+    collection_name: str,
+    variety: CollectionViewVariety,
+    release: str,
+    branch_name: str,
+    repo_name: str = "prefect-collection-registry",
+    session: RegistrySession | None = None,
+) -> tuple[str, dict[str, Any]] | None:
+    """Returns the most recent release recorded before `release` on a branch and
+    its metadata, resolving aliases, or `None` if there is no earlier release.
+    """
+    directory = f"collections/{collection_name}/{variety}s"
+    try:
+        contents = await get_repo_contents(
+            "PrefectHQ", repo_name, directory, ref=branch_name, session=session
+        )
+    except Exception as e:
+        if "Not Found" in str(e):
+            return None
+        raise
+
+    earlier_releases = [
+        content["name"].removesuffix(".json")
+        for content in contents
+        if content["name"].endswith(".json")
+        and version_sort_key(content["name"].removesuffix(".json"))
+        < version_sort_key(release)
+    ]
+    if not earlier_releases:
+        return None
+
+    previous_release = max(earlier_releases, key=version_sort_key)
+    content, _ = await get_file_contents(
+        "PrefectHQ",
+        repo_name,
+        f"{directory}/{previous_release}.json",
+        branch_name,
+        session=session,
+    )
+    previous: dict[str, Any] = from_json(content)
+    if ALIAS_KEY in previous:
+        previous_release = previous[ALIAS_KEY]
+        content, _ = await get_file_contents(
+            "PrefectHQ",
+            repo_name,
+            f"{directory}/{previous_release}.json",
+            branch_name,
+            session=session,
+        )
+        previous = from_json(content)
+    return previous_release, previous.get(collection_name, {})
+
+
 @task
 async def submit_updates(
     collection_metadata: dict[str, Any],
@@ -130,190 +299,570 @@ async def submit_updates(
     branch_name: str,
     variety: CollectionViewVariety,
     repo_name: str = "prefect-collection-registry",
-) -> None:
-    """Submits updates to the collection registry.
-    Uses a multiprocessing lock to prevent concurrent modifications across processes.
+    commit_builder: "CommitBuilder | None" = None,
+) -> bool:
+    """Submits the versioned metadata file of a collection release.
+
+    If the metadata is identical to that of the previous recorded release, only
+    an alias pointing to that release is written. If a `commit_builder` is
+    given, the file is only staged on it; otherwise it is written to the branch
+    via the Contents API. Aggregate views are not touched here: they are
+    rebuilt once from all versioned files of a run by `update_aggregate_views`
+    or `CommitBuilder.add_aggregate_views`.
+
+    Returns whether the metadata changed, i.e. whether the aggregate view needs
+    to be rebuilt.
     """
     if branch_name == "main":
         raise ValueError("Cannot submit updates directly to main!")
 
-    metadata_file = f"views/aggregate-{variety}-metadata.json"
-
     # Get latest release from PyPI instead of GitHub
     latest_release = await get_latest_pypi_release(collection_name)
 
-    # First handle the version-specific file which can't have conflicts
     collection_version_path = (
         f"collections/{collection_name}/{variety}s/{latest_release}.json"
     )
+    content = serialization.dumps_text({collection_name: collection_metadata})
+    changed = True
 
-    with _file_lock:
-        # Get version file SHA
-        try:
-            _, version_sha = await get_file_contents(
-                "PrefectHQ", repo_name, collection_version_path, branch_name
-            )
-        except Exception as e:
-            if "Not Found" in str(e):
-                version_sha = None
-            else:
-                raise
+    previous = await get_previous_release_metadata(
+        collection_name, variety, latest_release, branch_name, repo_name
+    )
+    if previous and serialization.content_hash(
+        previous[1]
+    ) == serialization.content_hash(collection_metadata):
+        print(
+            f"{variety} metadata of {collection_name} {latest_release} is unchanged "
+            f"since {previous[0]}, recording an alias."
+        )
+        content = serialization.dumps_text({ALIAS_KEY: previous[0]})
+        changed = False
 
-        # Create version-specific file
-        try:
-            await create_or_update_file(
-                "PrefectHQ",
-                repo_name,
-                collection_version_path,
-                f"Add `{collection_name}` `{latest_release}` to {variety} records",
-                json.dumps({collection_name: collection_metadata}, indent=2),
-                branch_name,
-                sha=version_sha,
-            )
-            print(f"Added {collection_name} {latest_release} to {variety} records!")
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 409:
-                print(
-                    f"{variety} metadata for {collection_name} {latest_release} already exists!"
-                )
-                return
+    if commit_builder is not None:
+        commit_builder.add_file(collection_version_path, content)
+        print(f"Staged {collection_name} {latest_release} {variety} records!")
+        return changed
+
+    try:
+        _, version_sha = await get_file_contents(
+            "PrefectHQ", repo_name, collection_version_path, branch_name
+        )
+    except Exception as e:
+        if "Not Found" in str(e):
+            version_sha = None
+        else:
             raise
 
-    # Now handle the aggregate file with retries
-    if collection_metadata:
-        while True:
-            with _file_lock:
-                try:
-                    # Get latest content and SHA
-                    content, aggregate_sha = await get_file_contents(
-                        "PrefectHQ", repo_name, metadata_file, branch_name
-                    )
-                    existing_metadata_dict: dict[str, Any] = from_json(content)
-                except Exception as e:
-                    if "Not Found" in str(e):
-                        existing_metadata_dict = {}
-                        aggregate_sha = None
-                    else:
-                        raise
+    try:
+        await create_or_update_file(
+            "PrefectHQ",
+            repo_name,
+            collection_version_path,
+            f"Add `{collection_name}` `{latest_release}` to {variety} records",
+            content,
+            branch_name,
+            sha=version_sha,
+        )
+        print(f"Added {collection_name} {latest_release} to {variety} records!")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 409:
+            print(
+                f"{variety} metadata for {collection_name} {latest_release} already exists!"
+            )
+            return changed
+        raise
+    return changed
 
-                existing_metadata_dict[collection_name] = collection_metadata
-                updated_metadata_dict = dict(sorted(existing_metadata_dict.items()))
 
-                validate_view_content(updated_metadata_dict, variety)
+def merge_aggregate_view(
+    view_content: dict[str, Any],
+    collection_outputs: dict[str, Any],
+    variety: CollectionViewVariety,
+) -> dict[str, Any]:
+    """Merges the metadata generated for some collections into an aggregate view.
 
-                try:
-                    await create_or_update_file(
-                        "PrefectHQ",
-                        repo_name,
-                        metadata_file,
-                        f"Update aggregate {variety} metadata with `{collection_name}` `{latest_release}`",
-                        json.dumps(updated_metadata_dict, indent=2),
-                        branch_name,
-                        sha=aggregate_sha,
-                    )
-                    print(
-                        f"Updated aggregate {variety} metadata for {collection_name} {latest_release}!"
-                    )
-                    return  # Success, we're done
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 409:
-                        print(
-                            "Conflict updating aggregate file, retrying with fresh SHA..."
-                        )
-                        # Release lock and try again
-                        continue
-                    raise
+    Collections without any metadata of this variety are left as they are. The
+    result is sorted by collection name and validated against the view's schema.
+    """
+    merged = {
+        **view_content,
+        **{
+            collection_name: collection_metadata
+            for collection_name, collection_metadata in collection_outputs.items()
+            if collection_metadata
+        },
+    }
+    updated_view_content = dict(sorted(merged.items()))
+    validate_view_content(updated_view_content, variety)
+    return updated_view_content
+
+
+async def update_aggregate_views(
+    outputs: dict[CollectionViewVariety, dict[str, Any]],
+    branch_name: str,
+    repo_name: str = "prefect-collection-registry",
+    session: RegistrySession | None = None,
+) -> None:
+    """Rebuilds the aggregate views on a branch from the metadata generated in
+    a run, keyed by variety and then by collection name.
+
+    Each aggregate view is read and written at most once, after all versioned
+    files have been submitted, so there is nothing to retry on conflicts.
+    """
+    if branch_name == "main":
+        raise ValueError("Cannot submit updates directly to main!")
+
+    for variety, collection_outputs in outputs.items():
+        if not any(collection_outputs.values()):
+            continue
+
+        metadata_file = f"views/aggregate-{variety}-metadata.json"
+        existing_metadata_dict: dict[str, Any] = {}
+        aggregate_sha = None
+        if existing := await get_large_file_contents(
+            "PrefectHQ", repo_name, metadata_file, branch_name, session=session
+        ):
+            content, aggregate_sha = existing
+            existing_metadata_dict = from_json(content)
+
+        updated_metadata_dict = merge_aggregate_view(
+            existing_metadata_dict, collection_outputs, variety
+        )
+        await create_or_update_file(
+            "PrefectHQ",
+            repo_name,
+            metadata_file,
+            f"Update aggregate {variety} metadata with "
+            f"{', '.join(f'`{name}`' for name in sorted(collection_outputs))}",
+            serialization.dumps_text(updated_metadata_dict),
+            branch_name,
+            sha=aggregate_sha,
+            session=session,
+        )
+        print(f"Updated aggregate {variety} metadata!")
+
+
+CATALOG_TREE_QUERY = """
+query($owner: String!, $name: String!, $expression: String!, $withText: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    object(expression: $expression) {
+      ... on Tree {
+        oid
+        entries @include(if: $withText) {
+          name
+          type
+          object { ... on Blob { text } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+async def _query_catalog_tree(
+    repo_owner: str,
+    repo_name: str,
+    expression: str,
+    with_text: bool,
+    session: RegistrySession | None = None,
+) -> dict[str, Any]:
+    async with github_client(session) as client:
+        response = await client.post(
+            "/graphql",
+            json={
+                "query": CATALOG_TREE_QUERY,
+                "variables": {
+                    "owner": repo_owner,
+                    "name": repo_name,
+                    "expression": expression,
+                    "withText": with_text,
+                },
+            },
+        )
+        data = response.json()
+    if data.get("errors"):
+        raise RuntimeError(f"GraphQL query for {expression!r} failed: {data['errors']}")
+    if (tree := data["data"]["repository"]["object"]) is None:
+        raise RuntimeError(f"Not Found: {expression!r} in {repo_owner}/{repo_name}")
+    return tree
+
+
+async def load_catalog(
+    repo_owner: str = "PrefectHQ",
+    repo_name: str = "Prefect",
+    path: str = "docs/integrations/catalog",
+    ref: str = "main",
+    cache_dir: Path | None = None,
+    session: RegistrySession | None = None,
+) -> dict[str, Any]:
+    """Returns the parsed YAML files of the integrations catalog, keyed by name.
+
+    The SHA of the catalog's tree is looked up first, and the catalog is only
+    fetched (every YAML file in one GraphQL request) and parsed if no catalog
+    parsed from that tree is cached in `cache_dir`. Only the newest catalog is
+    kept in the cache.
+    """
+    cache_dir = cache_dir or get_cache_dir() / "catalog"
+    expression = f"{ref}:{path}"
+
+    tree = await _query_catalog_tree(
+        repo_owner, repo_name, expression, with_text=False, session=session
+    )
+    # the catalog is cached under the SHA of the tree it was read from
+    cache_file = cache_dir / f"{tree['oid']}.json"
+    try:
+        return json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        pass
+
+    tree = await _query_catalog_tree(
+        repo_owner, repo_name, expression, with_text=True, session=session
+    )
+    yaml_files = {
+        entry["name"].removesuffix(".yaml"): entry["object"]["text"]
+        for entry in tree["entries"]
+        if entry["type"] == "blob"
+        and entry["name"].endswith(".yaml")
+        and entry["object"].get("text") is not None
+    }
+    parsed = await asyncio.gather(
+        *[asyncio.to_thread(yaml.safe_load, text) for text in yaml_files.values()]
+    )
+    catalog = dict(zip(yaml_files, parsed))
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # only the newest catalog is kept, as older trees are never read again
+    for stale_file in cache_dir.glob("*.json"):
+        stale_file.unlink(missing_ok=True)
+    cache_file.write_text(json.dumps(catalog, default=str))
+    return catalog
 
 
 async def get_collection_names(
     repo_owner: str = "PrefectHQ",
     repo_name: str = "Prefect",
     path: str = "docs/integrations/catalog",
+    session: RegistrySession | None = None,
 ) -> list[str]:
     """Get the names of all collections."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url=f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{path}",
-            headers={"Accept": "application/vnd.github+json"},
-        )
-        response.raise_for_status()
-        files = response.json()
-
-    collections: list[str] = []
+    catalog = await load_catalog(repo_owner, repo_name, path, session=session)
 
-    async def process_file(file: dict[str, Any]):
-        if file["type"] == "file" and file["name"].endswith(".yaml"):
-            content, _ = await get_file_contents(
-                repo_owner, repo_name, f"{path}/{file['name']}", "main"
-            )
-            yaml_data = yaml.safe_load(content)  # type: ignore
-            if yaml_data.get("author") == "Prefect":  # type: ignore
-                collections.append(file["name"].replace(".yaml", ""))
-
-    await asyncio.gather(*[process_file(file) for file in files])
+    collections = sorted(
+        name
+        for name, yaml_data in catalog.items()
+        if isinstance(yaml_data, dict) and yaml_data.get("author") == "Prefect"
+    )
     collections.append("prefect")
     return collections
 
 
+# Prefect's logo, for collections that have no logo of their own
+DEFAULT_LOGO_URL = "https://github.com/PrefectHQ.png"
+
+
 def get_logo_url_for_collection(collection_name: str) -> str:
-    """Returns the URL of the logo for a collection."""
-    blocks_metadata = read_view_content("block")
+    """Returns the URL of the logo for a collection.
 
-    block_types_from_collection = blocks_metadata[collection_name]["block_types"]
+    That's the logo of its last block type or, for a collection without block
+    types (e.g. one that only has flows), the logo its flows were recorded
+    with, falling back to `DEFAULT_LOGO_URL`.
+    """
+    block_types = _get_cached_view("block").get(collection_name, {}).get("block_types")
+    if block_types:
+        # the logo of the last block type, without mutating the cached view
+        return next(reversed(block_types.values()))["logo_url"]
 
-    return block_types_from_collection.popitem()[1]["logo_url"]
+    if flows := _get_cached_view("flow").get(collection_name):
+        return next(iter(flows.values()))["logo_url"]
+    return DEFAULT_LOGO_URL
 
 
 def read_view_content(view: CollectionViewVariety) -> dict[str, Any]:
-    """Reads the content of a view from the views directory."""
-    repo_organization = "PrefectHQ"
-    repo_name = "prefect-collection-registry"
+    """Reads the content of a view from the views directory.
+
+    The view is fetched at most once per `VIEW_CACHE_TTL_SECONDS` and the
+    returned dict is a copy, so callers are free to mutate it.
+    """
+    return copy.deepcopy(_get_cached_view(view))
+
+
+VIEWS_BASE_URL = (
+    "https://raw.githubusercontent.com/PrefectHQ/prefect-collection-registry/main/views"
+)
+VIEW_CACHE_TTL_SECONDS = 300
+LOCAL_VIEWS_DIR = Path(__file__).parents[2] / "views"
+
 
-    repo_url = f"https://raw.githubusercontent.com/{repo_organization}/{repo_name}/main"
+@dataclass
+class _CachedView:
+    content: dict[str, Any]
+    etag: str | None
+    fetched_at: float
 
-    view_filename = f"aggregate-{view}-metadata.json"
 
-    resp = httpx.get(repo_url + f"/views/{view_filename}")
-    resp.raise_for_status()
-    return resp.json()
+_view_cache: dict[CollectionViewVariety, _CachedView] = {}
+_view_cache_lock = threading.Lock()
+
+
+def _get_cached_view(view: CollectionViewVariety) -> dict[str, Any]:
+    """Returns the process-wide cached content of a view, which must not be
+    mutated.
+
+    Stale entries are revalidated with `If-None-Match`. If the view can't be
+    fetched, the last cached content or the copy in the local checkout is used.
+    """
+    with _view_cache_lock:
+        cached = _view_cache.get(view)
+        if cached and time.monotonic() - cached.fetched_at < VIEW_CACHE_TTL_SECONDS:
+            return cached.content
+
+        view_filename = f"aggregate-{view}-metadata.json"
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+        try:
+            resp = httpx.get(f"{VIEWS_BASE_URL}/{view_filename}", headers=headers)
+            if resp.status_code != 304:
+                resp.raise_for_status()
+        except httpx.HTTPError as e:
+            if cached:
+                print(f"Failed to refresh {view_filename}, using cached copy: {e}")
+                return cached.content
+            if (local_path := LOCAL_VIEWS_DIR / view_filename).exists():
+                print(f"Failed to fetch {view_filename}, using {local_path}: {e}")
+                content = from_json(local_path.read_bytes())
+                _view_cache[view] = _CachedView(content, None, time.monotonic())
+                return content
+            raise
+
+        if resp.status_code == 304 and cached:
+            cached.fetched_at = time.monotonic()
+            return cached.content
+
+        _view_cache[view] = _CachedView(
+            resp.json(), resp.headers.get("ETag"), time.monotonic()
+        )
+        return _view_cache[view].content
 
 
 async def get_repo_contents(
-    repo_owner: str, repo_name: str, path: str, ref: str = "main"
+    repo_owner: str,
+    repo_name: str,
+    path: str,
+    ref: str = "main",
+    session: RegistrySession | None = None,
 ) -> list[dict[str, Any]]:
     """Get contents of a repository path."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         response = await client.get(
             f"/repos/{repo_owner}/{repo_name}/contents/{path}", params={"ref": ref}
         )
         return response.json()
 
 
-async def get_latest_release(repo_owner: str, repo_name: str) -> str:
+async def get_latest_release(
+    repo_owner: str, repo_name: str, session: RegistrySession | None = None
+) -> str:
     """Get the latest release tag for a repository."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         response = await client.get(f"/repos/{repo_owner}/{repo_name}/releases/latest")
         return response.json()["tag_name"]
 
 
-async def get_commit_sha(repo_owner: str, repo_name: str, ref: str) -> str:
+async def get_commit_sha(
+    repo_owner: str, repo_name: str, ref: str, session: RegistrySession | None = None
+) -> str:
     """Get the SHA for a given ref."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         response = await client.get(f"/repos/{repo_owner}/{repo_name}/commits/{ref}")
         return response.json()["sha"]
 
 
 async def create_repo_ref(
-    repo_owner: str, repo_name: str, ref: str, sha: str
+    repo_owner: str,
+    repo_name: str,
+    ref: str,
+    sha: str,
+    session: RegistrySession | None = None,
 ) -> dict[str, Any]:
     """Create a new git reference in a repository."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         response = await client.post(
             f"/repos/{repo_owner}/{repo_name}/git/refs", json={"ref": ref, "sha": sha}
         )
         return response.json()
 
 
+async def get_commit_tree_sha(
+    repo_owner: str,
+    repo_name: str,
+    commit_sha: str,
+    session: RegistrySession | None = None,
+) -> str:
+    """Get the SHA of the tree a commit points to."""
+    async with github_client(session) as client:
+        response = await client.get(
+            f"/repos/{repo_owner}/{repo_name}/git/commits/{commit_sha}"
+        )
+        return response.json()["tree"]["sha"]
+
+
+async def get_tree_paths(
+    repo_owner: str,
+    repo_name: str,
+    tree: str,
+    session: RegistrySession | None = None,
+) -> list[str]:
+    """Get the paths of all files below a tree (given by SHA or ref name) with a
+    single recursive Git Trees request.
+    """
+    return list(await get_tree_blob_shas(repo_owner, repo_name, tree, session))
+
+
+async def get_tree_blob_shas(
+    repo_owner: str,
+    repo_name: str,
+    tree: str,
+    session: RegistrySession | None = None,
+) -> dict[str, str]:
+    """Get the blob SHA of every file below a tree (given by SHA or ref name),
+    by path, with a single recursive Git Trees request.
+    """
+    async with github_client(session) as client:
+        response = await client.get(
+            f"/repos/{repo_owner}/{repo_name}/git/trees/{tree}",
+            params={"recursive": "1"},
+        )
+        data = response.json()
+        if data.get("truncated"):
+            raise RuntimeError(f"The tree of {repo_owner}/{repo_name} is too large.")
+        return {
+            entry["path"]: entry["sha"]
+            for entry in data["tree"]
+            if entry["type"] == "blob"
+        }
+
+
+async def get_directory_blob_shas(
+    repo_owner: str,
+    repo_name: str,
+    path: str,
+    ref: str = "main",
+    session: RegistrySession | None = None,
+) -> dict[str, str]:
+    """Get the blob SHA of every file directly in a directory, by path, without
+    reading any file contents. Returns an empty dict if there is no such
+    directory.
+    """
+    try:
+        entries = await get_repo_contents(repo_owner, repo_name, path, ref, session)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {}
+        raise
+    return {entry["path"]: entry["sha"] for entry in entries if entry["type"] == "file"}
+
+
+async def get_blob(
+    repo_owner: str,
+    repo_name: str,
+    sha: str,
+    session: RegistrySession | None = None,
+) -> str:
+    """Get the content of a blob, which unlike the Contents API works for files
+    larger than 1 MB.
+    """
+    async with github_client(session) as client:
+        response = await client.get(f"/repos/{repo_owner}/{repo_name}/git/blobs/{sha}")
+        return base64.b64decode(response.json()["content"]).decode("utf-8")
+
+
+async def get_large_file_contents(
+    repo_owner: str,
+    repo_name: str,
+    path: str,
+    ref: str,
+    session: RegistrySession | None = None,
+) -> tuple[str, str] | None:
+    """Get a file's contents and its SHA through its blob, so that files larger
+    than 1 MB can be read too. Returns `None` if there is no such file.
+    """
+    directory = path.rpartition("/")[0]
+    blob_shas = await get_directory_blob_shas(
+        repo_owner, repo_name, directory, ref, session
+    )
+    if (sha := blob_shas.get(path)) is None:
+        return None
+    return await get_blob(repo_owner, repo_name, sha, session), sha
+
+
+async def create_blob(
+    repo_owner: str,
+    repo_name: str,
+    content: str,
+    session: RegistrySession | None = None,
+) -> str:
+    """Create a blob in a repository and return its SHA."""
+    async with github_client(session) as client:
+        response = await client.post(
+            f"/repos/{repo_owner}/{repo_name}/git/blobs",
+            json={"content": content, "encoding": "utf-8"},
+        )
+        return response.json()["sha"]
+
+
+async def create_tree(
+    repo_owner: str,
+    repo_name: str,
+    entries: list[dict[str, Any]],
+    base_tree: str | None = None,
+    session: RegistrySession | None = None,
+) -> str:
+    """Create a tree in a repository and return its SHA."""
+    data: dict[str, Any] = {"tree": entries}
+    if base_tree:
+        data["base_tree"] = base_tree
+
+    async with github_client(session) as client:
+        response = await client.post(
+            f"/repos/{repo_owner}/{repo_name}/git/trees", json=data
+        )
+        return response.json()["sha"]
+
+
+async def create_commit(
+    repo_owner: str,
+    repo_name: str,
+    message: str,
+    tree: str,
+    parents: list[str],
+    session: RegistrySession | None = None,
+) -> str:
+    """Create a commit in a repository and return its SHA."""
+    async with github_client(session) as client:
+        response = await client.post(
+            f"/repos/{repo_owner}/{repo_name}/git/commits",
+            json={"message": message, "tree": tree, "parents": parents},
+        )
+        return response.json()["sha"]
+
+
+async def update_repo_ref(
+    repo_owner: str,
+    repo_name: str,
+    ref: str,
+    sha: str,
+    force: bool = False,
+    session: RegistrySession | None = None,
+) -> dict[str, Any]:
+    """Point an existing git reference (e.g. `heads/my-branch`) at a new SHA."""
+    async with github_client(session) as client:
+        response = await client.patch(
+            f"/repos/{repo_owner}/{repo_name}/git/refs/{ref}",
+            json={"sha": sha, "force": force},
+        )
+        return response.json()
+
+
 async def create_pull_request(
     repo_owner: str,
     repo_name: str,
@@ -322,11 +871,12 @@ async def create_pull_request(
     head: str,
     base: str = "main",
     labels: list[str] | None = None,
+    session: RegistrySession | None = None,
 ) -> dict[str, Any]:
     """Create a pull request."""
     labels = labels or []
     # First check if branches are different
-    async with GHClient() as client:
+    async with github_client(session) as client:
         # Compare branches
         response = await client.get(
             f"/repos/{repo_owner}/{repo_name}/compare/{base}...{head}"
@@ -356,7 +906,7 @@ async def create_pull_request(
             )
             return data
         except httpx.HTTPStatusError as e:
-            if "A pull request already exists" in str(e):
+            if "A pull request already exists" in e.response.text:
                 print(f"PR from {head} to {base} already exists")
                 return {}
             raise
@@ -372,15 +922,32 @@ async def get_repo(name: str) -> GitHubRepo:
 
 
 def validate_view_content(
-    view_dict: dict[str, Any], variety: CollectionViewVariety
+    view_dict: dict[str, Any],
+    variety: CollectionViewVariety,
+    manifest_dir: Path | None = None,
 ) -> None:
-    """Raises an error if the view content is not valid."""
-    from . import metadata_schemas
+    """Raises an error if the view content is not valid.
+
+    Collections whose content already passed validation against the current
+    schema, as recorded in a manifest in `manifest_dir` (by default in the
+    cache directory), are skipped. Once the whole view is valid, the manifest
+    is replaced with the hashes of its collections.
+    """
+    from prefect_collection_registry.validators import (
+        ValidationManifest,
+        get_validator,
+    )
 
-    schema = getattr(metadata_schemas, f"{variety}_schema")
-    validate = fastjsonschema.compile(schema)  # type: ignore
+    validate = get_validator(variety)
+    manifest = ValidationManifest(variety, manifest_dir)
+    passed: set[str] = set()
 
     for collection_name, collection_metadata in view_dict.items():
+        entry_hash = serialization.content_hash({collection_name: collection_metadata})
+        passed.add(entry_hash)
+        if entry_hash in manifest:
+            continue
+
         if variety == "block":
             collection_metadata = collection_metadata["block_types"]
         try:
@@ -390,10 +957,20 @@ def validate_view_content(
             raise ValueError("There's a key with empty value in this view!")
         print(f"  Validated {collection_name} summary in {variety} view!")
 
+    skipped = len(passed & manifest.passed)
+    if skipped:
+        print(f"  Skipped {skipped} unchanged collection(s) in {variety} view.")
+    manifest.save(passed)
+
 
-async def branch_exists(repo_owner: str, repo_name: str, branch_name: str) -> bool:
+async def branch_exists(
+    repo_owner: str,
+    repo_name: str,
+    branch_name: str,
+    session: RegistrySession | None = None,
+) -> bool:
     """Check if a branch exists."""
-    async with GHClient() as client:
+    async with github_client(session) as client:
         try:
             await client.get(f"/repos/{repo_owner}/{repo_name}/branches/{branch_name}")
             return True
@@ -403,63 +980,109 @@ async def branch_exists(repo_owner: str, repo_name: str, branch_name: str) -> bo
             raise
 
 
+async def get_all_pages(
+    client: httpx.AsyncClient, path: str, params: dict[str, Any] | None = None
+) -> list[Any]:
+    """Get every item of a paginated GitHub listing, 100 at a time, following
+    the `next` links of the `Link` header.
+    """
+    items: list[Any] = []
+    url: str | None = path
+    params = {**(params or {}), "per_page": 100}
+    while url is not None:
+        response = await client.get(url, params=params)
+        items.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+        params = None  # the next link carries the query
+    return items
+
+
+def metadata_branch_time(branch_name: str) -> datetime | None:
+    """Returns when a metadata branch (named `update-metadata-MM-DD-YYYY-HH-MM-SS`)
+    was created, or `None` if it isn't named like one.
+    """
+    try:
+        return datetime.strptime(
+            branch_name.removeprefix(METADATA_BRANCH_PREFIX), "%m-%d-%Y-%H-%M-%S"
+        )
+    except ValueError:
+        return None
+
+
+async def get_metadata_branch_times(
+    repo_owner: str = "PrefectHQ",
+    repo_name: str = "prefect-collection-registry",
+    session: RegistrySession | None = None,
+) -> dict[str, datetime]:
+    """Get every metadata branch, with the time it was created at."""
+    async with github_client(session) as client:
+        refs = await get_all_pages(
+            client,
+            f"/repos/{repo_owner}/{repo_name}/git/matching-refs/heads/"
+            f"{METADATA_BRANCH_PREFIX}",
+        )
+    branch_times: dict[str, datetime] = {}
+    for ref in refs:
+        branch = ref["ref"].removeprefix("refs/heads/")
+        if (created_at := metadata_branch_time(branch)) is not None:
+            branch_times[branch] = created_at
+    return branch_times
+
+
 async def close_old_metadata_prs(
     repo_owner: str = "PrefectHQ",
     repo_name: str = "prefect-collection-registry",
+    max_concurrency: int = 8,
+    session: RegistrySession | None = None,
 ) -> None:
     """Closes all metadata PRs except for the one associated with the latest branch.
     Also deletes all old metadata branches except the latest one.
+
+    Branches are ordered by the time in their name; branches not named like
+    `update-metadata-MM-DD-YYYY-HH-MM-SS` are left alone. Every page of branches
+    and open PRs is read, and at most `max_concurrency` PRs are closed or
+    branches deleted at the same time.
     """
-    async with GHClient() as client:
-        # Get all branches to find the latest
-        branches_response = await client.get(
-            f"/repos/{repo_owner}/{repo_name}/branches"
-        )
-        metadata_branches = [
-            branch["name"]
-            for branch in branches_response.json()
-            if branch["name"].startswith("update-metadata-")
-        ]
-
-        if not metadata_branches:
-            return
-
-        # Sort by the timestamp part of the branch name to get truly latest
-        latest_branch = max(
-            metadata_branches,
-            key=lambda x: x.split("-", 2)[
-                2
-            ],  # Get the timestamp part after "update-metadata-"
+    branch_times = await get_metadata_branch_times(repo_owner, repo_name, session)
+    if not branch_times:
+        return
+
+    latest_branch = max(branch_times, key=branch_times.__getitem__)
+    old_branches = sorted(set(branch_times) - {latest_branch})
+    if not old_branches:
+        return
+
+    async with github_client(session) as client:
+        pulls = await get_all_pages(
+            client, f"/repos/{repo_owner}/{repo_name}/pulls", {"state": "open"}
         )
+        old_pulls = [pull for pull in pulls if pull["head"]["ref"] in old_branches]
 
-        # Delete all old metadata branches except latest
-        for branch in metadata_branches:
-            if branch != latest_branch:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def close_pull(pull: dict[str, Any]) -> None:
+            async with semaphore:
+                await client.patch(
+                    f"/repos/{repo_owner}/{repo_name}/pulls/{pull['number']}",
+                    json={"state": "closed"},
+                )
+            print(f"Closed PR #{pull['number']}: {pull['title']}")
+
+        async def delete_branch(branch: str) -> None:
+            async with semaphore:
                 try:
                     await client.delete(
                         f"/repos/{repo_owner}/{repo_name}/git/refs/heads/{branch}"
                     )
                     print(f"Deleted branch {branch}")
                 except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 404:
+                    # closing a PR can delete its branch, e.g. with auto-delete
+                    if e.response.status_code in (404, 422):
                         print(f"Branch {branch} already deleted")
                     else:
                         raise
 
-        # Get all open PRs and close them if they're for metadata branches
-        response = await client.get(
-            f"/repos/{repo_owner}/{repo_name}/pulls",
-            params={"state": "open"},
-        )
-
-        # Close all metadata PRs except latest
-        for pr in response.json():
-            if (
-                pr["head"]["ref"].startswith("update-metadata-")
-                and pr["head"]["ref"] != latest_branch
-            ):
-                await client.patch(
-                    f"/repos/{repo_owner}/{repo_name}/pulls/{pr['number']}",
-                    json={"state": "closed"},
-                )
-                print(f"Closed PR #{pr['number']}: {pr['title']}")
+        # close PRs before deleting their branches, so they are closed rather
+        # than left pointing at a missing branch
+        await asyncio.gather(*[close_pull(pull) for pull in old_pulls])
+        await asyncio.gather(*[delete_branch(branch) for branch in old_branches])
@@ -0,0 +1,115 @@
+import hashlib
+import importlib.util
+import json
+import os
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import fastjsonschema
+
+from prefect_collection_registry import metadata_schemas
+from prefect_collection_registry.paths import atomic_write, get_cache_dir
+from prefect_collection_registry.utils import CollectionViewVariety
+
+# If set, generated validator source is written to (and imported from) this
+# directory, so that later processes don't need to compile the schemas again.
+VALIDATOR_DIR_ENV_VAR = "PREFECT_COLLECTION_REGISTRY_VALIDATOR_DIR"
+
+Validator = Callable[[Any], Any]
+
+_validators: dict[tuple[CollectionViewVariety, str], Validator] = {}
+
+
+def get_schema(variety: CollectionViewVariety) -> dict[str, Any]:
+    """Returns the JSON schema for a variety of metadata."""
+    return getattr(metadata_schemas, f"{variety}_schema")
+
+
+def schema_hash(schema: dict[str, Any]) -> str:
+    """Returns a short, stable hash of a schema and the fastjsonschema version
+    that compiles it.
+    """
+    encoded = json.dumps([schema, fastjsonschema.VERSION], sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+@cache
+def _schema_key(variety: CollectionViewVariety) -> str:
+    """Returns the hash of a variety's schema, which is a module constant and
+    so only needs hashing once.
+    """
+    return schema_hash(get_schema(variety))
+
+
+def get_validator(
+    variety: CollectionViewVariety, validator_dir: Path | None = None
+) -> Validator:
+    """Returns a validator for a variety of metadata, compiling it the first time
+    it is requested and reusing it afterwards.
+
+    If `validator_dir` (or the `PREFECT_COLLECTION_REGISTRY_VALIDATOR_DIR`
+    environment variable) is set, the validator is imported from previously
+    generated source in that directory, or generated there if missing.
+    """
+    key = (variety, _schema_key(variety))
+
+    if key not in _validators:
+        schema = get_schema(variety)
+        if validator_dir is None and (env_dir := os.environ.get(VALIDATOR_DIR_ENV_VAR)):
+            validator_dir = Path(env_dir)
+
+        if validator_dir is None:
+            _validators[key] = fastjsonschema.compile(schema)  # type: ignore
+        else:
+            _validators[key] = _load_precompiled_validator(
+                schema, validator_dir / f"{variety}_validator_{key[1]}.py"
+            )
+
+    return _validators[key]
+
+
+def _load_precompiled_validator(schema: dict[str, Any], path: Path) -> Validator:
+    """Imports the validator module at `path`, generating it first if needed."""
+    if not path.exists():
+        # so that concurrent processes never import a partially written module
+        atomic_write(path, fastjsonschema.compile_to_code(schema))  # type: ignore
+
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load validator module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.validate
+
+
+class ValidationManifest:
+    """Records the content hashes of view entries that already passed
+    validation against the current schema of a variety.
+
+    The manifest file is named after the schema hash, so a schema change (or a
+    new fastjsonschema version) starts from an empty manifest and everything
+    is validated again.
+    """
+
+    def __init__(self, variety: CollectionViewVariety, directory: Path | None = None):
+        self.variety = variety
+        self.directory = directory or get_cache_dir() / "validation"
+        self.path = self.directory / f"{variety}-{_schema_key(variety)}.json"
+        try:
+            self.passed: set[str] = set(json.loads(self.path.read_text()))
+        except (OSError, ValueError):
+            self.passed = set()
+
+    def __contains__(self, entry_hash: str) -> bool:
+        return entry_hash in self.passed
+
+    def save(self, passed: set[str]) -> None:
+        """Replaces the recorded hashes and removes manifests of older schemas."""
+        self.passed = passed
+        atomic_write(self.path, json.dumps(sorted(passed)))
+
+        for stale in self.directory.glob(f"{self.variety}-*.json"):
+            if stale != self.path:
+                stale.unlink(missing_ok=True)
@@ -0,0 +1,15 @@
+from packaging.version import InvalidVersion, Version
+
+# A versioned file whose metadata is identical to that of an earlier release
+# only records that release under this key, e.g. `{"$alias": "v0.4.13"}`.
+ALIAS_KEY = "$alias"
+
+
+def version_sort_key(version: str) -> tuple[int, Version | str]:
+    """Orders release tags like `v0.4.10` by PEP 440, placing tags that aren't
+    valid versions first.
+    """
+    try:
+        return (1, Version(version))
+    except InvalidVersion:
+        return (0, version)
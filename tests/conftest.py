@@ -1,8 +1,77 @@
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import gh_util
 import pytest
+from helpers import FakeGitHub, Page
 from prefect.testing.utilities import prefect_test_harness
 
+from prefect_collection_registry.paths import CACHE_DIR_ENV_VAR
+
 
 @pytest.fixture(autouse=True)
 def prefect_db():
     with prefect_test_harness():
         yield
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keeps the registry's local caches out of the user's cache directory."""
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def fake_github(monkeypatch: pytest.MonkeyPatch) -> Generator[FakeGitHub, None, None]:
+    """Serves a `FakeGitHub` over HTTP on localhost and points `gh_util` at it."""
+    fake = FakeGitHub(
+        files={"README.md": "# registry\n"}, branches=["main", "update-metadata"]
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep connections alive
+
+        def _respond(self) -> None:
+            fake.client_ports.add(self.client_address[1])
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            status, payload = fake.handle(
+                self.command, url.path, parse_qs(url.query), body
+            )
+            self.send_response(status)
+            if isinstance(payload, Page):
+                if payload.next_query:
+                    next_url = (
+                        f"{gh_util.settings.base_url}{url.path}?{payload.next_query}"
+                    )
+                    self.send_header("Link", f'<{next_url}>; rel="next"')
+                payload = payload.items
+            data = json.dumps(payload).encode() if status != 204 else b""
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _respond
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        gh_util.settings, "base_url", f"http://127.0.0.1:{server.server_port}"
+    )
+    try:
+        yield fake
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,276 @@
+import base64
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+
+def worker_metadata(worker_type: str) -> dict[str, Any]:
+    """Returns valid metadata for a worker of the given type."""
+    return {
+        "type": worker_type,
+        "description": f"The {worker_type} worker.",
+        "install_command": f"pip install prefect-{worker_type}",
+        "default_base_job_configuration": {},
+    }
+
+
+@dataclass
+class Page:
+    """One page of a paginated listing, served with a `Link` to the next one."""
+
+    items: list[Any]
+    next_query: str | None
+
+
+def paginate(query: dict[str, list[str]], items: list[Any]) -> Page:
+    """Returns the page of `items` asked for by the `per_page` and `page` query
+    parameters, as GitHub does.
+    """
+    per_page = int(query.get("per_page", ["30"])[0])
+    page = int(query.get("page", ["1"])[0])
+    next_query = None
+    if page * per_page < len(items):
+        params = {name: values[0] for name, values in query.items()}
+        next_query = urlencode({**params, "page": page + 1})
+    return Page(items[(page - 1) * per_page : page * per_page], next_query)
+
+
+class FakeGitHub:
+    """An in-memory stand-in for the parts of the GitHub REST API used by the
+    registry, holding a single repository with flat (path -> blob) trees.
+    """
+
+    # like GitHub, the Contents API leaves out the content of larger files
+    INLINE_CONTENT_LIMIT = 1024 * 1024
+
+    def __init__(self, files: dict[str, str], branches: list[str]):
+        self.blobs: dict[str, str] = {}
+        self.trees: dict[str, dict[str, str]] = {}
+        self.commits: dict[str, dict[str, Any]] = {}
+        self.refs: dict[str, str] = {}
+        self.pulls: list[dict[str, Any]] = []
+        self.requests: list[tuple[str, str]] = []
+        self.client_ports: set[int] = set()
+
+        tree_sha = self._store_tree(
+            {path: self._store_blob(content) for path, content in files.items()}
+        )
+        commit_sha = self._store_commit("initial commit", tree_sha, [])
+        for branch in branches:
+            self.refs[f"heads/{branch}"] = commit_sha
+
+    def _store_blob(self, content: str) -> str:
+        data = content.encode("utf-8")
+        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+        self.blobs[sha] = content
+        return sha
+
+    def _store_tree(self, entries: dict[str, str]) -> str:
+        sha = hashlib.sha1(json.dumps(entries, sort_keys=True).encode()).hexdigest()
+        self.trees[sha] = entries
+        return sha
+
+    def _store_commit(self, message: str, tree: str, parents: list[str]) -> str:
+        commit = {"message": message, "tree": tree, "parents": parents}
+        sha = hashlib.sha1(json.dumps(commit, sort_keys=True).encode()).hexdigest()
+        self.commits[sha] = commit
+        return sha
+
+    def commit_files(self, branch: str, files: dict[str, str]) -> None:
+        """Commits files to a branch, as if pushed from elsewhere."""
+        parent = self.refs[f"heads/{branch}"]
+        entries = {
+            **self.trees[self.commits[parent]["tree"]],
+            **{path: self._store_blob(content) for path, content in files.items()},
+        }
+        self.refs[f"heads/{branch}"] = self._store_commit(
+            "push", self._store_tree(entries), [parent]
+        )
+
+    def files_on(self, branch: str) -> dict[str, str]:
+        """Returns the contents of every file on a branch."""
+        tree = self.trees[self.commits[self.refs[f"heads/{branch}"]]["tree"]]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def _get_contents(self, path: str, ref: str) -> tuple[int, Any]:
+        if f"heads/{ref}" not in self.refs:
+            return 404, {"message": f"No commit found for the ref {ref}"}
+        tree = self.trees[self.commits[self.refs[f"heads/{ref}"]]["tree"]]
+        if path not in tree:
+            children = sorted(
+                child.removeprefix(f"{path}/").split("/")[0]
+                for child in tree
+                if child.startswith(f"{path}/")
+            )
+            if not children:
+                return 404, {"message": "Not Found"}
+            return 200, [
+                {
+                    "name": name,
+                    "path": f"{path}/{name}",
+                    "type": "file" if f"{path}/{name}" in tree else "dir",
+                    "sha": tree.get(f"{path}/{name}"),
+                }
+                for name in dict.fromkeys(children)
+            ]
+        content = self.blobs[tree[path]].encode("utf-8")
+        if len(content) > self.INLINE_CONTENT_LIMIT:
+            return 200, {"content": "", "encoding": "none", "sha": tree[path]}
+        return 200, {"content": base64.b64encode(content).decode(), "sha": tree[path]}
+
+    def _query_tree(self, expression: str) -> tuple[int, Any]:
+        """Answers the tree-entries GraphQL query used to load the catalog."""
+        ref, _, directory = expression.partition(":")
+        tree = self.trees[self.commits[self.refs[f"heads/{ref}"]]["tree"]]
+        entries = {
+            path.removeprefix(f"{directory}/"): sha
+            for path, sha in tree.items()
+            if path.rpartition("/")[0] == directory
+        }
+        if not entries:
+            return 200, {"data": {"repository": {"object": None}}}
+        return 200, {
+            "data": {
+                "repository": {
+                    "object": {
+                        "oid": self._store_tree(entries),
+                        "entries": [
+                            {
+                                "name": name,
+                                "type": "blob",
+                                "object": {"text": self.blobs[sha]},
+                            }
+                            for name, sha in sorted(entries.items())
+                        ],
+                    }
+                }
+            }
+        }
+
+    def _create_tree(self, body: Any) -> str:
+        entries = dict(self.trees[body["base_tree"]]) if body.get("base_tree") else {}
+        for entry in body["tree"]:
+            if entry["sha"] is None:  # removes the file
+                del entries[entry["path"]]
+            else:
+                entries[entry["path"]] = entry["sha"]
+        return self._store_tree(entries)
+
+    def _handle_refs(
+        self, method: str, path: str, query: dict[str, list[str]], body: Any
+    ) -> tuple[int, Any]:
+        """Answers the requests that list, create, move or delete branches."""
+        if method == "GET" and (m := re.fullmatch(r"/git/matching-refs/(.+)", path)):
+            refs = [
+                {"ref": f"refs/{ref}", "object": {"sha": sha}}
+                for ref, sha in sorted(self.refs.items())
+                if ref.startswith(m[1])
+            ]
+            return 200, paginate(query, refs)
+        if method == "DELETE" and (m := re.fullmatch(r"/git/refs/(.+)", path)):
+            if self.refs.pop(m[1], None) is None:
+                return 422, {"message": "Reference does not exist"}
+            return 204, None
+        if method == "PATCH" and (m := re.fullmatch(r"/git/refs/(.+)", path)):
+            if m[1] not in self.refs:
+                return 422, {"message": "Reference does not exist"}
+            self.refs[m[1]] = body["sha"]
+            return 200, {"ref": f"refs/{m[1]}", "object": {"sha": body["sha"]}}
+        if method == "POST" and path == "/git/refs":
+            ref = body["ref"].removeprefix("refs/")
+            if ref in self.refs:
+                return 422, {"message": "Reference already exists"}
+            self.refs[ref] = body["sha"]
+            return 201, {"ref": body["ref"], "object": {"sha": body["sha"]}}
+        return 404, {"message": "Not Found"}
+
+    def open_pull(self, head: str, title: str = "Update metadata") -> dict[str, Any]:
+        """Opens a pull request from a branch, as if opened from elsewhere."""
+        pull = {
+            "number": len(self.pulls) + 1,
+            "title": title,
+            "head": {"ref": head},
+            "state": "open",
+        }
+        self.pulls.append(pull)
+        return pull
+
+    def _handle_pulls(
+        self, method: str, path: str, query: dict[str, list[str]], body: Any
+    ) -> tuple[int, Any]:
+        """Answers the requests that list, open or close pull requests."""
+        if method == "GET" and (m := re.fullmatch(r"/compare/(.+)\.\.\.(.+)", path)):
+            base, head = (self.refs[f"heads/{branch}"] for branch in m.groups())
+            return 200, {"ahead_by": int(base != head)}
+        if method == "GET" and path == "/pulls":
+            state = query.get("state", ["open"])[0]
+            pulls = [pull for pull in self.pulls if state in ("all", pull["state"])]
+            return 200, paginate(query, pulls)
+        if method == "PATCH" and (m := re.fullmatch(r"/pulls/(\d+)", path)):
+            pull = self.pulls[int(m[1]) - 1]
+            pull["state"] = body["state"]
+            return 200, pull
+        if method == "POST" and path == "/pulls":
+            if any(
+                pull["head"]["ref"] == body["head"] and pull["state"] == "open"
+                for pull in self.pulls
+            ):
+                return 422, {"message": "A pull request already exists"}
+            return 201, self.open_pull(body["head"], body["title"])
+        if method == "POST" and re.fullmatch(r"/issues/\d+/labels", path):
+            return 200, body["labels"]
+        return 404, {"message": "Not Found"}
+
+    def handle(
+        self, method: str, path: str, query: dict[str, list[str]], body: Any
+    ) -> tuple[int, Any]:
+        self.requests.append((method, path))
+        path = re.sub(r"^/repos/[^/]+/[^/]+", "", path)
+
+        if method == "GET" and (m := re.fullmatch(r"/commits/(.+)", path)):
+            sha = self.refs.get(f"heads/{m[1]}", m[1])
+            if sha not in self.commits:
+                return 404, {"message": "Not Found"}
+            return 200, {"sha": sha}
+        if method == "GET" and (m := re.fullmatch(r"/git/commits/(\w+)", path)):
+            commit = self.commits[m[1]]
+            return 200, {"sha": m[1], "tree": {"sha": commit["tree"]}}
+        if method == "GET" and (m := re.fullmatch(r"/git/trees/(.+)", path)):
+            commit = self.commits.get(self.refs.get(f"heads/{m[1]}", m[1]))
+            entries = self.trees[commit["tree"] if commit else m[1]]
+            return 200, {
+                "tree": [
+                    {"path": path, "type": "blob", "sha": sha}
+                    for path, sha in sorted(entries.items())
+                ],
+                "truncated": False,
+            }
+        if method == "GET" and (m := re.fullmatch(r"/contents/(.+)", path)):
+            return self._get_contents(m[1], query.get("ref", ["main"])[0])
+        if method == "PUT" and (m := re.fullmatch(r"/contents/(.+)", path)):
+            branch = f"heads/{body['branch']}"
+            tree = self.trees[self.commits[self.refs[branch]]["tree"]]
+            if tree.get(m[1]) != body.get("sha"):
+                return 409, {"message": "sha does not match"}
+            content = base64.b64decode(body["content"]).decode("utf-8")
+            self.commit_files(body["branch"], {m[1]: content})
+            return 200, {"content": {"path": m[1], "sha": self._store_blob(content)}}
+        if method == "POST" and path == "/graphql":
+            return self._query_tree(body["variables"]["expression"])
+        if method == "GET" and (m := re.fullmatch(r"/git/blobs/(\w+)", path)):
+            content = self.blobs[m[1]].encode("utf-8")
+            return 200, {"content": base64.b64encode(content).decode(), "sha": m[1]}
+        if method == "POST" and path == "/git/blobs":
+            return 201, {"sha": self._store_blob(body["content"])}
+        if method == "POST" and path == "/git/trees":
+            return 201, {"sha": self._create_tree(body)}
+        if method == "POST" and path == "/git/commits":
+            sha = self._store_commit(body["message"], body["tree"], body["parents"])
+            return 201, {"sha": sha}
+        if re.match(r"/git/(matching-)?refs", path):
+            return self._handle_refs(method, path, query, body)
+
+        return self._handle_pulls(method, path, query, body)
@@ -0,0 +1,159 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from prefect_collection_registry.collection_index import CollectionIndex, main
+from prefect_collection_registry.versions import ALIAS_KEY
+
+
+def write_blocks(root: Path, package: str, version: str, checksums: dict[str, str]):
+    path = root / package / "blocks" / f"{version}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    block_types = {
+        slug: {"name": slug.title(), "block_schema": {"checksum": checksum}}
+        for slug, checksum in checksums.items()
+    }
+    path.write_text(json.dumps({package: {"block_types": block_types}}))
+    return path
+
+
+def write_workers(root: Path, package: str, version: str, worker_types: list[str]):
+    path = root / package / "workers" / f"{version}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({package: {worker_type: {} for worker_type in worker_types}})
+    )
+    return path
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "collections"
+    write_blocks(root, "prefect-aws", "v0.4.9", {"s3-bucket": "sha256:a"})
+    write_blocks(root, "prefect-aws", "v0.4.10", {"s3-bucket": "sha256:b"})
+    write_blocks(root, "prefect-aws", "v0.4.2", {"aws-secret": "sha256:c"})
+    write_workers(root, "prefect-aws", "v0.4.10", ["ecs"])
+    write_workers(root, "prefect-docker", "v0.6.0", ["docker"])
+    return root
+
+
+@pytest.fixture
+def index(tmp_path: Path, root: Path):
+    with CollectionIndex(tmp_path / "index.sqlite", root) as index:
+        index.update()
+        yield index
+
+
+class TestCollectionIndex:
+    def test_versions_are_ordered_by_pep_440(self, index: CollectionIndex):
+        assert index.versions("prefect-aws") == ["v0.4.2", "v0.4.9", "v0.4.10"]
+        assert index.versions("prefect-aws", "worker") == ["v0.4.10"]
+
+    def test_latest_versions(self, index: CollectionIndex):
+        assert index.latest_versions() == {
+            "prefect-aws": "v0.4.10",
+            "prefect-docker": "v0.6.0",
+        }
+        assert index.latest_versions("worker")["prefect-docker"] == "v0.6.0"
+
+    def test_block_and_worker_lookups(self, index: CollectionIndex):
+        assert index.versions_with_block_type("s3-bucket") == [
+            ("prefect-aws", "v0.4.9"),
+            ("prefect-aws", "v0.4.10"),
+        ]
+        assert index.versions_with_block_schema("sha256:b") == [
+            ("prefect-aws", "v0.4.10")
+        ]
+        assert index.versions_with_worker_type("docker") == [
+            ("prefect-docker", "v0.6.0")
+        ]
+
+    def test_update_only_parses_changed_files(self, index: CollectionIndex, root: Path):
+        assert index.update() == 0
+
+        # touching a file without changing it doesn't re-parse it
+        path = root / "prefect-aws" / "blocks" / "v0.4.9.json"
+        os.utime(path, ns=(0, 0))
+        assert index.update() == 0
+
+        write_blocks(root, "prefect-aws", "v0.4.9", {"s3-bucket": "sha256:d"})
+        assert index.update() == 1
+        assert index.versions_with_block_schema("sha256:a") == []
+        assert index.versions_with_block_schema("sha256:d") == [
+            ("prefect-aws", "v0.4.9")
+        ]
+
+    def test_update_drops_deleted_files(self, index: CollectionIndex, root: Path):
+        (root / "prefect-aws" / "blocks" / "v0.4.10.json").unlink()
+        (root / "prefect-aws" / "workers" / "v0.4.10.json").unlink()
+
+        index.update()
+
+        assert index.versions("prefect-aws") == ["v0.4.2", "v0.4.9"]
+        assert index.versions_with_worker_type("ecs") == []
+
+    def test_aliases_are_indexed_with_their_target_metadata(
+        self, index: CollectionIndex, root: Path
+    ):
+        alias = root / "prefect-aws" / "blocks" / "v0.4.11.json"
+        alias.write_text(json.dumps({ALIAS_KEY: "v0.4.10"}))
+
+        index.update()
+
+        assert index.versions("prefect-aws")[-1] == "v0.4.11"
+        assert index.versions_with_block_schema("sha256:b") == [
+            ("prefect-aws", "v0.4.10"),
+            ("prefect-aws", "v0.4.11"),
+        ]
+
+    def test_aliases_follow_changes_to_their_target(
+        self, index: CollectionIndex, root: Path
+    ):
+        alias = root / "prefect-aws" / "blocks" / "v0.4.11.json"
+        alias.write_text(json.dumps({ALIAS_KEY: "v0.4.10"}))
+        index.update()
+
+        write_blocks(root, "prefect-aws", "v0.4.10", {"s3-bucket": "sha256:d"})
+        index.update()
+
+        assert index.versions_with_block_schema("sha256:b") == []
+        assert index.versions_with_block_schema("sha256:d") == [
+            ("prefect-aws", "v0.4.10"),
+            ("prefect-aws", "v0.4.11"),
+        ]
+
+    def test_aliases_of_missing_releases_are_dangling(
+        self, index: CollectionIndex, root: Path
+    ):
+        alias = root / "prefect-aws" / "blocks" / "v0.4.12.json"
+        alias.write_text(json.dumps({ALIAS_KEY: "v0.4.11"}))
+
+        assert index.update() == 1
+        assert index.versions("prefect-aws")[-1] == "v0.4.12"
+        assert index.dangling_aliases() == ["prefect-aws/blocks/v0.4.12.json"]
+
+        write_blocks(root, "prefect-aws", "v0.4.11", {"s3-bucket": "sha256:d"})
+        index.update()
+
+        assert index.dangling_aliases() == []
+        assert index.versions_with_block_schema("sha256:d") == [
+            ("prefect-aws", "v0.4.11"),
+            ("prefect-aws", "v0.4.12"),
+        ]
+
+        (root / "prefect-aws" / "blocks" / "v0.4.11.json").unlink()
+        index.update()
+
+        assert index.dangling_aliases() == ["prefect-aws/blocks/v0.4.12.json"]
+        assert index.versions_with_block_schema("sha256:d") == []
+
+
+def test_cli(tmp_path: Path, root: Path, capsys: pytest.CaptureFixture[str]):
+    main(["--db", str(tmp_path / "index.sqlite"), "--root", str(root), "latest"])
+
+    assert capsys.readouterr().out.splitlines()[1:] == [
+        "prefect-aws v0.4.10",
+        "prefect-docker v0.6.0",
+    ]
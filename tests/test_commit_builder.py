@@ -0,0 +1,141 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from helpers import FakeGitHub, worker_metadata
+from pydantic_core import from_json
+
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.session import RegistrySession
+
+
+@pytest.fixture
+def commit_builder() -> CommitBuilder:
+    builder = CommitBuilder("update-metadata", repo_owner="o", repo_name="r")
+    builder.add_file(
+        "collections/prefect-docker/workers/v0.6.0.json",
+        json.dumps({"prefect-docker": {"docker": worker_metadata("docker")}}),
+    )
+    builder.add_file(
+        "collections/prefect-gcp/workers/v0.6.0.json",
+        json.dumps({"prefect-gcp": {"cloud-run": worker_metadata("cloud-run")}}),
+    )
+    return builder
+
+
+class TestCommitBuilder:
+    def test_writes_all_files_in_a_single_commit(
+        self, fake_github: FakeGitHub, commit_builder: CommitBuilder
+    ):
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "views/aggregate-worker-metadata.json": json.dumps(
+                    {"prefect-aws": {"ecs": worker_metadata("ecs")}}
+                )
+            },
+        )
+        main_before = fake_github.refs["heads/main"]
+
+        asyncio.run(commit_builder.add_aggregate_views())
+        commit_sha = asyncio.run(commit_builder.commit("Update metadata"))
+
+        assert fake_github.refs["heads/update-metadata"] == commit_sha
+        assert fake_github.refs["heads/main"] == main_before
+
+        writes = [request for request in fake_github.requests if request[0] != "GET"]
+        assert writes == [
+            *[("POST", "/repos/o/r/git/blobs")] * 3,
+            ("POST", "/repos/o/r/git/trees"),
+            ("POST", "/repos/o/r/git/commits"),
+            ("PATCH", "/repos/o/r/git/refs/heads/update-metadata"),
+        ]
+
+        files = fake_github.files_on("update-metadata")
+        assert "README.md" in files
+        assert "collections/prefect-docker/workers/v0.6.0.json" in files
+        aggregate = from_json(files["views/aggregate-worker-metadata.json"])
+        assert list(aggregate) == ["prefect-aws", "prefect-docker", "prefect-gcp"]
+
+    def test_aggregate_views_over_the_inline_limit_are_merged(
+        self, fake_github: FakeGitHub, commit_builder: CommitBuilder
+    ):
+        large_metadata = worker_metadata("ecs")
+        large_metadata["description"] = "x" * FakeGitHub.INLINE_CONTENT_LIMIT
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "views/aggregate-worker-metadata.json": json.dumps(
+                    {"prefect-aws": {"ecs": large_metadata}}
+                )
+            },
+        )
+
+        asyncio.run(commit_builder.add_aggregate_views())
+
+        aggregate = from_json(
+            commit_builder.files["views/aggregate-worker-metadata.json"]
+        )
+        assert aggregate["prefect-aws"]["ecs"] == large_metadata
+        assert list(aggregate) == ["prefect-aws", "prefect-docker", "prefect-gcp"]
+
+    def test_aggregate_views_skip_empty_metadata(
+        self, fake_github: FakeGitHub, commit_builder: CommitBuilder
+    ):
+        commit_builder.add_file(
+            "collections/prefect-dbt/workers/v0.6.0.json",
+            json.dumps({"prefect-dbt": {}}),
+        )
+
+        asyncio.run(commit_builder.add_aggregate_views())
+
+        aggregate = from_json(
+            commit_builder.files["views/aggregate-worker-metadata.json"]
+        )
+        assert list(aggregate) == ["prefect-docker", "prefect-gcp"]
+        assert "views/aggregate-block-metadata.json" not in commit_builder.files
+
+    def test_commit_without_staged_files_is_a_noop(self, fake_github: FakeGitHub):
+        builder = CommitBuilder("update-metadata", repo_owner="o", repo_name="r")
+
+        assert asyncio.run(builder.commit("Nothing to see here")) is None
+        assert fake_github.requests == []
+
+    def test_files_already_on_the_branch_are_left_out(
+        self, fake_github: FakeGitHub, commit_builder: CommitBuilder
+    ):
+        fake_github.commit_files("update-metadata", dict(commit_builder.files))
+        branch_before = fake_github.refs["heads/update-metadata"]
+        fake_github.requests.clear()
+
+        async def commit() -> tuple[str | None, int]:
+            async with RegistrySession() as session:
+                commit_sha = await commit_builder.commit("Update metadata")
+                return commit_sha, session.skipped_writes
+
+        assert asyncio.run(commit()) == (None, 2)
+        assert fake_github.refs["heads/update-metadata"] == branch_before
+        assert {method for method, _ in fake_github.requests} == {"GET"}
+
+        commit_builder.add_file("collections/prefect-gcp/workers/v0.6.0.json", "{}")
+        fake_github.requests.clear()
+
+        assert asyncio.run(commit()) == (fake_github.refs["heads/update-metadata"], 1)
+        assert fake_github.requests.count(("POST", "/repos/o/r/git/blobs")) == 1
+
+    def test_refuses_to_commit_to_main(self, commit_builder: CommitBuilder):
+        commit_builder.branch_name = "main"
+
+        with pytest.raises(ValueError, match="directly to main"):
+            asyncio.run(commit_builder.commit("Update metadata"))
+
+    def test_dump_and_load_round_trip(
+        self, tmp_path: Path, commit_builder: CommitBuilder
+    ):
+        commit_builder.dump(tmp_path)
+
+        loaded = CommitBuilder("update-metadata")
+        loaded.load(tmp_path)
+
+        assert loaded.files == commit_builder.files
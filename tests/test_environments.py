@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import hashlib
+import shutil
+import subprocess
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from prefect_collection_registry.environments import EnvironmentManager
+
+pytestmark = pytest.mark.skipif(shutil.which("uv") is None, reason="requires uv")
+
+
+def build_wheel(wheelhouse: Path, name: str, version: str) -> None:
+    """Builds a minimal pure-Python wheel for a package exposing `__version__`."""
+    module = name.replace("-", "_")
+    dist_info = f"{module}-{version}.dist-info"
+    files = {
+        f"{module}/__init__.py": f"__version__ = {version!r}\n",
+        f"{dist_info}/METADATA": (
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+        ),
+        f"{dist_info}/WHEEL": (
+            "Wheel-Version: 1.0\nGenerator: tests\nRoot-Is-Purelib: true\n"
+            "Tag: py3-none-any\n"
+        ),
+    }
+    record = [
+        f"{path},sha256="
+        + base64.urlsafe_b64encode(hashlib.sha256(content.encode()).digest())
+        .rstrip(b"=")
+        .decode()
+        + f",{len(content.encode())}"
+        for path, content in files.items()
+    ]
+    files[f"{dist_info}/RECORD"] = "\n".join([*record, f"{dist_info}/RECORD,,"])
+
+    with zipfile.ZipFile(wheelhouse / f"{module}-{version}-py3-none-any.whl", "w") as f:
+        for path, content in files.items():
+            f.writestr(path, content)
+
+
+def installed_version(python: Path, module: str) -> str:
+    return subprocess.check_output(
+        [str(python), "-c", f"import {module}; print({module}.__version__)"],
+        text=True,
+    ).strip()
+
+
+@pytest.fixture
+def wheelhouse(tmp_path: Path) -> Path:
+    wheelhouse = tmp_path / "wheelhouse"
+    wheelhouse.mkdir()
+    build_wheel(wheelhouse, "prefect-fake", "0.1.0")
+    return wheelhouse
+
+
+@pytest.fixture
+def manager(tmp_path: Path, wheelhouse: Path) -> EnvironmentManager:
+    return EnvironmentManager(
+        root=tmp_path / "environments", wheelhouse=wheelhouse, offline=True
+    )
+
+
+class TestEnvironmentManager:
+    def test_reuses_environment_for_unchanged_pins(self, manager: EnvironmentManager):
+        first = asyncio.run(manager.ensure("prefect-fake"))
+        second = asyncio.run(manager.ensure("prefect-fake"))
+
+        assert not first.reused
+        assert second.reused
+        assert second.path == first.path
+        assert "prefect-fake==0.1.0" in first.lock
+        assert installed_version(first.python, "prefect_fake") == "0.1.0"
+
+    def test_new_release_gets_a_new_environment(
+        self, manager: EnvironmentManager, wheelhouse: Path
+    ):
+        old = asyncio.run(manager.ensure("prefect-fake"))
+
+        build_wheel(wheelhouse, "prefect-fake", "0.2.0")
+        new = asyncio.run(manager.ensure("prefect-fake"))
+
+        assert not new.reused
+        assert new.path != old.path
+        assert installed_version(new.python, "prefect_fake") == "0.2.0"
+
+        assert manager.prune(keep=1) == [old.path]
+        assert not old.path.exists()
+        assert new.path.exists()
+
+    def test_rebuilds_incomplete_environments(self, manager: EnvironmentManager):
+        environment = asyncio.run(manager.ensure("prefect-fake"))
+        (environment.path / ".complete").unlink()
+
+        rebuilt = asyncio.run(manager.ensure("prefect-fake"))
+
+        assert not rebuilt.reused
+        assert installed_version(rebuilt.python, "prefect_fake") == "0.1.0"
+
+    def test_managers_build_a_shared_environment_once(
+        self, manager: EnvironmentManager, wheelhouse: Path
+    ):
+        other_manager = EnvironmentManager(
+            root=manager.root, wheelhouse=wheelhouse, offline=True
+        )
+
+        async def ensure_both():
+            return await asyncio.gather(
+                manager.ensure("prefect-fake"), other_manager.ensure("prefect-fake")
+            )
+
+        environments = asyncio.run(ensure_both())
+
+        assert environments[0].path == environments[1].path
+        assert sorted(environment.reused for environment in environments) == [
+            False,
+            True,
+        ]
+        assert installed_version(environments[0].python, "prefect_fake") == "0.1.0"
+
+    def test_offline_requires_a_wheelhouse(self):
+        with pytest.raises(ValueError, match="wheelhouse"):
+            EnvironmentManager(offline=True)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from prefect_collection_registry import update_collection_metadata as module
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.environments import EnvironmentManager
+from prefect_collection_registry.generation_cache import (
+    GenerationCache,
+    GenerationKey,
+    generator_source_hash,
+    main,
+    pinned_versions,
+)
+from prefect_collection_registry.serialization import content_hash
+
+LOCK = """\
+-e file:///registry
+boto3==1.35.0
+prefect==3.1.0
+prefect-aws==0.5.0
+"""
+
+METADATA = {"worker": {"ecs": {"type": "ecs"}}, "block": {"zebra": {}, "aardvark": {}}}
+
+
+@pytest.fixture
+def generation_cache(tmp_path: Path) -> GenerationCache:
+    return GenerationCache(tmp_path / "generation")
+
+
+def key(version: str = "0.5.0", generator_hash: str | None = None) -> GenerationKey:
+    return GenerationKey(
+        "prefect-aws",
+        version,
+        "3.1.0",
+        content_hash({**pinned_versions(LOCK), "prefect-aws": version}),
+        generator_hash or generator_source_hash(),
+    )
+
+
+def test_key_from_lock():
+    assert pinned_versions("Prefect_AWS==0.5.0\n")["prefect-aws"] == "0.5.0"
+    assert GenerationKey.from_lock("prefect-aws", LOCK) == key()
+    assert GenerationKey.from_lock("prefect-gcp", LOCK) is None
+
+
+def test_key_changes_with_any_pin():
+    bumped = GenerationKey.from_lock("prefect-aws", LOCK + "pydantic==2.10.0\n")
+
+    assert bumped is not None
+    assert bumped != key()
+    assert bumped.digest != key().digest
+
+
+def test_round_trips_metadata(generation_cache: GenerationCache):
+    assert generation_cache.get(key()) is None
+
+    generation_cache.put(key(), METADATA)
+
+    cached = generation_cache.get(key())
+    assert cached == METADATA
+    assert list(cached["block"]) == ["zebra", "aardvark"]
+    assert generation_cache.get(key(version="0.5.1")) is None
+
+
+def test_prunes_stale_and_unused_entries(generation_cache: GenerationCache):
+    generation_cache.put(key(), METADATA)
+    generation_cache.put(key(version="0.4.0"), METADATA)
+    generation_cache.put(key(generator_hash="stale"), METADATA)
+    month_ago = time.time() - 30 * 86400
+    os.utime(generation_cache._path(key(version="0.4.0")), (month_ago, month_ago))
+
+    assert [entry.key for entry in generation_cache.prune(stale=True)] == [
+        key(generator_hash="stale")
+    ]
+    assert [entry.key for entry in generation_cache.prune(max_age_days=7)] == [
+        key(version="0.4.0")
+    ]
+    assert [entry.key for entry in generation_cache.prune()] == [key()]
+
+
+def test_cli_lists_and_prunes(
+    generation_cache: GenerationCache, capsys: pytest.CaptureFixture[str]
+):
+    generation_cache.put(key(), METADATA)
+
+    main(["--dir", str(generation_cache.root), "list"])
+    assert capsys.readouterr().out.startswith(
+        "prefect-aws 0.5.0 (prefect 3.1.0, current generator)"
+    )
+
+    main(["--dir", str(generation_cache.root), "prune"])
+    assert capsys.readouterr().out == "Removed 1 cached entry\n"
+    assert generation_cache.entries() == []
+
+
+def test_cache_hit_skips_the_subprocess(
+    tmp_path: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    GenerationCache().put(key(), METADATA)
+
+    async def resolve(self: EnvironmentManager, collection_name: str) -> str:
+        return LOCK
+
+    async def upload_collection_metadata(
+        collection_name: str,
+        metadata: dict[str, Any],
+        branch_name: str,
+        commit_builder: CommitBuilder | None = None,
+    ) -> None:
+        assert commit_builder is not None
+        commit_builder.add_file("collections/prefect-aws/workers/v0.5.0.json", "{}")
+
+    monkeypatch.setattr(EnvironmentManager, "resolve", resolve)
+    monkeypatch.setattr(EnvironmentManager, "ensure", pytest.fail)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", pytest.fail)
+    monkeypatch.setattr(
+        module, "upload_collection_metadata", upload_collection_metadata
+    )
+
+    timings = asyncio.run(
+        module.run_collection_update.fn("prefect-aws", "update-metadata", tmp_path)
+    )
+
+    assert set(timings.seconds) == {"env setup", "cache reuse"}
+    assert (
+        tmp_path / "prefect-aws/collections/prefect-aws/workers/v0.5.0.json"
+    ).exists()
@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from prefect_collection_registry.http_cache import (
+    CachedResponse,
+    CachingTransport,
+    ResponseCache,
+)
+
+
+class VersionedResource:
+    """Serves a JSON document with an ETag, honoring `If-None-Match`."""
+
+    def __init__(self):
+        self.version = 1
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'"v{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            headers={"ETag": etag, "Content-Encoding": "gzip"},
+            content=gzip.compress(b'{"version": %d}' % self.version),
+        )
+
+
+def get_json(cache: ResponseCache, resource: VersionedResource, url: str) -> object:
+    async def run() -> object:
+        transport = CachingTransport(httpx.MockTransport(resource), cache)
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.json()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResponseCache:
+    return ResponseCache(tmp_path)
+
+
+class TestCachingTransport:
+    def test_revalidates_and_serves_not_modified_from_cache(self, cache: ResponseCache):
+        resource = VersionedResource()
+
+        assert get_json(cache, resource, "https://pypi.org/pypi/a/json") == {
+            "version": 1
+        }
+        assert get_json(cache, resource, "https://pypi.org/pypi/a/json") == {
+            "version": 1
+        }
+
+        assert "If-None-Match" not in resource.requests[0].headers
+        assert resource.requests[1].headers["If-None-Match"] == '"v1"'
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_refreshes_changed_resources(self, cache: ResponseCache):
+        resource = VersionedResource()
+        get_json(cache, resource, "https://pypi.org/pypi/a/json")
+
+        resource.version = 2
+
+        assert get_json(cache, resource, "https://pypi.org/pypi/a/json") == {
+            "version": 2
+        }
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_does_not_cache_other_methods(self, cache: ResponseCache):
+        async def run() -> None:
+            transport = CachingTransport(
+                httpx.MockTransport(VersionedResource()), cache
+            )
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.post("https://api.github.com/graphql")
+
+        asyncio.run(run())
+
+        assert list(cache.directory.iterdir()) == []
+
+
+class TestResponseCache:
+    def test_evicts_least_recently_used_entries(self, tmp_path: Path):
+        cache = ResponseCache(tmp_path, max_bytes=300)
+        for key in ("a", "b"):
+            cache.set(key, CachedResponse(key, {}, b"x" * 100))
+        # make "a" the most recently used entry
+        os.utime(tmp_path / "b.json", (0, 0))
+        assert cache.get("a") is not None
+
+        cache.set("c", CachedResponse("c", {}, b"x" * 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.evictions == 1
@@ -0,0 +1,101 @@
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+import pytest
+
+from prefect_collection_registry.import_profiler import (
+    ImportProfiler,
+    ImportReport,
+    ModuleImport,
+    load_entrypoints,
+    load_module,
+)
+
+MODULES = {
+    "light_module.py": "VALUE = 1\n",
+    "heavy_module.py": "DATA = [bytes(1024) for _ in range(4096)]\n",
+    "broken_module.py": 'raise RuntimeError("broken")\n',
+}
+
+
+@pytest.fixture
+def modules(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    for name, source in MODULES.items():
+        (tmp_path / "modules" / name).parent.mkdir(exist_ok=True)
+        (tmp_path / "modules" / name).write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path / "modules"))
+    yield
+    for name in MODULES:
+        sys.modules.pop(name.removesuffix(".py"), None)
+
+
+def test_records_each_module_imported(modules: None, tmp_path: Path):
+    report_path = tmp_path / "report.json"
+    with ImportProfiler(report_path).activate() as profiler:
+        load_module("light_module")
+        load_module("heavy_module")
+        with pytest.raises(RuntimeError):
+            load_module("broken_module")
+
+    imports = {
+        module_import.name: module_import for module_import in profiler.report.imports
+    }
+    assert list(imports) == ["light_module", "heavy_module", "broken_module"]
+    assert imports["heavy_module"].peak_memory_bytes > 4 * 1024 * 1024
+    assert imports["light_module"].peak_memory_bytes < 1024 * 1024
+    assert imports["broken_module"].error == "RuntimeError('broken')"
+    assert imports["light_module"].error is None
+
+    assert ImportReport.read(report_path) == profiler.report
+
+
+def test_loads_entrypoints_like_prefect(modules: None):
+    entrypoints = [
+        EntryPoint("light", "light_module", "prefect.collections"),
+        EntryPoint("broken", "broken_module", "prefect.collections"),
+    ]
+    with ImportProfiler().activate() as profiler:
+        results = load_entrypoints(entrypoints)
+
+    assert results["light"].VALUE == 1
+    assert isinstance(results["broken"], RuntimeError)
+    assert [module_import.name for module_import in profiler.report.imports] == [
+        "light_module (entry point)",
+        "broken_module (entry point)",
+    ]
+
+
+def test_imports_without_an_active_profiler(modules: None):
+    assert load_module("light_module").VALUE == 1
+
+
+def test_missing_report_reads_as_empty(tmp_path: Path):
+    assert ImportReport.read(tmp_path / "missing.json") == ImportReport()
+
+
+def test_markdown_sorts_by_wall_time_and_flags_thresholds():
+    report = ImportReport(
+        [
+            ModuleImport("fast", 0.1, 0.1, 1024),
+            ModuleImport("hungry", 0.5, 0.4, 600 * 1024 * 1024),
+            ModuleImport("slow", 42.0, 3.0, 1024),
+        ],
+        in_progress="killer",
+    )
+
+    assert [module_import.name for module_import in report.flagged(30, 512)] == [
+        "hungry",
+        "slow",
+    ]
+    assert report.markdown(30, 512) == "\n".join(
+        [
+            "**Killed while importing `killer`**",
+            "",
+            "| module | wall | cpu | peak memory | |",
+            "|---|---:|---:|---:|---|",
+            "| `slow` | 42.00s | 3.00s | 0.0 MB | **above threshold** |",
+            "| `hungry` | 0.50s | 0.40s | 600.0 MB | **above threshold** |",
+            "| `fast` | 0.10s | 0.10s | 0.0 MB |  |",
+        ]
+    )
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+
+import pytest
+
+from prefect_collection_registry.process_output import (
+    TailBuffer,
+    stream_process_output,
+)
+
+
+def run_python(code: str, timeout: float | None = None) -> tuple[int, list[str]]:
+    lines: list[str] = []
+
+    async def run() -> int:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            code,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        return await stream_process_output(
+            process,
+            lambda line: lines.append(f"out: {line}"),
+            lambda line: lines.append(f"err: {line}"),
+            timeout=timeout,
+        )
+
+    return asyncio.run(run()), lines
+
+
+class TestTailBuffer:
+    def test_keeps_only_the_most_recent_lines(self):
+        buffer = TailBuffer(max_bytes=10)
+
+        for line in ["aaaa", "bbbb", "cccc", "dddd"]:
+            buffer.append(line)
+
+        assert buffer.size <= 10
+        assert buffer.lines() == ["... (2 earlier lines omitted)", "cccc", "dddd"]
+
+    def test_counts_the_size_in_bytes(self):
+        buffer = TailBuffer(max_bytes=10)
+
+        for line in ["──", "✓ ok", "done"]:
+            buffer.append(line)
+
+        assert buffer.size == 10
+        assert buffer.lines() == ["... (1 earlier lines omitted)", "✓ ok", "done"]
+
+    def test_keeps_a_single_oversized_line(self):
+        buffer = TailBuffer(max_bytes=2)
+
+        buffer.append("too long")
+
+        assert buffer.lines() == ["too long"]
+
+
+class TestStreamProcessOutput:
+    def test_forwards_lines_from_both_streams(self):
+        return_code, lines = run_python(
+            "import sys; print('hello', flush=True); "
+            "print('oops', file=sys.stderr, flush=True); print(); sys.exit(3)"
+        )
+
+        assert return_code == 3
+        assert sorted(lines) == ["err: oops", "out: hello"]
+
+    def test_kills_processes_that_exceed_the_timeout(self):
+        with pytest.raises(TimeoutError):
+            run_python(
+                "import time; print('started', flush=True); time.sleep(60)",
+                timeout=1,
+            )
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from prefect_collection_registry import utils
+from prefect_collection_registry.pypi import PYPI_URL_ENV_VAR, PyPIReleaseWatcher
+from prefect_collection_registry.session import RegistrySession
+
+
+class FakeIndex:
+    """A stand-in for the parts of PyPI used to look up releases."""
+
+    def __init__(self):
+        self.packages: dict[str, tuple[int, str]] = {
+            "prefect-aws": (100, "0.4.14"),
+            "prefect-gcp": (200, "0.6.0"),
+        }
+        self.requests: list[tuple[str, str]] = []
+
+
+@pytest.fixture
+def index(monkeypatch: pytest.MonkeyPatch) -> Generator[FakeIndex, None, None]:
+    fake = FakeIndex()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, body: bool) -> None:
+            fake.requests.append((self.command, self.path))
+            name = self.path.strip("/").split("/")[1]
+            serial, version = fake.packages[name]
+            data = json.dumps({"info": {"version": version}}).encode()
+            self.send_response(200)
+            self.send_header("X-PyPI-Last-Serial", str(serial))
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if body:
+                self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            self._respond(body=True)
+
+        def do_HEAD(self) -> None:
+            self._respond(body=False)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv(PYPI_URL_ENV_VAR, f"http://127.0.0.1:{server.server_port}")
+    try:
+        yield fake
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def latest_releases(state_path: Path) -> list[str]:
+    async def run() -> list[str]:
+        async with RegistrySession(
+            release_watcher=PyPIReleaseWatcher(state_path)
+        ) as session:
+            return [
+                await utils.get_latest_pypi_release(package_name, session)
+                for package_name in ("prefect-aws", "prefect-gcp")
+            ]
+
+    return asyncio.run(run())
+
+
+class TestPyPIReleaseWatcher:
+    def test_only_fetches_packages_with_new_uploads(
+        self, index: FakeIndex, tmp_path: Path
+    ):
+        state_path = tmp_path / "serials.json"
+        assert latest_releases(state_path) == ["v0.4.14", "v0.6.0"]
+        assert [method for method, _ in index.requests] == ["HEAD", "GET"] * 2
+
+        index.requests.clear()
+        index.packages["prefect-gcp"] = (201, "0.6.1")
+
+        assert latest_releases(state_path) == ["v0.4.14", "v0.6.1"]
+        assert index.requests == [
+            ("HEAD", "/simple/prefect-aws/"),
+            ("HEAD", "/simple/prefect-gcp/"),
+            ("GET", "/pypi/prefect-gcp/json"),
+        ]
+
+    def test_without_a_watcher_fetches_the_json_document(self, index: FakeIndex):
+        assert asyncio.run(utils.get_latest_pypi_release("prefect-aws")) == "v0.4.14"
+        assert index.requests == [("GET", "/pypi/prefect-aws/json")]
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from prefect_collection_registry.rate_limit import (
+    GitHubRequestScheduler,
+    RateLimitedTransport,
+    retry_after_seconds,
+)
+
+
+def send_requests(
+    handler: httpx.MockTransport, scheduler: GitHubRequestScheduler, count: int
+) -> list[httpx.Response]:
+    async def run() -> list[httpx.Response]:
+        async with httpx.AsyncClient(
+            transport=RateLimitedTransport(handler, scheduler)
+        ) as client:
+            return await asyncio.gather(
+                *[client.get(f"https://api.github.com/{i}") for i in range(count)]
+            )
+
+    return asyncio.run(run())
+
+
+class TestGitHubRequestScheduler:
+    def test_bounds_in_flight_requests(self):
+        in_flight: list[int] = [0]
+        peak: list[int] = [0]
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return httpx.Response(200)
+
+        scheduler = GitHubRequestScheduler(max_concurrency=3)
+        responses = send_requests(httpx.MockTransport(handler), scheduler, 12)
+
+        assert all(response.status_code == 200 for response in responses)
+        assert peak[0] == 3
+        assert scheduler.requests == 12
+
+    def test_retries_secondary_rate_limits_and_backs_off(self):
+        attempts: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request.url.path)
+            if len(attempts) == 1:
+                return httpx.Response(
+                    403,
+                    headers={"Retry-After": "0"},
+                    json={"message": "You have exceeded a secondary rate limit."},
+                )
+            return httpx.Response(200)
+
+        scheduler = GitHubRequestScheduler(max_concurrency=8)
+        (response,) = send_requests(httpx.MockTransport(handler), scheduler, 1)
+
+        assert response.status_code == 200
+        assert attempts == ["/0", "/0"]
+        assert scheduler.rate_limited == 1
+        assert scheduler.retries == 1
+        assert scheduler.concurrency == 5  # halved to 4, then +1 on success
+
+    def test_gives_up_after_max_retries(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(429)
+
+        scheduler = GitHubRequestScheduler(max_retries=2, base_backoff=0.001)
+        (response,) = send_requests(httpx.MockTransport(handler), scheduler, 1)
+
+        assert response.status_code == 429
+        assert scheduler.requests == 3
+
+    def test_does_not_retry_permission_errors(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(403, json={"message": "Resource not accessible"})
+
+        scheduler = GitHubRequestScheduler()
+        (response,) = send_requests(httpx.MockTransport(handler), scheduler, 1)
+
+        assert response.status_code == 403
+        assert scheduler.retries == 0
+
+    def test_reduces_concurrency_as_budget_runs_low(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            remaining = 5000 - int(request.url.path.strip("/")) - 4900
+            return httpx.Response(
+                200,
+                headers={
+                    "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                },
+            )
+
+        scheduler = GitHubRequestScheduler(max_concurrency=10, min_concurrency=2)
+        send_requests(httpx.MockTransport(handler), scheduler, 1)
+
+        assert scheduler.remaining == 100
+        assert scheduler.concurrency == 2
+        assert "100/5000 remaining" in scheduler.summary()
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("3", 3.0), ("-1", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0), ("?", None)],
+)
+def test_retry_after_seconds(value: str, expected: float | None):
+    response = httpx.Response(429, headers={"Retry-After": value})
+
+    assert retry_after_seconds(response) == expected
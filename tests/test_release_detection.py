@@ -0,0 +1,87 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from helpers import FakeGitHub
+
+from prefect_collection_registry import release_detection
+
+
+def test_latest_recorded_releases_are_ordered_by_pep_440():
+    paths = [
+        "collections/prefect/blocks/2.8.1.json",
+        "collections/prefect/blocks/v2.10.0.json",
+        "collections/prefect/blocks/v2.9.0.json",
+        "collections/prefect/workers/v3.0.0.json",
+        "collections/prefect-aws/blocks/v0.4.9.json",
+        "collections/prefect-aws/blocks/v0.4.10.json",
+        "views/aggregate-block-metadata.json",
+    ]
+
+    assert release_detection.latest_recorded_releases(paths) == {
+        "prefect": "v2.10.0",
+        "prefect-aws": "v0.4.10",
+    }
+
+
+@pytest.mark.parametrize(
+    "latest_release, recorded_release, expected",
+    [
+        ("v2.10.0", "v2.9.0", True),
+        ("v2.10.0", "v2.10.0", False),
+        ("2.8.1", "v2.8.1", False),
+        ("v2.9.0", "v2.10.0", False),
+        ("v0.1.0", None, True),
+        (None, "v0.1.0", True),
+    ],
+)
+def test_needs_update(
+    latest_release: str | None, recorded_release: str | None, expected: bool
+):
+    assert release_detection.needs_update(latest_release, recorded_release) is expected
+
+
+class TestFindCollectionsToUpdate:
+    @pytest.fixture(autouse=True)
+    def pypi_releases(self, monkeypatch: pytest.MonkeyPatch):
+        releases = {"prefect-aws": "v0.4.10", "prefect-gcp": "v0.6.0"}
+
+        async def get_latest_pypi_release(package_name: str, session=None) -> str:
+            return releases[package_name]
+
+        monkeypatch.setattr(
+            release_detection, "get_latest_pypi_release", get_latest_pypi_release
+        )
+
+    def test_uses_a_single_tree_request(self, fake_github: FakeGitHub):
+        fake_github.commit_files(
+            "main",
+            {
+                "collections/prefect-aws/blocks/v0.4.9.json": "{}",
+                "collections/prefect-aws/blocks/v0.4.10.json": "{}",
+                "collections/prefect-gcp/blocks/v0.5.9.json": "{}",
+            },
+        )
+        fake_github.requests.clear()
+
+        collections = asyncio.run(
+            release_detection.find_collections_to_update(["prefect-aws", "prefect-gcp"])
+        )
+
+        assert collections == {"prefect-gcp"}
+        assert fake_github.requests == [
+            ("GET", "/repos/PrefectHQ/prefect-collection-registry/git/trees/main")
+        ]
+
+    def test_reads_a_local_checkout(self, tmp_path: Path):
+        blocks = tmp_path / "collections" / "prefect-aws" / "blocks"
+        blocks.mkdir(parents=True)
+        (blocks / "v0.4.10.json").write_text("{}")
+
+        collections = asyncio.run(
+            release_detection.find_collections_to_update(
+                ["prefect-aws", "prefect-gcp"], local_root=tmp_path
+            )
+        )
+
+        assert collections == {"prefect-gcp"}
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from helpers import FakeGitHub
+from pydantic_core import from_json
+
+from prefect_collection_registry import update_collection_metadata as module
+from prefect_collection_registry.run_manifest import (
+    RUN_MANIFEST_PATH,
+    RunManifest,
+    find_unfinished_run,
+)
+
+BRANCH = "update-metadata-01-02-2025-03-04-05"
+DOCKER_FILE = "collections/prefect-docker/workers/v0.6.0.json"
+
+
+@pytest.fixture
+def staging_dir(tmp_path: Path, fake_github: FakeGitHub) -> Path:
+    fake_github.refs[f"heads/{BRANCH}"] = fake_github.refs["heads/main"]
+    collection_dir = tmp_path / "prefect-docker"
+    (collection_dir / DOCKER_FILE).parent.mkdir(parents=True)
+    (collection_dir / DOCKER_FILE).write_text(
+        json.dumps(
+            {
+                "prefect-docker": {
+                    "docker": {
+                        "type": "docker",
+                        "description": "The docker worker.",
+                        "install_command": "pip install prefect-docker",
+                        "default_base_job_configuration": {},
+                    }
+                }
+            }
+        )
+    )
+    return tmp_path
+
+
+def test_round_trips_through_json():
+    manifest = RunManifest(BRANCH)
+    manifest.record_committed("prefect-docker", {DOCKER_FILE: "{}\n"})
+    manifest.record_failed("prefect-gcp", TimeoutError())
+
+    loaded = RunManifest.loads(manifest.dumps())
+
+    assert loaded == manifest
+    assert loaded.completed() == {"prefect-docker"}
+    assert loaded.failed() == {"prefect-gcp"}
+    assert loaded.collections["prefect-gcp"].error == "TimeoutError"
+
+
+def test_checkpoints_resume_and_finish_a_run(
+    fake_github: FakeGitHub, staging_dir: Path
+):
+    async def checkpoint() -> None:
+        manifest = RunManifest(BRANCH)
+        await module.checkpoint_collection_update(
+            manifest, staging_dir, "prefect-docker"
+        )
+        await module.checkpoint_collection_update(
+            manifest, staging_dir, "prefect-gcp", RuntimeError("Failed")
+        )
+
+    asyncio.run(checkpoint())
+
+    # the run died here, so the next one picks up its manifest from the branch
+    manifest = asyncio.run(find_unfinished_run())
+    assert manifest is not None
+    assert manifest.branch_name == BRANCH
+    assert manifest.completed() == {"prefect-docker"}
+    assert manifest.failed() == {"prefect-gcp"}
+    files = fake_github.files_on(BRANCH)
+    assert DOCKER_FILE in files
+    assert "views/aggregate-worker-metadata.json" not in files
+
+    asyncio.run(module.commit_aggregate_views.fn(manifest))
+
+    files = fake_github.files_on(BRANCH)
+    assert RUN_MANIFEST_PATH not in files
+    aggregate = from_json(files["views/aggregate-worker-metadata.json"])
+    assert list(aggregate) == ["prefect-docker"]
+    assert asyncio.run(find_unfinished_run()) is None
+
+
+def test_failed_checkpoint_leaves_the_manifest_as_on_the_branch(
+    fake_github: FakeGitHub, staging_dir: Path
+):
+    manifest = RunManifest("missing-branch")
+
+    with pytest.raises(Exception):
+        asyncio.run(
+            module.checkpoint_collection_update(manifest, staging_dir, "prefect-docker")
+        )
+
+    assert manifest.collections == {}
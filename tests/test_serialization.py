@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from prefect_collection_registry import serialization
+
+CONTENT = {
+    "prefect-aws": {
+        "zebra": {"description": "Déjà vu", "count": 2**70},
+        "aardvark": [1, 2.5, None, True],
+    }
+}
+
+FLOATS = [
+    1e16,
+    1.5e-7,
+    1e-5,
+    -2.5e-5,
+    1e15,
+    0.0001,
+    -0.0,
+    5e-324,
+    1.7976931348623157e308,
+]
+
+
+@pytest.fixture
+def stdlib_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serialization, "orjson", None)
+
+
+def test_keeps_key_order_and_ends_with_a_newline():
+    encoded = serialization.dumps({"b": 1, "a": {}})
+
+    assert encoded == b'{\n  "b": 1,\n  "a": {}\n}\n'
+
+
+@pytest.mark.parametrize(
+    "path",
+    [*sorted(Path("views").glob("*.json")), None],
+    ids=lambda path: path.name if path else "wide-integers",
+)
+def test_orjson_and_stdlib_output_is_identical(
+    path: Path | None, monkeypatch: pytest.MonkeyPatch
+):
+    content = json.loads(path.read_text()) if path else CONTENT
+    fast = (serialization.dumps(content), serialization.content_hash(content))
+
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    assert (serialization.dumps(content), serialization.content_hash(content)) == fast
+
+
+@pytest.mark.parametrize("value", FLOATS, ids=repr)
+def test_orjson_and_stdlib_format_floats_alike(
+    value: float, monkeypatch: pytest.MonkeyPatch
+):
+    content = {"default": value, "values": [value]}
+    fast = (serialization.dumps(content), serialization.content_hash(content))
+
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    assert (serialization.dumps(content), serialization.content_hash(content)) == fast
+    assert json.loads(fast[0]) == content
+
+
+def test_writes_non_finite_floats_as_null(stdlib_only: None):
+    content = [float("nan"), float("inf"), -float("inf")]
+
+    assert serialization.dumps(content) == b"[\n  null,\n  null,\n  null\n]\n"
+
+
+def test_pins_stdlib_float_formatting(stdlib_only: None):
+    content = {"NaN, 1e+16": [float("nan"), float("inf"), -0.0, 1e16, 1e-5, 2**70]}
+
+    assert serialization.dumps(content) == (
+        b'{\n  "NaN, 1e+16": [\n    null,\n    null,\n    -0.0,\n    1e16,\n'
+        b"    0.00001,\n    1180591620717411303424\n  ]\n}\n"
+    )
+
+
+def test_round_trips_through_a_file(tmp_path: Path, stdlib_only: None):
+    serialization.write(tmp_path / "content.json", CONTENT)
+
+    text = (tmp_path / "content.json").read_text(encoding="utf-8")
+    assert json.loads(text) == CONTENT
+    assert "Déjà vu" in text
+
+
+def test_content_hash_ignores_key_order():
+    reordered = {"prefect-aws": dict(reversed(CONTENT["prefect-aws"].items()))}
+
+    assert serialization.content_hash(reordered) == serialization.content_hash(CONTENT)
+    assert serialization.content_hash({"a": 1}) != serialization.content_hash({"a": 2})
@@ -0,0 +1,58 @@
+import asyncio
+
+from helpers import FakeGitHub
+
+from prefect_collection_registry import utils
+from prefect_collection_registry.session import RegistrySession, get_current_session
+
+
+async def read_main_sha_three_times() -> None:
+    for _ in range(3):
+        await utils.get_commit_sha("o", "r", "main")
+
+
+class TestRegistrySession:
+    def test_helpers_reuse_one_connection_within_a_session(
+        self, fake_github: FakeGitHub
+    ):
+        async def run() -> None:
+            async with RegistrySession():
+                await read_main_sha_three_times()
+
+        asyncio.run(run())
+
+        assert len(fake_github.requests) == 3
+        assert len(fake_github.client_ports) == 1
+
+    def test_helpers_open_a_client_per_call_without_a_session(
+        self, fake_github: FakeGitHub
+    ):
+        asyncio.run(read_main_sha_three_times())
+
+        assert len(fake_github.client_ports) == 3
+
+    def test_session_can_be_passed_explicitly(self, fake_github: FakeGitHub):
+        async def run() -> None:
+            session = RegistrySession()
+            try:
+                for _ in range(2):
+                    await utils.get_commit_sha("o", "r", "main", session=session)
+            finally:
+                await session.aclose()
+
+        asyncio.run(run())
+
+        assert len(fake_github.client_ports) == 1
+
+    def test_one_client_per_host(self):
+        async def run() -> None:
+            async with RegistrySession(http2=False) as session:
+                assert get_current_session() is session
+                pypi = session.client("https://pypi.org/pypi/prefect/json")
+                assert session.client("https://pypi.org/simple/") is pypi
+                assert session.client("https://files.pythonhosted.org") is not pypi
+                assert session.github is session.github
+            assert get_current_session() is None
+            assert session._clients == {}
+
+        asyncio.run(run())
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from prefect_collection_registry import utils
+from prefect_collection_registry.static_discovery import discover_flows
+
+PACKAGE_FILES = {
+    "__init__.py": "",
+    "flows.py": '''
+from prefect import flow
+
+
+@flow
+def sync_flow():
+    """Syncs things."""
+
+
+@flow(name="other-flow")
+def other_flow():
+    """Does other things."""
+
+
+def helper():
+    """Not a flow."""
+''',
+    "heavy.py": 'raise RuntimeError("heavy SDK imported")\n',
+    "nested/__init__.py": "",
+    "nested/jobs.py": '''
+import prefect
+
+
+@prefect.flow
+def run_job():
+    """Runs a job."""
+''',
+}
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    for path, source in PACKAGE_FILES.items():
+        file = tmp_path / "fake_collection" / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "fake_collection"
+    for module_name in list(sys.modules):
+        if module_name.startswith("fake_collection"):
+            del sys.modules[module_name]
+
+
+def test_discovers_flows_from_source(package: str):
+    discovery = discover_flows(package)
+
+    assert discovery.flows == {
+        "fake_collection.flows": ["sync_flow", "other_flow"],
+        "fake_collection.nested.jobs": ["run_job"],
+    }
+    assert "fake_collection.heavy" in discovery.module_names
+    assert "fake_collection.heavy" not in sys.modules
+
+
+def test_only_modules_defining_flows_are_imported(package: str):
+    flows = list(utils.find_flows_in_module(package))
+
+    assert sorted(flow.name for flow in flows) == [
+        "other-flow",
+        "run-job",
+        "sync-flow",
+    ]
+    assert "fake_collection.heavy" not in sys.modules
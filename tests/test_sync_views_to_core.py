@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from helpers import FakeGitHub
+
+from prefect_collection_registry.sync_views_to_core import sync_views_to_core
+
+CORE_VIEWS = "src/prefect/server/api/collections_data/views"
+VIEW_PATHS = {
+    "views/aggregate-worker-metadata.json": f"{CORE_VIEWS}/aggregate-worker-metadata.json",
+    "views/aggregate-block-metadata.json": f"{CORE_VIEWS}/aggregate-block-metadata.json",
+}
+
+
+def view(collection_name: str) -> str:
+    return json.dumps({collection_name: {}}, indent=2)
+
+
+def sync() -> str | None:
+    return asyncio.run(sync_views_to_core.fn(VIEW_PATHS, target_repo="r"))
+
+
+def test_identical_views_create_no_branch_or_pr(fake_github: FakeGitHub):
+    fake_github.commit_files(
+        "main",
+        {path: view("prefect-aws") for paths in VIEW_PATHS.items() for path in paths},
+    )
+    fake_github.requests.clear()
+
+    assert sync() is None
+
+    assert {method for method, _ in fake_github.requests} == {"GET"}
+    assert set(fake_github.refs) == {"heads/main", "heads/update-metadata"}
+
+
+def test_changed_views_are_committed_together_on_a_reused_branch(
+    fake_github: FakeGitHub,
+):
+    fake_github.commit_files(
+        "main",
+        {
+            **{path: view("prefect-aws") for path in VIEW_PATHS.values()},
+            "views/aggregate-worker-metadata.json": view("prefect-gcp"),
+            "views/aggregate-block-metadata.json": view("prefect-aws"),
+        },
+    )
+    worker_target = VIEW_PATHS["views/aggregate-worker-metadata.json"]
+
+    commit_sha = sync()
+
+    assert fake_github.refs["heads/update-collection-views"] == commit_sha
+    assert fake_github.files_on("update-collection-views")[worker_target] == view(
+        "prefect-gcp"
+    )
+    blobs = [request for request in fake_github.requests if "git/blobs" in request[1]]
+    assert [method for method, _ in blobs] == ["GET", "POST"]
+    assert [pull["head"]["ref"] for pull in fake_github.pulls] == [
+        "update-collection-views"
+    ]
+
+    fake_github.commit_files(
+        "main", {"views/aggregate-worker-metadata.json": view("prefect-docker")}
+    )
+
+    assert sync() == fake_github.refs["heads/update-collection-views"]
+    assert fake_github.files_on("update-collection-views")[worker_target] == view(
+        "prefect-docker"
+    )
+    assert len(fake_github.pulls) == 1
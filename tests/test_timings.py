@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from prefect_collection_registry.timings import StageTimings, timings_markdown
+
+
+class TestStageTimings:
+    def test_accumulates_repeated_stages(self):
+        timings = StageTimings()
+
+        for _ in range(2):
+            with timings.stage("upload"):
+                pass
+
+        assert set(timings.seconds) == {"upload"}
+        assert timings.seconds["upload"] >= 0
+
+    def test_round_trips_through_a_file(self, tmp_path: Path):
+        path = tmp_path / "prefect-aws.timings.json"
+        StageTimings({"import": 1.5, "generation": 2.0}).write(path)
+
+        assert StageTimings.read(path).seconds == {"import": 1.5, "generation": 2.0}
+
+    def test_missing_file_reads_as_empty(self, tmp_path: Path):
+        assert StageTimings.read(tmp_path / "missing.json").seconds == {}
+
+
+def test_timings_markdown():
+    markdown = timings_markdown(
+        {
+            "prefect-gcp": StageTimings({"env setup": 10.0, "import": 2.25}),
+            "prefect-aws": StageTimings({"upload": 0.5}),
+        }
+    )
+
+    assert markdown.splitlines()[2:] == [
+        "| prefect-aws | - | - | - | - | - | 0.5s | 0.5s |",
+        "| prefect-gcp | 10.0s | - | 2.2s | - | - | - | 12.2s |",
+    ]
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+from helpers import FakeGitHub, worker_metadata
+from prefect.blocks.system import Secret
+from pydantic_core import from_json
+
+from prefect_collection_registry import update_collection_metadata as module
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.environments import (
+    CollectionEnvironment,
+    EnvironmentManager,
+)
+from prefect_collection_registry.paths import IMPORT_REPORT_FILE_ENV_VAR
+from prefect_collection_registry.run_manifest import RUN_MANIFEST_PATH
+from prefect_collection_registry.timings import StageTimings
+
+
+@dataclass
+class FakeGenerators:
+    threads: dict[str, str] = field(default_factory=dict)
+    barrier: threading.Barrier | None = None
+
+
+@pytest.fixture
+def generators(monkeypatch: pytest.MonkeyPatch) -> FakeGenerators:
+    """Replaces each metadata generator with one that records the thread it ran
+    in, and waits for the others on `barrier` if one is set.
+    """
+    fake = FakeGenerators()
+
+    def generator(variety: str):
+        def generate(collection_name: str) -> dict[str, Any]:
+            fake.threads[variety] = threading.current_thread().name
+            if fake.barrier is not None:
+                fake.barrier.wait()
+            return {f"{variety}-of-{collection_name}": {}}
+
+        return generate
+
+    for variety in module.METADATA_GENERATORS:
+        monkeypatch.setitem(module.METADATA_GENERATORS, variety, generator(variety))
+    monkeypatch.setattr(module, "import_collection", lambda collection_name: None)
+    return fake
+
+
+@pytest.fixture
+def submitted(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, Any]]:
+    calls: list[tuple[str, Any]] = []
+
+    async def submit_updates(
+        collection_metadata: dict[str, Any],
+        collection_name: str,
+        branch_name: str,
+        variety: str,
+        commit_builder: CommitBuilder | None = None,
+    ) -> bool:
+        calls.append((variety, commit_builder))
+        return variety != "worker"
+
+    monkeypatch.setattr(module, "submit_updates", submit_updates)
+    return calls
+
+
+def test_generates_varieties_concurrently(generators: FakeGenerators):
+    # only passes once all three generators are running at the same time
+    generators.barrier = threading.Barrier(3, timeout=30)
+
+    metadata = asyncio.run(module.generate_collection_metadata("prefect-aws"))
+
+    assert metadata == {
+        "block": {"block-of-prefect-aws": {}},
+        "flow": {"flow-of-prefect-aws": {}},
+        "worker": {"worker-of-prefect-aws": {}},
+    }
+    assert len(set(generators.threads.values())) == 3
+
+
+def test_prefect_core_has_no_flow_metadata(generators: FakeGenerators):
+    metadata = asyncio.run(module.generate_collection_metadata("prefect"))
+
+    assert set(metadata) == {"block", "worker"}
+
+
+def test_stages_every_variety_on_the_commit_builder(
+    generators: FakeGenerators,
+    submitted: list[tuple[str, Any]],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(module, "update_aggregate_views", pytest.fail)
+    commit_builder = CommitBuilder("update-metadata")
+
+    asyncio.run(
+        module.update_collection_metadata(
+            "prefect-aws", "update-metadata", commit_builder
+        )
+    )
+
+    assert sorted(submitted) == [
+        ("block", commit_builder),
+        ("flow", commit_builder),
+        ("worker", commit_builder),
+    ]
+
+
+def test_rebuilds_only_changed_aggregate_views(
+    generators: FakeGenerators,
+    submitted: list[tuple[str, Any]],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    outputs: list[dict[str, Any]] = []
+
+    async def update_aggregate_views(
+        variety_outputs: dict[str, Any], branch_name: str
+    ) -> None:
+        outputs.append(variety_outputs)
+
+    monkeypatch.setattr(module, "update_aggregate_views", update_aggregate_views)
+
+    asyncio.run(module.update_collection_metadata("prefect-aws", "update-metadata"))
+
+    assert outputs == [
+        {
+            "block": {"prefect-aws": {"block-of-prefect-aws": {}}},
+            "flow": {"prefect-aws": {"flow-of-prefect-aws": {}}},
+            "worker": {},
+        }
+    ]
+
+
+@pytest.mark.parametrize("profile_imports", [False, True])
+def test_profiles_imports_only_when_asked_to(
+    profile_imports: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    subprocess_envs: list[dict[str, str]] = []
+
+    async def resolve(self: EnvironmentManager, collection_name: str) -> str:
+        return "prefect==3.1.0\nprefect-aws==0.5.0\n"
+
+    async def ensure(
+        self: EnvironmentManager, collection_name: str, lock: str | None = None
+    ) -> CollectionEnvironment:
+        return CollectionEnvironment(collection_name, tmp_path, lock or "", True)
+
+    async def create_subprocess_exec(*args: str, env: dict[str, str], **kwargs: Any):
+        subprocess_envs.append(env)
+        raise RuntimeError("Not starting the update")
+
+    monkeypatch.setattr(EnvironmentManager, "resolve", resolve)
+    monkeypatch.setattr(EnvironmentManager, "ensure", ensure)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", create_subprocess_exec)
+
+    with pytest.raises(RuntimeError, match="Not starting"):
+        asyncio.run(
+            module.run_collection_update.fn(
+                "prefect-aws",
+                "update-metadata",
+                tmp_path,
+                profile_imports=profile_imports,
+            )
+        )
+
+    assert (IMPORT_REPORT_FILE_ENV_VAR in subprocess_envs[0]) is profile_imports
+
+
+WORKER_TYPES = {"prefect-aws": "ecs", "prefect-gcp": "cloud-run"}
+
+
+class TestResumingAnInterruptedRun:
+    @pytest.fixture
+    def updated(
+        self, fake_github: FakeGitHub, monkeypatch: pytest.MonkeyPatch
+    ) -> list[str]:
+        """Replaces each collection update with one that stages a worker file,
+        and returns the collections it was run for.
+        """
+        updated: list[str] = []
+
+        async def aload(name: str) -> Secret:
+            return Secret(value="token")
+
+        async def get_collection_names() -> list[str]:
+            return list(WORKER_TYPES)
+
+        async def find_collections_to_update(collection_names: list[str]) -> set[str]:
+            return set(collection_names)
+
+        async def run_collection_update(
+            collection_name: str, branch_name: str, staging_dir: Path, *args: Any
+        ) -> StageTimings:
+            updated.append(collection_name)
+            worker_type = WORKER_TYPES[collection_name]
+            commit_builder = CommitBuilder(branch_name)
+            commit_builder.add_file(
+                f"collections/{collection_name}/workers/v1.0.0.json",
+                json.dumps(
+                    {collection_name: {worker_type: worker_metadata(worker_type)}}
+                ),
+            )
+            commit_builder.dump(staging_dir / collection_name)
+            return StageTimings()
+
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        monkeypatch.setattr(module.Secret, "aload", aload)
+        monkeypatch.setattr(module, "get_collection_names", get_collection_names)
+        monkeypatch.setattr(
+            module, "find_collections_to_update", find_collections_to_update
+        )
+        monkeypatch.setattr(module, "run_collection_update", run_collection_update)
+        return updated
+
+    def run(self, branch_name: str) -> None:
+        asyncio.run(
+            module.update_all_collections.fn(branch_name, max_concurrent_updates=1)
+        )
+
+    def tree_sha(self, fake_github: FakeGitHub, branch_name: str) -> str:
+        return fake_github.commits[fake_github.refs[f"heads/{branch_name}"]]["tree"]
+
+    def test_only_unfinished_collections_are_updated_again(
+        self,
+        fake_github: FakeGitHub,
+        updated: list[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        self.run("uninterrupted-run")
+        assert updated == ["prefect-aws", "prefect-gcp"]
+        updated.clear()
+
+        update = module.run_collection_update
+
+        async def update_until_killed(collection_name: str, *args: Any):
+            if collection_name == "prefect-gcp":
+                raise KeyboardInterrupt  # as if the run was killed
+            return await update(collection_name, *args)
+
+        monkeypatch.setattr(module, "run_collection_update", update_until_killed)
+        with pytest.raises(KeyboardInterrupt):
+            self.run("resumed-run")
+        files = fake_github.files_on("resumed-run")
+        assert RUN_MANIFEST_PATH in files
+        assert "collections/prefect-aws/workers/v1.0.0.json" in files
+        assert "views/aggregate-worker-metadata.json" not in files
+        updated.clear()
+
+        monkeypatch.setattr(module, "run_collection_update", update)
+        self.run("resumed-run")
+
+        assert updated == ["prefect-gcp"]
+        assert self.tree_sha(fake_github, "resumed-run") == self.tree_sha(
+            fake_github, "uninterrupted-run"
+        )
+        aggregate = from_json(
+            fake_github.files_on("resumed-run")["views/aggregate-worker-metadata.json"]
+        )
+        assert set(aggregate) == set(WORKER_TYPES)
@@ -1,11 +1,19 @@
+import asyncio
+import json
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import fastjsonschema
+import httpx
 import pytest
+from helpers import FakeGitHub, worker_metadata
 from pydantic_core import from_json
 
 from prefect_collection_registry import metadata_schemas, utils
+from prefect_collection_registry.commit_builder import CommitBuilder
+from prefect_collection_registry.session import RegistrySession
+from prefect_collection_registry.versions import ALIAS_KEY
 
 
 @pytest.fixture
@@ -43,3 +51,354 @@ class TestJsonSchemaValidation:
 
         with pytest.raises(fastjsonschema.JsonSchemaException):
             validate({**individual_flow_summary, **incorrect_kwargs})  # type: ignore
+
+
+class TestReadViewContent:
+    @pytest.fixture(autouse=True)
+    def clear_view_cache(self):
+        utils._view_cache.clear()
+        yield
+        utils._view_cache.clear()
+
+    @pytest.fixture
+    def view_requests(self, monkeypatch: pytest.MonkeyPatch) -> list[dict[str, str]]:
+        """Serves a small block view with an ETag, recording request headers."""
+        requests: list[dict[str, str]] = []
+        view = {
+            "prefect-aws": {
+                "block_types": {
+                    "aws-credentials": {"logo_url": "https://example.com/first.png"},
+                    "s3-bucket": {"logo_url": "https://example.com/last.png"},
+                }
+            }
+        }
+
+        def fake_get(url: str, headers: dict[str, str]) -> httpx.Response:
+            requests.append(headers)
+            request = httpx.Request("GET", url)
+            if headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, request=request)
+            return httpx.Response(
+                200, json=view, headers={"ETag": '"v1"'}, request=request
+            )
+
+        monkeypatch.setattr(utils.httpx, "get", fake_get)
+        return requests
+
+    def test_fetches_view_once_for_many_logo_lookups(
+        self, view_requests: list[dict[str, str]]
+    ):
+        for _ in range(5):
+            logo_url = utils.get_logo_url_for_collection("prefect-aws")
+
+        assert logo_url == "https://example.com/last.png"
+        assert len(view_requests) == 1
+
+    def test_logo_of_a_collection_with_flows_but_no_blocks(
+        self, monkeypatch: pytest.MonkeyPatch
+    ):
+        views = {
+            "block": {"prefect-aws": {"block_types": {}}},
+            "flow": {
+                "prefect-census": {
+                    "trigger_sync": {"logo_url": "https://example.com/census.png"}
+                }
+            },
+        }
+
+        def fake_get(url: str, headers: dict[str, str]) -> httpx.Response:
+            variety = url.rsplit("/aggregate-", 1)[1].split("-")[0]
+            return httpx.Response(
+                200, json=views[variety], request=httpx.Request("GET", url)
+            )
+
+        monkeypatch.setattr(utils.httpx, "get", fake_get)
+
+        assert utils.get_logo_url_for_collection("prefect-census") == (
+            "https://example.com/census.png"
+        )
+        assert utils.get_logo_url_for_collection("prefect-aws") == (
+            utils.DEFAULT_LOGO_URL
+        )
+        assert utils.get_logo_url_for_collection("prefect-new") == (
+            utils.DEFAULT_LOGO_URL
+        )
+
+    def test_returns_copies(self, view_requests: list[dict[str, str]]):
+        utils.read_view_content("block")["prefect-aws"]["block_types"].clear()
+
+        assert utils.get_logo_url_for_collection("prefect-aws")
+        assert len(utils.read_view_content("block")["prefect-aws"]["block_types"]) == 2
+
+    def test_revalidates_with_etag_after_ttl(
+        self, view_requests: list[dict[str, str]], monkeypatch: pytest.MonkeyPatch
+    ):
+        utils.read_view_content("block")
+        monkeypatch.setattr(utils, "VIEW_CACHE_TTL_SECONDS", 0)
+
+        assert "prefect-aws" in utils.read_view_content("block")
+        assert view_requests == [{}, {"If-None-Match": '"v1"'}]
+
+    def test_falls_back_to_local_checkout(self, monkeypatch: pytest.MonkeyPatch):
+        def failing_get(url: str, headers: dict[str, str]) -> httpx.Response:
+            raise httpx.ConnectError("offline")
+
+        monkeypatch.setattr(utils.httpx, "get", failing_get)
+
+        assert "prefect" in utils.read_view_content("worker")
+
+
+class TestUpdateAggregateViews:
+    def test_reads_and_writes_each_view_once(self, fake_github: FakeGitHub):
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "views/aggregate-worker-metadata.json": json.dumps(
+                    {"prefect-aws": {"ecs": worker_metadata("ecs")}}
+                )
+            },
+        )
+        fake_github.requests.clear()
+
+        asyncio.run(
+            utils.update_aggregate_views(
+                {
+                    "worker": {
+                        "prefect-gcp": {"cloud-run": worker_metadata("cloud-run")},
+                        "prefect-docker": {"docker": worker_metadata("docker")},
+                    },
+                    "block": {"prefect-docker": {}},
+                },
+                "update-metadata",
+                repo_name="r",
+            )
+        )
+
+        assert [method for method, _ in fake_github.requests] == ["GET", "GET", "PUT"]
+        aggregate = from_json(
+            fake_github.files_on("update-metadata")[
+                "views/aggregate-worker-metadata.json"
+            ]
+        )
+        assert list(aggregate) == ["prefect-aws", "prefect-docker", "prefect-gcp"]
+
+    def test_reads_views_over_the_inline_limit(self, fake_github: FakeGitHub):
+        large_metadata = worker_metadata("ecs")
+        large_metadata["description"] = "x" * FakeGitHub.INLINE_CONTENT_LIMIT
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "views/aggregate-worker-metadata.json": json.dumps(
+                    {"prefect-aws": {"ecs": large_metadata}}
+                )
+            },
+        )
+
+        asyncio.run(
+            utils.update_aggregate_views(
+                {
+                    "worker": {
+                        "prefect-gcp": {"cloud-run": worker_metadata("cloud-run")}
+                    }
+                },
+                "update-metadata",
+                repo_name="r",
+            )
+        )
+
+        aggregate = from_json(
+            fake_github.files_on("update-metadata")[
+                "views/aggregate-worker-metadata.json"
+            ]
+        )
+        assert aggregate["prefect-aws"]["ecs"] == large_metadata
+        assert list(aggregate) == ["prefect-aws", "prefect-gcp"]
+
+    def test_refuses_to_write_to_main(self):
+        with pytest.raises(ValueError, match="main"):
+            asyncio.run(utils.update_aggregate_views({}, "main"))
+
+
+class TestCreateOrUpdateFile:
+    def test_git_blob_sha_matches_git(self):
+        # `echo hello | git hash-object --stdin`
+        assert utils.git_blob_sha("hello\n") == (
+            "ce013625030ba8dba906f756967f9e9ca394464a"
+        )
+
+    def test_unchanged_content_is_not_written(self, fake_github: FakeGitHub):
+        async def write(content: str) -> int:
+            async with RegistrySession() as session:
+                _, sha = await utils.get_file_contents(
+                    "o", "r", "README.md", "update-metadata"
+                )
+                await utils.create_or_update_file(
+                    "o", "r", "README.md", "Update", content, "update-metadata", sha
+                )
+                return session.skipped_writes
+
+        assert asyncio.run(write("# registry\n")) == 1
+        assert ("PUT", "/repos/o/r/contents/README.md") not in fake_github.requests
+
+        assert asyncio.run(write("# the registry\n")) == 0
+        assert fake_github.files_on("update-metadata")["README.md"] == (
+            "# the registry\n"
+        )
+
+
+class TestCloseOldMetadataPrs:
+    def test_metadata_branch_time(self):
+        assert utils.metadata_branch_time(
+            "update-metadata-01-02-2025-03-04-05"
+        ) == datetime(2025, 1, 2, 3, 4, 5)
+        assert utils.metadata_branch_time("update-metadata-manual") is None
+
+    def test_keeps_only_the_latest_branch_and_its_pr(self, fake_github: FakeGitHub):
+        sha = fake_github.refs["heads/main"]
+        # more than a page of branches, where the latest sorts first by name
+        old_branches = [
+            f"update-metadata-12-{day:02}-2024-{hour:02}-00-00"
+            for day in range(1, 31)
+            for hour in range(4)
+        ]
+        latest_branch = "update-metadata-01-01-2025-00-00-00"
+        for branch in [*old_branches, latest_branch, "update-metadata-manual"]:
+            fake_github.refs[f"heads/{branch}"] = sha
+        old_pulls = [fake_github.open_pull(branch) for branch in old_branches[::40]]
+        latest_pull = fake_github.open_pull(latest_branch)
+
+        asyncio.run(utils.close_old_metadata_prs("o", "r", max_concurrency=4))
+
+        assert sorted(fake_github.refs) == [
+            "heads/main",
+            "heads/update-metadata",
+            f"heads/{latest_branch}",
+            "heads/update-metadata-manual",
+        ]
+        assert {pull["state"] for pull in old_pulls} == {"closed"}
+        assert latest_pull["state"] == "open"
+        branch_listings = [
+            path for _, path in fake_github.requests if "matching-refs" in path
+        ]
+        assert len(branch_listings) == 2
+
+
+class TestSubmitUpdates:
+    @pytest.fixture(autouse=True)
+    def latest_release(self, monkeypatch: pytest.MonkeyPatch):
+        async def get_latest_pypi_release(collection_name: str) -> str:
+            return "v0.6.10"
+
+        monkeypatch.setattr(utils, "get_latest_pypi_release", get_latest_pypi_release)
+
+    @pytest.fixture
+    def commit_builder(self, fake_github: FakeGitHub) -> CommitBuilder:
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "collections/prefect-docker/workers/v0.6.2.json": json.dumps(
+                    {"prefect-docker": {"docker": worker_metadata("old")}}
+                ),
+                "collections/prefect-docker/workers/v0.6.9.json": json.dumps(
+                    {"prefect-docker": {"docker": worker_metadata("docker")}}
+                ),
+            },
+        )
+        return CommitBuilder("update-metadata", repo_owner="o", repo_name="r")
+
+    def submit(self, commit_builder: CommitBuilder, metadata: dict[str, Any]) -> bool:
+        return asyncio.run(
+            utils.submit_updates.fn(
+                metadata,
+                "prefect-docker",
+                "update-metadata",
+                "worker",
+                repo_name="r",
+                commit_builder=commit_builder,
+            )
+        )
+
+    def test_unchanged_metadata_is_recorded_as_an_alias(
+        self, commit_builder: CommitBuilder
+    ):
+        changed = self.submit(commit_builder, {"docker": worker_metadata("docker")})
+
+        assert not changed
+        assert from_json(
+            commit_builder.files["collections/prefect-docker/workers/v0.6.10.json"]
+        ) == {ALIAS_KEY: "v0.6.9"}
+        assert commit_builder.staged_collection_metadata("worker") == {}
+
+    def test_changed_metadata_is_written_in_full(self, commit_builder: CommitBuilder):
+        metadata = {"docker": worker_metadata("docker"), "ecs": worker_metadata("ecs")}
+
+        changed = self.submit(commit_builder, metadata)
+
+        assert changed
+        assert commit_builder.staged_collection_metadata("worker") == {
+            "prefect-docker": metadata
+        }
+
+    def test_aliases_point_to_the_original_release(
+        self, fake_github: FakeGitHub, commit_builder: CommitBuilder
+    ):
+        fake_github.commit_files(
+            "update-metadata",
+            {
+                "collections/prefect-docker/workers/v0.6.9.json": json.dumps(
+                    {ALIAS_KEY: "v0.6.2"}
+                )
+            },
+        )
+
+        assert not self.submit(commit_builder, {"docker": worker_metadata("old")})
+        assert from_json(
+            commit_builder.files["collections/prefect-docker/workers/v0.6.10.json"]
+        ) == {ALIAS_KEY: "v0.6.2"}
+
+
+class TestGetCollectionNames:
+    @pytest.fixture(autouse=True)
+    def catalog(self, fake_github: FakeGitHub):
+        fake_github.commit_files(
+            "main",
+            {
+                "docs/integrations/catalog/prefect-aws.yaml": "author: Prefect\n",
+                "docs/integrations/catalog/prefect-gcp.yaml": "author: Prefect\n",
+                "docs/integrations/catalog/community.yaml": "author: Someone\n",
+                "docs/integrations/catalog/README.md": "# catalog\n",
+            },
+        )
+        fake_github.requests.clear()
+
+    def test_first_read_looks_up_the_tree_then_fetches_the_catalog(
+        self, fake_github: FakeGitHub
+    ):
+        names = asyncio.run(utils.get_collection_names())
+
+        assert names == ["prefect-aws", "prefect-gcp", "prefect"]
+        # one request for the SHA of the catalog's tree, one for all its files
+        assert fake_github.requests == [("POST", "/graphql")] * 2
+
+    def test_unchanged_catalog_is_read_from_the_cache(self, fake_github: FakeGitHub):
+        asyncio.run(utils.get_collection_names())
+        fake_github.requests.clear()
+
+        assert asyncio.run(utils.get_collection_names())[-1] == "prefect"
+        assert fake_github.requests == [("POST", "/graphql")]
+
+        fake_github.commit_files(
+            "main", {"docs/integrations/catalog/prefect-dbt.yaml": "author: Prefect\n"}
+        )
+        assert "prefect-dbt" in asyncio.run(utils.get_collection_names())
+
+    def test_only_the_newest_catalog_is_cached(
+        self, fake_github: FakeGitHub, cache_dir: Path
+    ):
+        asyncio.run(utils.get_collection_names())
+        fake_github.commit_files(
+            "main", {"docs/integrations/catalog/prefect-dbt.yaml": "author: Prefect\n"}
+        )
+        asyncio.run(utils.get_collection_names())
+
+        assert len(list((cache_dir / "catalog").glob("*.json"))) == 1
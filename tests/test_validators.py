@@ -0,0 +1,173 @@
+from pathlib import Path
+from typing import Any
+
+import fastjsonschema
+import pytest
+
+from prefect_collection_registry import (
+    metadata_schemas,
+    serialization,
+    utils,
+    validators,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_validators():
+    validators._validators.clear()
+    validators._schema_key.cache_clear()
+    yield
+    validators._validators.clear()
+    validators._schema_key.cache_clear()
+
+
+@pytest.fixture
+def compile_calls(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    calls: list[dict[str, Any]] = []
+    compile = fastjsonschema.compile
+
+    def counting_compile(schema: dict[str, Any]) -> Any:
+        calls.append(schema)
+        return compile(schema)  # type: ignore
+
+    monkeypatch.setattr(fastjsonschema, "compile", counting_compile)
+    return calls
+
+
+WORKER_METADATA = {
+    "type": "process",
+    "description": "Execute flow runs as subprocesses.",
+    "install_command": "pip install prefect",
+    "default_base_job_configuration": {},
+}
+
+
+class TestGetValidator:
+    def test_compiles_each_variety_once(self, compile_calls: list[dict[str, Any]]):
+        validate = validators.get_validator("worker")
+
+        for _ in range(3):
+            assert validators.get_validator("worker") is validate
+        validators.get_validator("flow")
+
+        assert len(compile_calls) == 2
+
+    def test_hashes_each_schema_once(self, monkeypatch: pytest.MonkeyPatch):
+        hashed: list[dict[str, Any]] = []
+        schema_hash = validators.schema_hash
+
+        def counting_schema_hash(schema: dict[str, Any]) -> str:
+            hashed.append(schema)
+            return schema_hash(schema)
+
+        monkeypatch.setattr(validators, "schema_hash", counting_schema_hash)
+        for _ in range(3):
+            validators.get_validator("worker")
+
+        assert hashed == [validators.get_schema("worker")]
+
+    def test_validator_rejects_invalid_metadata(self):
+        validate = validators.get_validator("worker")
+
+        validate(WORKER_METADATA)
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            validate({**WORKER_METADATA, "type": 42})
+
+    def test_precompiled_validator_is_reused_across_processes(
+        self, tmp_path: Path, compile_calls: list[dict[str, Any]]
+    ):
+        validators.get_validator("worker", tmp_path)
+        (generated,) = tmp_path.glob("worker_validator_*.py")
+
+        # simulate a fresh process
+        validators._validators.clear()
+        generated.write_text(generated.read_text() + "\nIMPORTED_FROM_DISK = True\n")
+        validate = validators.get_validator("worker", tmp_path)
+
+        validate(WORKER_METADATA)
+        assert validate.__globals__["IMPORTED_FROM_DISK"]
+        assert compile_calls == []
+
+    def test_validator_dir_from_environment(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setenv(validators.VALIDATOR_DIR_ENV_VAR, str(tmp_path))
+
+        validators.get_validator("block")
+
+        assert list(tmp_path.glob("block_validator_*.py"))
+
+    def test_schema_change_produces_new_key(self):
+        schema = validators.get_schema("worker")
+
+        assert validators.schema_hash(schema) != validators.schema_hash(
+            {**schema, "required": ["type"]}
+        )
+
+
+class TestIncrementalValidation:
+    @pytest.fixture
+    def validate_calls(self, monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+        calls: list[Any] = []
+        validate = validators.get_validator("worker")
+
+        def counting_validate(data: Any) -> Any:
+            calls.append(data)
+            return validate(data)
+
+        monkeypatch.setitem(
+            validators._validators,
+            ("worker", validators.schema_hash(validators.get_schema("worker"))),
+            counting_validate,
+        )
+        return calls
+
+    def test_content_hash_ignores_key_order(self):
+        assert serialization.content_hash({"a": 1, "b": [1, 2]}) == (
+            serialization.content_hash({"b": [1, 2], "a": 1})
+        )
+
+    def test_only_changed_collections_are_validated(
+        self, tmp_path: Path, validate_calls: list[Any]
+    ):
+        view = {
+            "prefect-aws": {"ecs": WORKER_METADATA},
+            "prefect-gcp": {"cloud-run": WORKER_METADATA},
+        }
+        utils.validate_view_content(view, "worker", tmp_path)
+        assert len(validate_calls) == 2
+
+        validate_calls.clear()
+        changed = {**WORKER_METADATA, "description": "Run flows on Cloud Run."}
+        utils.validate_view_content(
+            {**view, "prefect-gcp": {"cloud-run": changed}}, "worker", tmp_path
+        )
+
+        assert validate_calls == [changed]
+
+    def test_invalid_collections_are_not_recorded(
+        self, tmp_path: Path, validate_calls: list[Any]
+    ):
+        view = {"prefect-aws": {"ecs": {**WORKER_METADATA, "type": 42}}}
+        for _ in range(2):
+            with pytest.raises(fastjsonschema.JsonSchemaException):
+                utils.validate_view_content(view, "worker", tmp_path)
+
+        assert len(validate_calls) == 2
+
+    def test_schema_change_invalidates_manifest(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        manifest = validators.ValidationManifest("worker", tmp_path)
+        manifest.save({serialization.content_hash(WORKER_METADATA)})
+
+        schema = validators.get_schema("worker")
+        monkeypatch.setattr(
+            metadata_schemas, "worker_schema", {**schema, "required": ["type"]}
+        )
+        validators._schema_key.cache_clear()
+        new_manifest = validators.ValidationManifest("worker", tmp_path)
+        assert serialization.content_hash(WORKER_METADATA) not in new_manifest
+
+        new_manifest.save(set())
+        assert list(tmp_path.iterdir()) == [new_manifest.path]